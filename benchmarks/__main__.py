@@ -0,0 +1,90 @@
+"""Seed a benchmark database at increasing scales and time every route.
+
+    python -m benchmarks --scales 10000,100000 --repeat 20
+    python -m benchmarks --scales 10000 --save-baseline
+    python -m benchmarks --scales 10000            # compares with the saved baseline
+
+Runs against a throwaway SQLite file unless --database-uri is given; the
+instance config.py is still loaded for everything else.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.datagen import grow_to
+from benchmarks.runner import build_app, compare, load_results, run_scale, save_results
+
+DEFAULT_BASELINE = os.path.join("instance", "benchmark-baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="10000,100000",
+                        help="Comma-separated asset counts to grow the database to, in order.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed requests per route and scale.")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per read route first.")
+    parser.add_argument("--database-uri", help="Benchmark this (empty) database instead of a temp SQLite file.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 growth before failing.")
+    parser.add_argument("--output", help="Also write the results JSON here.")
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    uri = args.database_uri
+    if not uri:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db", prefix="inventory-bench-")
+        os.close(fd)
+        uri = f"sqlite:///{tmp_path}"
+
+    from pkg.models import db
+    from pkg.refdata import invalidate_reference_data
+    from pkg.stats import invalidate_dashboard_stats
+
+    app = build_app(uri)
+    client = app.test_client()
+    results = {}
+    try:
+        for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+            print(f"seeding {scale} assets...", file=sys.stderr)
+            with app.app_context():
+                with db.engine.begin() as conn:
+                    grow_to(conn, scale, progress=lambda n: print(f"  {n}", end="\r", file=sys.stderr))
+            invalidate_dashboard_stats()
+            invalidate_reference_data()
+
+            print(f"timing routes at {scale} assets...", file=sys.stderr)
+            results[str(scale)] = run_scale(app, client, repeat=args.repeat, warmup=args.warmup)
+            _print_table(scale, results[str(scale)])
+    finally:
+        if tmp_path:
+            with app.app_context():
+                db.engine.dispose()
+            os.remove(tmp_path)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if os.path.exists(args.baseline):
+        regressions = compare(results, load_results(args.baseline), tolerance=args.tolerance)
+        for scale, name, detail in regressions:
+            print(f"REGRESSION at {scale}: {name}: {detail}")
+        if regressions:
+            return 1
+        print("no regressions against the baseline")
+    return 0
+
+
+def _print_table(scale, cases):
+    print(f"\n{scale} assets")
+    print(f"{'route':48} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'status':>7}")
+    for name, stats in cases.items():
+        print(f"{name:48} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['queries']:8d} {stats['status']:7d}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
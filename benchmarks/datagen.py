@@ -0,0 +1,151 @@
+"""Synthetic inventory data at a chosen scale.
+
+Volumes grow additively, so one database can be taken from 10k to 100k to
+1M assets between benchmark rounds without reseeding from scratch.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from pkg.models import (
+    Vendor, Asset, AssetCategory, AssetAssignment, AssetStatusHistory, AssetStatus
+)
+
+CATEGORY_NAMES = [
+    "Laptop", "Monitors", "Cables", "Keyboards", "Mouse", "Docking stations", "Phones",
+    "Tablets", "Printers", "Network", "Servers", "Storage", "Headsets", "Projectors", "Cameras",
+]
+MAKES = ["Dell", "HP", "Lenovo", "Apple", "Samsung", "Logitech", "Cisco", "Asus", "Acer", "Brother"]
+DEPARTMENTS = ["Engineering", "Finance", "Sales", "Support", "Operations", "Legal", "HR", "Site"]
+# roughly what a busy inventory looks like: most kit in stock or out with people
+STATUS_WEIGHTS = {
+    AssetStatus.INVENTORY: 45,
+    AssetStatus.ASSIGNED: 40,
+    AssetStatus.REPAIR: 8,
+    AssetStatus.RETIRED: 7,
+}
+BATCH = 5000
+HISTORY_YEARS = 3
+
+
+def volumes(assets):
+    """Default row counts for ``assets`` assets."""
+    return {
+        "vendors": max(20, assets // 500),
+        "people": max(50, assets // 8),
+        "assets": assets,
+    }
+
+
+def _skewed(rng, n, alpha=1.2):
+    # Pareto-ish pick in [1, n]: a few vendors/people own most of the rows
+    return min(n, int(rng.paretovariate(alpha)))
+
+
+def _existing(conn, model):
+    return conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+
+def grow_to(conn, assets, vendors=None, people=None, seed=0, progress=None):
+    """Insert rows until the database holds ``assets`` assets (plus related rows).
+
+    Each new asset gets a creation date within the last few years, a status
+    drawn from STATUS_WEIGHTS, one to four history rows and, for assigned
+    assets, a closed earlier assignment now and then plus the open one.
+    """
+    targets = volumes(assets)
+    vendors = vendors or targets["vendors"]
+    people = people or targets["people"]
+    rng = random.Random(seed + _existing(conn, Asset))
+    now = datetime.utcnow()
+    span = timedelta(days=365 * HISTORY_YEARS).total_seconds()
+
+    have = _existing(conn, AssetCategory)
+    if have < len(CATEGORY_NAMES):
+        conn.execute(insert(AssetCategory.__table__), [{"name": n} for n in CATEGORY_NAMES[have:]])
+    categories = len(CATEGORY_NAMES)
+
+    have = _existing(conn, Vendor)
+    if have < vendors:
+        conn.execute(insert(Vendor.__table__), [
+            {"vendor_name": f"Vendor {i}", "vendor_email": f"v{i}@example.io", "vendor_password": "x",
+             "date_registered": now - timedelta(seconds=rng.random() * span)}
+            for i in range(have, vendors)
+        ])
+    vendor_ids = [vid for (vid,) in conn.execute(select(Vendor.__table__.c.id).order_by(Vendor.__table__.c.id))]
+
+    statuses, weights = zip(*STATUS_WEIGHTS.items())
+    start = _existing(conn, Asset)
+    while start < assets:
+        end = min(assets, start + BATCH)
+        rows = []
+        for i in range(start, end):
+            status = rng.choices(statuses, weights)[0]
+            holder = f"{rng.choice(DEPARTMENTS)} person {_skewed(rng, people)}" \
+                if status == AssetStatus.ASSIGNED else None
+            rows.append({
+                "name": f"{rng.choice(MAKES)} {rng.choice(CATEGORY_NAMES)} {i}",
+                "serial_number": f"BENCH-{i:08d}",
+                "model_number": f"M{rng.randint(100, 9999)}",
+                "make": rng.choice(MAKES),
+                "quantity": 1 if rng.random() < 0.9 else rng.randint(2, 50),
+                "vendor_id": vendor_ids[_skewed(rng, len(vendor_ids)) - 1],
+                "category_id": rng.randint(1, categories),
+                "current_status": status,
+                "current_holder": holder,
+                "created_at": now - timedelta(seconds=rng.random() * span),
+            })
+        conn.execute(insert(Asset.__table__), rows)
+
+        # a single writer on a fresh benchmark database gets consecutive ids
+        first_id = conn.execute(
+            select(Asset.__table__.c.id).where(Asset.__table__.c.serial_number == rows[0]["serial_number"])
+        ).scalar()
+        assignments, history = [], []
+        for offset, row in enumerate(rows):
+            asset_id = first_id + offset
+            created = row["created_at"]
+            age = (now - created).total_seconds()
+            for _ in range(rng.randint(0, 3)):
+                history.append({
+                    "asset_id": asset_id, "status": rng.choices(statuses, weights)[0],
+                    "changed_by": "bench", "note": "",
+                    "timestamp": created + timedelta(seconds=rng.random() * age),
+                })
+            history.append({
+                "asset_id": asset_id, "status": row["current_status"], "changed_by": "bench",
+                "note": "", "timestamp": now - timedelta(seconds=rng.random() * min(age, 86400 * 30)),
+            })
+            if row["current_status"] == AssetStatus.ASSIGNED:
+                opened = now - timedelta(seconds=rng.random() * age)
+                if rng.random() < 0.3:
+                    earlier = created + timedelta(seconds=rng.random() * (opened - created).total_seconds())
+                    assignments.append({
+                        "asset_id": asset_id, "assigned_to": f"{rng.choice(DEPARTMENTS)} person "
+                                                             f"{_skewed(rng, people)}",
+                        "assigned_at": earlier, "returned_at": opened,
+                    })
+                assignments.append({
+                    "asset_id": asset_id, "assigned_to": row["current_holder"],
+                    "assigned_at": opened, "returned_at": None,
+                })
+        if assignments:
+            conn.execute(insert(AssetAssignment.__table__), assignments)
+        conn.execute(insert(AssetStatusHistory.__table__), history)
+        start = end
+        if progress:
+            progress(end)
+
+    # keep the denormalised vendor totals in step with the raw inserts
+    assets_t, vendors_t = Asset.__table__, Vendor.__table__
+    conn.execute(vendors_t.update().values(
+        asset_count=select(func.count(assets_t.c.id))
+        .where(assets_t.c.vendor_id == vendors_t.c.id).scalar_subquery(),
+        total_quantity=select(func.coalesce(func.sum(assets_t.c.quantity), 0))
+        .where(assets_t.c.vendor_id == vendors_t.c.id).scalar_subquery(),
+    ))
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("ANALYZE"))
+    elif conn.dialect.name == "mysql":
+        conn.execute(text("ANALYZE TABLE assets, asset_assignments, asset_status_history, vendors"))
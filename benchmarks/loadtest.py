@@ -0,0 +1,275 @@
+"""Concurrent load test: many simulated admins and vendors replaying weighted scenarios.
+
+    python -m benchmarks.loadtest --users 200 --duration 60
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --admin-user ops --admin-password ... \\
+        --vendor-email v1@example.io --users 200 --duration 120
+
+Without --url a seeded temporary SQLite database is served by a threaded
+local server in this process. That is enough to compare code changes, but
+SQLite serialises writers, so size worker counts against a real deployment
+(--url, e.g. gunicorn with N workers on MySQL).
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+from benchmarks.runner import percentile
+
+CSRF_FIELD = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+ASSIGN_LINK = re.compile(r'/admin/assign/(\d+)/')
+VERSION_FIELD = re.compile(r'name="version" value="(\d+)"')
+
+
+class Stats:
+    """Thread-safe per-step latency and outcome collection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)  # step -> [ms]
+        self.outcomes = defaultdict(lambda: defaultdict(int))  # step -> {status or error: n}
+
+    def record(self, step, ms, outcome):
+        with self._lock:
+            self.latencies[step].append(ms)
+            self.outcomes[step][outcome] += 1
+
+
+class VirtualUser:
+    """One browser: its own cookie jar, CSRF token and scenario loop."""
+
+    def __init__(self, base_url, stats, options, rng):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.options = options
+        self.rng = rng
+        self.csrf = None
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, step, path, data=None):
+        """Issue one request (following redirects); returns the body or None on failure."""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body)
+        if self.csrf and body is not None:
+            req.add_header("X-CSRFToken", self.csrf)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.options.timeout) as response:
+                text = response.read().decode("utf-8", "replace")
+                outcome = response.status
+        except urllib.error.HTTPError as e:
+            text, outcome = None, e.code
+        except Exception as e:
+            text, outcome = None, type(e).__name__
+        self.stats.record(step, (time.perf_counter() - start) * 1000, outcome)
+        if text:
+            match = CSRF_FIELD.search(text)
+            if match:
+                self.csrf = match.group(1)
+        return text
+
+    # --- scenarios -------------------------------------------------------
+
+    def vendor_flow(self):
+        self.request("vendor login page", "/vendor-login/")
+        self.request("vendor login", "/vendor-login/",
+                     {"email": self.options.vendor_email, "password": "x", "csrf_token": self.csrf or ""})
+        self.request("vendor dashboard", "/vendor/")
+        serial = f"LOAD-{threading.get_ident()}-{time.time_ns()}"
+        self.request("vendor add asset", "/vendor-add-asset/", {
+            "name": "Load test laptop", "serial_number": serial, "quantity": "1",
+            "category_id": "1", "current_status": "INVENTORY", "csrf_token": self.csrf or "",
+        })
+
+    def admin_flow(self):
+        self.request("admin login page", "/admin_login/")
+        self.request("admin login", "/admin_login/", {
+            "username": self.options.admin_user, "password": self.options.admin_password,
+            "csrf_token": self.csrf or "",
+        })
+        status = self.rng.choice(["INVENTORY", "REPAIR", ""])
+        page = self.request("admin filter assets", f"/admin/assets/?status={status}")
+        ids = ASSIGN_LINK.findall(page or "")
+        if not ids:
+            return
+        asset_id = self.rng.choice(ids)
+        form = self.request("admin assign page", f"/admin/assign/{asset_id}/") or ""
+        version = VERSION_FIELD.search(form)
+        self.request("admin assign", f"/admin/assign/{asset_id}/", {
+            "assigned_to": f"Load holder {self.rng.randint(1, 500)}", "assigned_by": "loadtest",
+            "version": version.group(1) if version else "", "csrf_token": self.csrf or "",
+        })
+        self.request("admin view history", f"/admin/history/{asset_id}/")
+
+    def run(self, deadline, scenarios, weights):
+        while time.monotonic() < deadline:
+            self.rng.choices(scenarios, weights)[0](self)
+            if self.options.think:
+                time.sleep(self.rng.uniform(0, self.options.think))
+
+
+SCENARIOS = {
+    "vendor": VirtualUser.vendor_flow,
+    "admin": VirtualUser.admin_flow,
+}
+
+
+def run_load(base_url, options):
+    """Run ``options.users`` virtual users for ``options.duration`` seconds; return a report dict."""
+    names = list(SCENARIOS)
+    weights = [options.weights.get(name, 0) for name in names]
+    scenarios = [SCENARIOS[name] for name in names]
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + options.ramp + options.duration
+
+    def user(i):
+        # spread the logins over the ramp-up instead of a thundering herd
+        time.sleep(options.ramp * i / max(1, options.users))
+        VirtualUser(base_url, stats, options, random.Random(i)).run(deadline, scenarios, weights)
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(options.users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarise(stats, time.monotonic() - start)
+
+
+def _is_error(outcome):
+    # 409 is the optimistic-concurrency answer to two admins racing, not a failure
+    return not isinstance(outcome, int) or (outcome >= 400 and outcome != 409)
+
+
+def summarise(stats, elapsed):
+    steps = {}
+    all_ms, total, errors, conflicts = [], 0, 0, 0
+    for step, latencies in stats.latencies.items():
+        outcomes = dict(stats.outcomes[step])
+        n = len(latencies)
+        step_errors = sum(c for o, c in outcomes.items() if _is_error(o))
+        steps[step] = {
+            "requests": n,
+            "p50_ms": round(percentile(latencies, 0.50), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "error_rate": round(step_errors / n, 4),
+            "outcomes": {str(o): c for o, c in sorted(outcomes.items(), key=str)},
+        }
+        all_ms.extend(latencies)
+        total += n
+        errors += step_errors
+        conflicts += outcomes.get(409, 0)
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(all_ms, 0.50), 1) if all_ms else None,
+        "p99_ms": round(percentile(all_ms, 0.99), 1) if all_ms else None,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "conflicts": conflicts,
+        "steps": steps,
+    }
+
+
+def _print_report(report):
+    print(f"\n{report['requests']} requests in {report['elapsed_s']} s: "
+          f"{report['throughput_rps']} req/s, p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms, "
+          f"errors {report['error_rate']:.2%}, conflicts {report['conflicts']}")
+    print(f"{'step':24} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8}  outcomes")
+    for step, s in sorted(report["steps"].items()):
+        outcomes = ", ".join(f"{o}: {c}" for o, c in s["outcomes"].items())
+        print(f"{step:24} {s['requests']:9d} {s['p50_ms']:9.1f} {s['p99_ms']:9.1f} {s['error_rate']:8.2%}  {outcomes}")
+
+
+def _start_local_server(assets, admin_user, admin_password):
+    """Seed a temp SQLite database and serve the app on a free local port."""
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server
+    from benchmarks.datagen import grow_to
+    from benchmarks.runner import build_app
+    from pkg.models import db, Admin, Vendor
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="inventory-load-")
+    os.close(fd)
+    app = build_app(f"sqlite:///{path}", METRICS_ENABLED=False)
+    with app.app_context():
+        with db.engine.begin() as conn:
+            grow_to(conn, assets)
+        db.session.add(Admin(admin_username=admin_user, admin_password=generate_password_hash(admin_password),
+                             admin_department="Load test", admin_last_login=datetime.utcnow()))
+        db.session.commit()
+        vendor_email = db.session.query(Vendor.vendor_email).order_by(Vendor.id).limit(1).scalar()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no access log line per request
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(path)
+
+    return f"http://127.0.0.1:{server.server_port}", vendor_email, stop
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Target an already running server instead of a local one.")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of steady load after ramp-up.")
+    parser.add_argument("--ramp", type=float, default=5, help="Seconds over which users start.")
+    parser.add_argument("--think", type=float, default=0.0, help="Max random pause between scenarios (s).")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout (s).")
+    parser.add_argument("--mix", default="admin=3,vendor=1", help="Scenario weights, e.g. admin=3,vendor=1.")
+    parser.add_argument("--assets", type=int, default=10000, help="Assets to seed for the local server.")
+    parser.add_argument("--admin-user", default="loadtest")
+    parser.add_argument("--admin-password", default="loadtest")
+    parser.add_argument("--vendor-email", help="Vendor account used by the vendor scenario.")
+    parser.add_argument("--output", help="Write the report JSON here.")
+    options = parser.parse_args(argv)
+    options.weights = {k: float(v) for k, v in (p.split("=") for p in options.mix.split(",") if p)}
+    unknown = set(options.weights) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    stop = None
+    base_url = options.url
+    if not base_url:
+        print(f"seeding {options.assets} assets and starting a local server...", file=sys.stderr)
+        base_url, vendor_email, stop = _start_local_server(options.assets, options.admin_user,
+                                                           options.admin_password)
+        options.vendor_email = options.vendor_email or vendor_email
+    elif options.weights.get("vendor") and not options.vendor_email:
+        parser.error("--vendor-email is required with --url when the mix includes vendors")
+
+    print(f"{options.users} users for {options.duration}s against {base_url}...", file=sys.stderr)
+    try:
+        report = run_load(base_url, options)
+    finally:
+        if stop:
+            stop()
+    _print_report(report)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if report["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
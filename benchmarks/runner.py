@@ -0,0 +1,192 @@
+"""Time every admin/vendor route through the Flask test client."""
+import json
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+
+from pkg.models import db, Vendor, Asset, AssetAssignment, AssetStatus
+
+ROUTE_MODULES = ("pkg.admin_routes", "pkg.vendor_routes")
+# these end the logged-in session the rest of the run depends on
+SKIP_ENDPOINTS = {"admin.admin_logout", "vendor.vendor_logout"}
+
+Case = namedtuple("Case", "name method url kwargs")
+
+
+class QueryCounter:
+    """Counts statements sent to any engine while enabled (including streamed responses)."""
+
+    def __init__(self):
+        self.count = 0
+        self.enabled = False
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        if self.enabled:
+            self.count += 1
+
+    def close(self):
+        event.remove(Engine, "before_cursor_execute", self._on_execute)
+
+
+def build_app(database_uri, **overrides):
+    """The real app, pointed at ``database_uri``, with its tables created."""
+    from pkg import create_app
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        "DATABASE_REPLICA_URI": None,
+        "WTF_CSRF_ENABLED": False,
+        "SECRET_KEY": "benchmark",
+        "SQL_PROFILING": False,
+        **overrides,
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _samples():
+    """Representative ids/names to fill in URL parameters at the current scale."""
+    top_vendor = db.session.query(Vendor.id).order_by(Vendor.asset_count.desc()).limit(1).scalar()
+    asset_count = db.session.query(func.count(Asset.id)).scalar()
+    mid_asset = db.session.query(Asset.id).order_by(Asset.id).offset(asset_count // 2).limit(1).scalar()
+    top_holder = db.session.execute(
+        select(AssetAssignment.assigned_to, func.count())
+        .where(AssetAssignment.returned_at.is_(None))
+        .group_by(AssetAssignment.assigned_to).order_by(func.count().desc()).limit(1)
+    ).scalar()
+    return {"vendor_id": top_vendor, "asset_id": mid_asset, "holder": top_holder or "nobody"}
+
+
+def read_cases(app, samples):
+    """A GET case for every parameterisable route in ROUTE_MODULES, plus filter variants."""
+    url_values = {"asset_id": samples["asset_id"], "vendor_id": samples["vendor_id"],
+                  "name": "assets", "fmt": "csv"}
+    query = {
+        "admin.admin_search_assets": {"q": "dell laptop"},
+        "admin.admin_holder_assets": {"name": samples["holder"]},
+    }
+    cases = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        view = app.view_functions[rule.endpoint]
+        if view.__module__ not in ROUTE_MODULES or "GET" not in rule.methods:
+            continue
+        if rule.endpoint in SKIP_ENDPOINTS or not set(rule.arguments) <= set(url_values):
+            continue
+        path = rule.build({k: url_values[k] for k in rule.arguments}, append_unknown=False)[1]
+        cases.append(Case(rule.endpoint, "GET", path, {"query_string": query.get(rule.endpoint, {})}))
+
+    cases += [
+        Case("admin.admin_manage_assets?status", "GET", "/admin/assets/", {"query_string": {"status": "REPAIR"}}),
+        Case("admin.admin_manage_assets?vendor", "GET", "/admin/assets/",
+             {"query_string": {"vendor": samples["vendor_id"]}}),
+        Case("admin.admin_manage_assets?per_page=200", "GET", "/admin/assets/", {"query_string": {"per_page": 200}}),
+        Case("admin.admin_export assignments", "GET", "/admin/export/assignments.jsonl", {}),
+    ]
+    return cases
+
+
+def write_cases(samples):
+    """Mutating requests, built per repetition so none of them is a no-op."""
+    base = samples["asset_id"]
+
+    def status_change(i):
+        status = AssetStatus.REPAIR if i % 2 == 0 else AssetStatus.INVENTORY
+        return Case("POST admin.admin_change_asset_status", "POST", f"/admin/assets/status/{base}/",
+                    {"data": {"status": status.name, "note": "bench"}})
+
+    def assign(i):
+        return Case("POST admin.admin_assigning_asset", "POST", f"/admin/assign/{base + 1 + i}/",
+                    {"data": {"assigned_to": f"Bench holder {i % 7}", "assigned_by": "bench"}})
+
+    def bulk_status(i):
+        ids = list(range(base + 1000 + i * 100, base + 1100 + i * 100))
+        status = AssetStatus.REPAIR if i % 2 == 0 else AssetStatus.INVENTORY
+        return Case("POST admin.admin_bulk_change_status x100", "POST", "/admin/assets/bulk/status/",
+                    {"json": {"asset_ids": ids, "status": status.name}})
+
+    return [status_change, assign, bulk_status]
+
+
+def _time(client, counter, case):
+    counter.count = 0
+    counter.enabled = True
+    start = time.perf_counter()
+    response = getattr(client, case.method.lower())(case.url, **case.kwargs)
+    response.get_data()  # drain streamed bodies inside the timing
+    elapsed = time.perf_counter() - start
+    counter.enabled = False
+    return elapsed * 1000, counter.count, response.status_code
+
+
+def run_scale(app, client, repeat=20, warmup=2):
+    """Return {case name: {p50_ms, p95_ms, queries, status}} for the data currently loaded."""
+    with app.app_context():
+        samples = _samples()
+        vendor_id = samples["vendor_id"]
+    with client.session_transaction() as sess:
+        sess["admin_loggedin"] = 1
+        sess["admin_username"] = "bench"
+        sess["vendor_loggedin"] = vendor_id
+
+    counter = QueryCounter()
+    results = {}
+    try:
+        for case in read_cases(app, samples):
+            for _ in range(warmup):
+                _time(client, counter, case)
+            runs = [_time(client, counter, case) for _ in range(repeat)]
+            results[case.name] = _summarise(runs)
+        for make_case in write_cases(samples):
+            runs = [_time(client, counter, make_case(i)) for i in range(repeat)]
+            results[make_case(0).name] = _summarise(runs)
+    finally:
+        counter.close()
+    return results
+
+
+def _summarise(runs):
+    times = [ms for ms, _, _ in runs]
+    return {
+        "p50_ms": round(percentile(times, 0.50), 2),
+        "p95_ms": round(percentile(times, 0.95), 2),
+        "queries": max(q for _, q, _ in runs),
+        "status": runs[-1][2],
+    }
+
+
+def compare(results, baseline, tolerance=0.25, min_ms=5.0):
+    """List regressions of ``results`` against ``baseline`` (same {scale: {case: stats}} shape).
+
+    A case regresses when its p95 grows by more than ``tolerance`` (and by at
+    least ``min_ms``, to ignore timer noise on fast routes) or when it issues
+    more queries than before.
+    """
+    regressions = []
+    for scale, cases in results.items():
+        for name, now in cases.items():
+            before = baseline.get(scale, {}).get(name)
+            if before is None:
+                continue
+            if now["p95_ms"] > before["p95_ms"] * (1 + tolerance) and now["p95_ms"] - before["p95_ms"] >= min_ms:
+                regressions.append((scale, name, f"p95 {before['p95_ms']} -> {now['p95_ms']} ms"))
+            if now["queries"] > before["queries"]:
+                regressions.append((scale, name, f"queries {before['queries']} -> {now['queries']}"))
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_results(path, results):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
@@ -0,0 +1,109 @@
+"""Cold-start cost: import time, app factory time and the first request, each in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --budget-ms 600      # fail if import + create_app() is slower
+    python -m benchmarks.startup --top 15             # slowest modules from -X importtime
+
+Starting the app must not touch the database; any statement issued while
+importing pkg or running create_app() is reported and fails the run.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# runs in the child interpreter; prints one JSON line
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda conn, cursor, statement, *a: statements.append(statement))
+t1 = time.perf_counter()
+import pkg
+t2 = time.perf_counter()
+app = pkg.create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1], "DATABASE_REPLICA_URI": None,
+                      "SECRET_KEY": "startup", "SQL_PROFILING": False})
+t3 = time.perf_counter()
+startup_statements = list(statements)
+app.test_client().get("/")
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t2 - t1) * 1000,
+    "create_app_ms": (t3 - t2) * 1000,
+    "first_request_ms": (t4 - t3) * 1000,
+    "total_ms": (t4 - t0) * 1000,
+    "startup_statements": startup_statements,
+    "modules": len(sys.modules),
+}))
+"""
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def probe(database_uri):
+    out = subprocess.run([sys.executable, "-c", PROBE, database_uri], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(database_uri, top):
+    """(cumulative ms, module) for the ``top`` slowest first- and second-level imports of a cold start."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE, database_uri],
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for match in IMPORTTIME.finditer(out.stderr):
+        _, cumulative, indent, module = match.groups()
+        if len(indent) <= 3:  # the probe's own imports and what they import directly
+            rows.append((int(cumulative) / 1000, module))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time.")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median import + create_app() exceeds this.")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports.")
+    parser.add_argument("--output", help="Write the results JSON here.")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".db", prefix="inventory-startup-")
+    os.close(fd)
+    uri = f"sqlite:///{path}"
+    try:
+        runs = [probe(uri) for _ in range(args.runs)]
+        imports = slowest_imports(uri, args.top) if args.top else []
+    finally:
+        os.remove(path)
+
+    results = {key: round(statistics.median(r[key] for r in runs), 1)
+               for key in ("import_ms", "create_app_ms", "first_request_ms", "total_ms")}
+    results["modules"] = runs[-1]["modules"]
+    statements = runs[-1]["startup_statements"]
+    results["startup_statements"] = len(statements)
+
+    print(f"median of {args.runs} runs: import pkg {results['import_ms']} ms, "
+          f"create_app() {results['create_app_ms']} ms, first request {results['first_request_ms']} ms, "
+          f"process total {results['total_ms']} ms, {results['modules']} modules loaded")
+    for ms, module in imports:
+        print(f"  {ms:8.1f} ms  {module}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    status = 0
+    if statements:
+        print(f"FAIL: startup issued {len(statements)} SQL statement(s), e.g. {statements[0]!r}")
+        status = 1
+    startup_ms = results["import_ms"] + results["create_app_ms"]
+    if args.budget_ms is not None and startup_ms > args.budget_ms:
+        print(f"FAIL: import + create_app() took {startup_ms:.1f} ms, budget {args.budget_ms} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""integer asset quantity and per-vendor rollups
+
+Revision ID: 1248c02ac197
+Revises: 8e25c5ac4639
+Create Date: 2026-10-18 09:12:41.203117
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision = '1248c02ac197'
+down_revision = '8e25c5ac4639'
+branch_labels = None
+depends_on = None
+
+
+def _clean_quantities():
+    # values that are not plain whole numbers cannot survive the type change
+    conn = op.get_bind()
+    assets = sa.table('assets', sa.column('id', sa.Integer), sa.column('quantity', sa.String))
+    rows = conn.execute(sa.select(assets.c.id, assets.c.quantity)).fetchall()
+    for asset_id, quantity in rows:
+        try:
+            cleaned = str(int(str(quantity).strip()))
+        except (TypeError, ValueError):
+            cleaned = None
+            if quantity is not None:
+                log.warning("asset %s: quantity %r is not a whole number, set to NULL", asset_id, quantity)
+        if cleaned != quantity:
+            conn.execute(assets.update().where(assets.c.id == asset_id).values(quantity=cleaned))
+
+
+def upgrade():
+    _clean_quantities()
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.alter_column('quantity',
+               existing_type=sa.String(length=256),
+               type_=sa.Integer(),
+               existing_nullable=True)
+
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('asset_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('total_quantity', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE vendors SET "
+        "asset_count = (SELECT COUNT(*) FROM assets WHERE assets.vendor_id = vendors.id), "
+        "total_quantity = (SELECT COALESCE(SUM(assets.quantity), 0) FROM assets WHERE assets.vendor_id = vendors.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.drop_column('total_quantity')
+        batch_op.drop_column('asset_count')
+
+    with op.batch_alter_table('assets', schema=None) as batch_op:
+        batch_op.alter_column('quantity',
+               existing_type=sa.Integer(),
+               type_=sa.String(length=256),
+               existing_nullable=True)
@@ -0,0 +1,40 @@
+"""reindex assets_fts only when a searched column changes
+
+Revision ID: 7e3b5a90c2d1
+Revises: d4c8a61f25b9
+Create Date: 2026-10-19 10:14:02.518340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from pkg.search import SQLITE_UPDATE_TRIGGER
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3b5a90c2d1'
+down_revision = 'd4c8a61f25b9'
+branch_labels = None
+depends_on = None
+
+# the trigger as a896361fc0b9 first created it, fired by every UPDATE
+_COLS = "name, serial_number, model_number, make, current_holder"
+_OLD_TRIGGER = (
+    f"CREATE TRIGGER IF NOT EXISTS assets_fts_au AFTER UPDATE ON assets BEGIN "
+    f"INSERT INTO assets_fts(assets_fts, rowid, {_COLS}) VALUES ('delete', old.id, "
+    f"old.name, old.serial_number, old.model_number, old.make, old.current_holder); "
+    f"INSERT INTO assets_fts(rowid, {_COLS}) VALUES (new.id, "
+    f"new.name, new.serial_number, new.model_number, new.make, new.current_holder); END"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS assets_fts_au")
+        op.execute(SQLITE_UPDATE_TRIGGER)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS assets_fts_au")
+        op.execute(_OLD_TRIGGER)
@@ -0,0 +1,49 @@
+"""open-assignment lookup index and returned_at backfill
+
+Revision ID: 8cdcb86a4aba
+Revises: f3be78bc5e3e
+Create Date: 2026-10-18 15:02:44.930561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8cdcb86a4aba'
+down_revision = 'f3be78bc5e3e'
+branch_labels = None
+depends_on = None
+
+
+def _close_superseded_assignments():
+    # before returns were tracked, a reassignment left the previous row open;
+    # close each one at the time the next assignment of the same asset started
+    conn = op.get_bind()
+    t = sa.table('asset_assignments',
+                 sa.column('id', sa.Integer), sa.column('asset_id', sa.Integer),
+                 sa.column('assigned_at', sa.DateTime), sa.column('returned_at', sa.DateTime))
+    rows = conn.execute(
+        sa.select(t.c.id, t.c.asset_id, t.c.assigned_at)
+        .where(t.c.returned_at.is_(None))
+        .order_by(t.c.asset_id, t.c.assigned_at, t.c.id)
+    ).fetchall()
+    for current, following in zip(rows, rows[1:]):
+        if current.asset_id == following.asset_id:
+            conn.execute(t.update().where(t.c.id == current.id)
+                         .values(returned_at=following.assigned_at or current.assigned_at))
+
+
+def upgrade():
+    _close_superseded_assignments()
+    with op.batch_alter_table('asset_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_asset_assignments_open_holder', ['assigned_to', 'returned_at'], unique=False,
+                              sqlite_where=sa.text('returned_at IS NULL'),
+                              postgresql_where=sa.text('returned_at IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('asset_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_asset_assignments_open_holder',
+                            sqlite_where=sa.text('returned_at IS NULL'),
+                            postgresql_where=sa.text('returned_at IS NULL'))
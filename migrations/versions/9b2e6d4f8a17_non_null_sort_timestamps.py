@@ -0,0 +1,69 @@
+"""backfill and require the timestamps keyset pages sort on
+
+Revision ID: 9b2e6d4f8a17
+Revises: 2c9f4e71b0a6
+Create Date: 2026-10-19 14:36:18.402951
+
+"""
+from datetime import datetime
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from pkg.search import SQLITE_DDL
+
+log = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e6d4f8a17'
+down_revision = '2c9f4e71b0a6'
+branch_labels = None
+depends_on = None
+
+# (table, column) pairs that page cursors are built from
+SORT_COLUMNS = (
+    ('assets', 'created_at'),
+    ('asset_assignments', 'assigned_at'),
+    ('asset_status_history', 'timestamp'),
+)
+
+
+def _backfill(table_name, column_name):
+    # a NULL sorted last (oldest) in newest-first pages; the table's earliest value keeps it there
+    conn = op.get_bind()
+    table = sa.table(table_name, sa.column(column_name, sa.DateTime))
+    column = table.c[column_name]
+    missing = conn.execute(sa.select(sa.func.count()).select_from(table).where(column.is_(None))).scalar()
+    if not missing:
+        return
+    earliest = conn.execute(sa.select(sa.func.min(column))).scalar() or datetime.utcnow()
+    log.warning("%s.%s: %d NULL values set to %s", table_name, column_name, missing, earliest)
+    conn.execute(table.update().where(column.is_(None)).values({column_name: earliest}))
+
+
+def upgrade():
+    for table_name, column_name in SORT_COLUMNS:
+        _backfill(table_name, column_name)
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column(column_name,
+                   existing_type=sa.DateTime(),
+                   nullable=False)
+
+    # SQLite rebuilds the altered tables, which drops the search triggers on assets
+    if op.get_bind().dialect.name == 'sqlite':
+        for stmt in SQLITE_DDL:
+            op.execute(stmt)
+
+
+def downgrade():
+    for table_name, column_name in SORT_COLUMNS:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column(column_name,
+                   existing_type=sa.DateTime(),
+                   nullable=True)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for stmt in SQLITE_DDL:
+            op.execute(stmt)
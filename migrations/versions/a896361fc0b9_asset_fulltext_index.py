@@ -0,0 +1,39 @@
+"""full-text index over asset name, serial, model, make and holder
+
+Revision ID: a896361fc0b9
+Revises: cec2a13b90c9
+Create Date: 2026-10-18 13:05:52.771264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from pkg.search import MYSQL_DDL, SQLITE_DDL, SQLITE_DROP
+
+
+# revision identifiers, used by Alembic.
+revision = 'a896361fc0b9'
+down_revision = 'cec2a13b90c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the DDL lives in pkg.search, which also applies it for db.create_all()
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        for stmt in MYSQL_DDL:
+            op.execute(stmt)
+    elif dialect == 'sqlite':
+        for stmt in SQLITE_DDL:
+            op.execute(stmt)
+        op.execute("INSERT INTO assets_fts(assets_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ix_assets_fulltext', table_name='assets')
+    elif dialect == 'sqlite':
+        for stmt in SQLITE_DROP:
+            op.execute(stmt)
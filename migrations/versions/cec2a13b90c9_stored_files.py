@@ -0,0 +1,32 @@
+"""content-addressed upload storage
+
+Revision ID: cec2a13b90c9
+Revises: 1248c02ac197
+Create Date: 2026-10-18 11:40:07.518840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cec2a13b90c9'
+down_revision = '1248c02ac197'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_files',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=256), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256'),
+    sa.UniqueConstraint('filename')
+    )
+
+
+def downgrade():
+    op.drop_table('stored_files')
@@ -1,23 +1,84 @@
 import os
 from flask import Flask
 from flask_wtf.csrf import CSRFProtect
-from flask_migrate import Migrate
 from dotenv import load_dotenv
 from pkg.models import db
 
 load_dotenv()
 
 csrf = CSRFProtect()
-migrate = Migrate()
 
-def create_app():
-    from pkg import models
+def create_app(config_overrides=None):
+    from pkg import models, rollups, search, refdata
     app = Flask(__name__, instance_relative_config=True, template_folder='templates')
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-    app.config['TEMPLATES_AUTO_RELOAD'] = True
-    app.config.from_pyfile("config.py")
+    # unset: reload templates only when running with debug on
+    auto_reload = os.getenv('TEMPLATES_AUTO_RELOAD')
+    app.config['TEMPLATES_AUTO_RELOAD'] = None if auto_reload is None else auto_reload.lower() in ('1', 'true', 'yes')
+    app.config['ASSETS_PER_PAGE'] = int(os.getenv('ASSETS_PER_PAGE', 25))
+    app.config['ASSETS_MAX_PER_PAGE'] = int(os.getenv('ASSETS_MAX_PER_PAGE', 200))
+    app.config['ASSIGNMENTS_WINDOW_DAYS'] = int(os.getenv('ASSIGNMENTS_WINDOW_DAYS', 90))
+    app.config['DASHBOARD_CACHE_TTL'] = int(os.getenv('DASHBOARD_CACHE_TTL', 30))
+    app.config['REFDATA_CACHE_TTL'] = int(os.getenv('REFDATA_CACHE_TTL', 300))
+    app.config['IMPORT_BATCH_SIZE'] = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+    app.config['EXPORT_CHUNK_ROWS'] = int(os.getenv('EXPORT_CHUNK_ROWS', 2000))
+    app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER')
+    app.config['IMAGE_WORKERS'] = int(os.getenv('IMAGE_WORKERS', 2))
+    app.config['STATIC_BUILD_DIR'] = os.getenv('STATIC_BUILD_DIR')
+    app.config['SQL_PROFILING'] = os.getenv('SQL_PROFILING', '0').lower() in ('1', 'true', 'yes')
+    app.config['SQL_PROFILING_HISTORY'] = int(os.getenv('SQL_PROFILING_HISTORY', 100))
+    app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', 500))
+    app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', '0').lower() in ('1', 'true', 'yes')
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 5))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    app.config['DB_POOL_TIMEOUT'] = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    # keep below MySQL's wait_timeout so idle connections are replaced before the server drops them
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes')
+    app.config['DB_CONNECT_TIMEOUT'] = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+    app.config['DB_READ_TIMEOUT'] = int(os.getenv('DB_READ_TIMEOUT', 0)) or None
+    app.config['DATABASE_REPLICA_URI'] = os.getenv('DATABASE_REPLICA_URI')
+    app.config['DB_REPLICA_STICKY_SECONDS'] = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+    app.config['TEMPLATE_CACHE_DIR'] = os.getenv('TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'jinja-cache'))
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.getenv('FRAGMENT_CACHE_SIZE', 5000))
+    app.config['HISTORY_PER_PAGE'] = int(os.getenv('HISTORY_PER_PAGE', 50))
+    app.config['HISTORY_RETENTION_DAYS'] = int(os.getenv('HISTORY_RETENTION_DAYS', 730))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.getenv('ARCHIVE_BATCH_SIZE', 5000))
+    app.config['ARCHIVE_DIR'] = os.getenv('ARCHIVE_DIR', os.path.join(app.instance_path, 'archive'))
+    app.config['UTILIZATION_CHUNK_DAYS'] = int(os.getenv('UTILIZATION_CHUNK_DAYS', 31))
+    # callers that pass their own settings (tests, benchmarks) need no instance config
+    app.config.from_pyfile("config.py", silent=bool(config_overrides))
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    from pkg.dbconfig import configure_database
+    configure_database(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+
+    from pkg import routes, vendor_routes, admin_routes
+    app.register_blueprint(routes.bp)
+    app.register_blueprint(vendor_routes.bp)
+    app.register_blueprint(admin_routes.bp)
+
+    from pkg.fragments import init_templates
+    init_templates(app)
+
+    from pkg.images import asset_image_url
+    app.jinja_env.globals['asset_image'] = asset_image_url
+
+    from pkg.static_assets import init_static_assets
+    init_static_assets(app)
+
+    from pkg.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    from pkg.metrics import init_metrics
+    init_metrics(app)
+
+    from pkg.commands import register_commands
+    register_commands(app)
     return app
 
 
@@ -1,19 +1,37 @@
 from flask import (
-    render_template, redirect, flash, request, session, url_for, current_app as app, abort
+    Blueprint, render_template, redirect, flash, request, session, url_for, current_app, abort,
+    Response, stream_with_context, jsonify
 )
-from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import func
-from datetime import datetime
-import os, secrets
-
-from pkg.forms import VendorSignupForm, AdminSignupForm, AssetForm, AssignmentForm, AdminLoginForm
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, timedelta
+
+from pkg.dbconfig import read_replica
+from pkg.pagination import keyset_paginate
+from pkg.stats import get_dashboard_stats
+from pkg.instrumentation import recent_requests
+from pkg.search import search_assets
+from pkg.refdata import get_categories, get_vendors
+from pkg.bulk import parse_refs, bulk_change_status, bulk_assign
+from pkg.assignments import assignment_log_query, close_open_assignments, holdings, return_asset
+from pkg.archive import asset_history_page
+from pkg.utilization import DIMENSIONS, STATUSES, rolled_up_through, utilization_report
+from pkg.snapshots import inventory_as_of
+from pkg.forms import VendorSignupForm, AdminSignupForm, AssetForm, AssignmentForm, AdminLoginForm, AssetImportForm, StocktakeForm
+from pkg.importer import import_assets, iter_rows, detect_format
+from pkg.stocktake import reconcile, iter_scans
+from pkg.exports import EXPORTS, EXPORT_FORMATS, stream_export
+from pkg.images import schedule_variants
+from pkg.storage import save_upload, release_upload, delete_blob
 from pkg.models import (
     db, Vendor, Asset, AssetCategory, AssetAssignment,
     AssetStatusHistory, AssetStatus, Admin
 )
 
-@app.route('/admin_signup/', methods=['GET', 'POST'])
+bp = Blueprint("admin", __name__)
+
+@bp.route('/admin_signup/', methods=['GET', 'POST'])
 def admin_signup():
     form = AdminSignupForm()
     if form.validate_on_submit():
@@ -39,10 +57,10 @@ def admin_signup():
             db.session.add(new_admin)
             db.session.commit()
             flash('Admin account created successfully!', 'success')
-            return redirect(url_for('admin_login'))
+            return redirect(url_for('admin.admin_login'))
     return render_template('admin/admin_signup.html', form=form)
 
-@app.route('/admin_login/', methods=['GET', 'POST'])
+@bp.route('/admin_login/', methods=['GET', 'POST'])
 def admin_login():
     form = AdminLoginForm() 
     if form.validate_on_submit():
@@ -53,7 +71,7 @@ def admin_login():
         if admin_record and check_password_hash(admin_record.admin_password, password):
             session['admin_loggedin'] = admin_record.admin_id
             session['admin_username'] = admin_record.admin_username
-            return redirect(url_for('admin_dashboard'))
+            return redirect(url_for('admin.admin_dashboard'))
         else:
             flash("Invalid username or password", "error")
             return redirect('/admin_login/')
@@ -66,42 +84,30 @@ def admin_required(fn):
     def wrapper(*args, **kwargs):
         if not session.get("admin_loggedin"):
             flash("Admin login required", "error")
-            return redirect(url_for("admin_login"))
+            return redirect(url_for("admin.admin_login"))
         return fn(*args, **kwargs)
     wrapper.__name__ = fn.__name__
     return wrapper
 
 # ---------- DASHBOARD ----------
-@app.route("/admin/")
+@bp.route("/admin/")
 @admin_required
+@read_replica
 def admin_dashboard():
     admin = AdminLoginForm()
-    total_vendors = db.session.query(func.count(Vendor.id)).scalar() or 0
-    total_assets = db.session.query(func.count(Asset.id)).scalar() or 0
-    status_counts = {
-        "inventory": db.session.query(func.count(Asset.id)).filter(Asset.current_status == AssetStatus.INVENTORY).scalar() or 0,
-        "assigned": db.session.query(func.count(Asset.id)).filter(Asset.current_status == AssetStatus.ASSIGNED).scalar() or 0,
-        "repair": db.session.query(func.count(Asset.id)).filter(Asset.current_status == AssetStatus.REPAIR).scalar() or 0,
-        "retired": db.session.query(func.count(Asset.id)).filter(Asset.current_status == AssetStatus.RETIRED).scalar() or 0,
-    }
-
-    latest_assets = db.session.query(Asset, Vendor.vendor_name, AssetCategory.name.label("category_name"))\
-        .join(Vendor, Vendor.id == Asset.vendor_id, isouter=True)\
-        .join(AssetCategory, AssetCategory.id == Asset.category_id, isouter=True)\
-        .order_by(Asset.created_at.desc())\
-        .limit(6).all()
+    stats = get_dashboard_stats()
 
     return render_template(
         "admin/admin_dashboard.html",
         admin=admin,
-        total_vendors=total_vendors,
-        total_assets=total_assets,
-        status_counts=status_counts,
-        latest_assets=latest_assets
+        total_vendors=stats["total_vendors"],
+        total_assets=stats["total_assets"],
+        status_counts=stats["status_counts"],
+        latest_assets=stats["latest_assets"]
     )
 
 # ---------- VENDORS ----------
-@app.route("/admin/vendors/")
+@bp.route("/admin/vendors/")
 @admin_required
 def admin_manage_vendors():
     vendors = Vendor.query.order_by(Vendor.date_registered.desc()).all()
@@ -110,7 +116,7 @@ def admin_manage_vendors():
 
 
 
-@app.route("/admin/vendors/add/", methods=["POST"])
+@bp.route("/admin/vendors/add/", methods=["POST"])
 @admin_required
 def admin_add_vendor():
     form = VendorSignupForm()
@@ -132,77 +138,113 @@ def admin_add_vendor():
             flash("Vendor added successfully", "success")
     else:
         flash("Please check vendor form fields", "error")
-    return redirect(url_for("admin_manage_vendors"))
+    return redirect(url_for("admin.admin_manage_vendors"))
 
-@app.route("/admin/vendors/delete/<int:vendor_id>/", methods=["POST"])
+@bp.route("/admin/vendors/delete/<int:vendor_id>/", methods=["POST"])
 @admin_required
 def admin_delete_vendor(vendor_id):
     vendor = Vendor.query.get_or_404(vendor_id)
     assets_count = Asset.query.filter_by(vendor_id=vendor.id).count()
     if assets_count:
         flash("Vendor has assets. Reassign/delete assets first.", "error")
-        return redirect(url_for("admin_manage_vendors"))
+        return redirect(url_for("admin.admin_manage_vendors"))
     db.session.delete(vendor)
     db.session.commit()
     flash("Vendor deleted", "success")
-    return redirect(url_for("admin_manage_vendors"))
+    return redirect(url_for("admin.admin_manage_vendors"))
 
 # ---------- ASSETS ----------
-# @app.route("/admin/assets/")
-# @admin_required
-# def admin_manage_assets():
-#     assets = db.session.query(Asset, Vendor.vendor_name, AssetCategory.name.label("category_name"))\
-#         .join(Vendor, Vendor.id == Asset.vendor_id, isouter=True)\
-#         .join(AssetCategory, AssetCategory.id == Asset.category_id, isouter=True)\
-#         .order_by(Asset.created_at.desc()).all()
-#     form = AssetForm()
-#     form.populate_categories()
-#     return render_template("admin/manage_assets.html", assets=assets, form=form)
-
-@app.route("/admin/assets/")
-@admin_required
-def admin_manage_assets():
-    # query params
-    category_filter = request.args.get('category', type=int)
-    vendor_filter = request.args.get('vendor', type=int)
-    status_filter = request.args.get('status')  # expects 'INVENTORY', 'ASSIGNED', ...
-
+def asset_list_query(category=None, vendor=None, status=None):
+    """Assets with vendor and category names, optionally filtered; ``status`` is a status name."""
     # base query selecting Asset + vendor name + category name
     query = db.session.query(Asset, Vendor.vendor_name, AssetCategory.name.label("category_name"))\
         .outerjoin(Vendor, Asset.vendor_id == Vendor.id)\
         .outerjoin(AssetCategory, Asset.category_id == AssetCategory.id)
 
     # apply filters
-    if category_filter:
-        query = query.filter(Asset.category_id == category_filter)
-    if vendor_filter:
-        query = query.filter(Asset.vendor_id == vendor_filter)
-    if status_filter:
-        try:
-            query = query.filter(Asset.current_status == AssetStatus[status_filter])
-        except KeyError:
-            pass
+    if category:
+        query = query.filter(Asset.category_id == category)
+    if vendor:
+        query = query.filter(Asset.vendor_id == vendor)
+    if status in AssetStatus.__members__:
+        query = query.filter(Asset.current_status == AssetStatus[status])
+    return query
+
+
+def _filtered_asset_query():
+    # query params; status expects 'INVENTORY', 'ASSIGNED', ...
+    return asset_list_query(
+        category=request.args.get('category', type=int),
+        vendor=request.args.get('vendor', type=int),
+        status=request.args.get('status'),
+    )
+
 
-    assets = query.order_by(Asset.created_at.desc()).all()
+@bp.route("/admin/assets/")
+@admin_required
+@read_replica
+def admin_manage_assets():
+    query = _filtered_asset_query()
+
+    # keyset pagination over (created_at, id) so deep pages cost the same as the first
+    per_page = request.args.get('per_page', current_app.config['ASSETS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['ASSETS_MAX_PER_PAGE']))
+    page = keyset_paginate(
+        query, Asset.created_at, Asset.id, per_page,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        key=lambda row: row[0]
+    )
 
     # form for the add asset panel
     form = AssetForm()
     form.populate_categories()
 
     # lists for the filter dropdowns
-    categories = AssetCategory.query.order_by(AssetCategory.name).all()
-    vendors = Vendor.query.order_by(Vendor.vendor_name).all()
+    categories = get_categories()
+    vendors = get_vendors()
 
     return render_template(
         "admin/manage_assets.html",  
-        assets=assets,
+        assets=page.items,
+        page=page,
         categories=categories,
         vendors=vendors,
         form=form
     )
 
 
-@app.route("/admin/assets/add/", methods=["POST"])
+@bp.route("/admin/assets/search/")
+@admin_required
+@read_replica
+def admin_search_assets():
+    q = request.args.get('q', '').strip()
+    per_page = request.args.get('per_page', current_app.config['ASSETS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['ASSETS_MAX_PER_PAGE']))
+    page_num = max(1, request.args.get('page', 1, type=int))
+
+    results, has_next = [], False
+    query = search_assets(_filtered_asset_query(), q)
+    if query is not None:
+        # ranked results page by offset; one extra row tells us if there is more
+        rows = query.limit(per_page + 1).offset((page_num - 1) * per_page).all()
+        has_next = len(rows) > per_page
+        results = rows[:per_page]
+
+    categories = get_categories()
+    vendors = get_vendors()
+    return render_template(
+        "admin/search_assets.html",
+        q=q,
+        assets=results,
+        page_num=page_num,
+        has_next=has_next,
+        categories=categories,
+        vendors=vendors
+    )
+
+
+@bp.route("/admin/assets/add/", methods=["POST"])
 @admin_required
 def admin_add_asset():
     form = AssetForm()
@@ -210,12 +252,12 @@ def admin_add_asset():
 
     if not form.validate_on_submit():
         flash("Please fix the errors on the form.", "error")
-        return redirect(url_for("admin_manage_assets"))
+        return redirect(url_for("admin.admin_manage_assets"))
 
     existing_asset = Asset.query.filter_by(serial_number=form.serial_number.data).first()
     if existing_asset:
         flash("An asset with this serial number already exists.", "error")
-        return redirect(url_for("admin_manage_assets"))
+        return redirect(url_for("admin.admin_manage_assets"))
 
     try:
         new_asset = Asset(
@@ -230,106 +272,289 @@ def admin_add_asset():
             current_status=AssetStatus[form.current_status.data]
         )
 
+        is_new_picture = False
         if form.picture.data:
-            upload_folder = os.path.join(app.root_path, "static", "uploaded")
-            os.makedirs(upload_folder, exist_ok=True)
-            filename = secure_filename(form.picture.data.filename)
-            prefix = secrets.token_hex(8)
-            filename = f"{prefix}_{filename}"
-            file_path = os.path.join(upload_folder, filename)
-            form.picture.data.save(file_path)
-            new_asset.picture = filename
+            new_asset.picture, is_new_picture = save_upload(form.picture.data)
 
         db.session.add(new_asset)
         db.session.commit()
+        if is_new_picture:
+            schedule_variants(new_asset.picture)
         flash("Asset added successfully", "success")
 
     except Exception as e:
         db.session.rollback()
         flash(f"Error adding asset: {str(e)}", "error")
 
-    return redirect(url_for("admin_manage_assets"))
+    return redirect(url_for("admin.admin_manage_assets"))
 
 
-@app.route("/admin/assets/delete/<int:asset_id>/", methods=["POST"])
+@bp.route("/admin/assets/import/", methods=["GET", "POST"])
+@admin_required
+def admin_import_assets():
+    form = AssetImportForm()
+    report = None
+    if form.validate_on_submit():
+        upload = form.data_file.data
+        rows = iter_rows(upload.stream, detect_format(upload.filename))
+        report = import_assets(rows)
+        if report.inserted:
+            flash(f"Imported {report.inserted} assets", "success")
+        if report.failed:
+            flash(f"{report.failed} rows were rejected", "error")
+    elif request.method == "POST":
+        flash("Please choose a CSV or JSONL file to import.", "error")
+    return render_template("admin/import_assets.html", form=form, report=report)
+
+
+@bp.route("/admin/assets/stocktake/", methods=["GET", "POST"])
+@admin_required
+def admin_stocktake():
+    # scanners can also POST the raw list (text/plain or text/csv) and get JSON back
+    if request.method == "POST" and request.mimetype in ("text/plain", "text/csv"):
+        report = reconcile(
+            iter_scans(request.stream),
+            include_assigned=request.args.get("include_assigned") in ("1", "true", "yes"),
+            vendor_id=request.args.get("vendor_id", type=int),
+            category_id=request.args.get("category_id", type=int),
+        )
+        return jsonify(report.to_dict())
+
+    form = StocktakeForm()
+    form.populate_choices()
+    report = None
+    if form.validate_on_submit():
+        report = reconcile(
+            iter_scans(form.scan_file.data.stream),
+            include_assigned=form.include_assigned.data,
+            vendor_id=form.vendor_id.data or None,
+            category_id=form.category_id.data or None,
+        )
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify(report.to_dict())
+    elif request.method == "POST":
+        flash("Please choose a CSV or text file of scanned serials.", "error")
+    return render_template("admin/stocktake.html", form=form, report=report)
+
+
+# ---------- CONCURRENCY ----------
+def _is_stale(asset):
+    # forms post the version they were rendered with; older clients that send
+    # none still get the WHERE version = ? check when the row is flushed
+    expected = request.form.get("version", type=int)
+    if expected is None and request.is_json:
+        expected = (request.get_json(silent=True) or {}).get("version")
+    return expected is not None and expected != asset.version
+
+
+def _version_conflict(asset_id):
+    db.session.rollback()
+    asset = db.session.get(Asset, asset_id)
+    message = "This asset was changed by someone else in the meantime. Reload and try again."
+    if request.is_json or request.accept_mimetypes.best == "application/json":
+        return jsonify(
+            error=message, asset_id=asset_id,
+            version=asset.version if asset else None,
+            current_status=asset.current_status.name if asset else None,
+            current_holder=asset.current_holder if asset else None,
+        ), 409
+    return render_template("admin/conflict.html", asset=asset, message=message), 409
+
+
+@bp.route("/admin/assets/delete/<int:asset_id>/", methods=["POST"])
 @admin_required
 def admin_delete_asset(asset_id):
     asset = Asset.query.get_or_404(asset_id)
-    if asset.picture:
-        try:
-            os.remove(os.path.join(app.root_path, "static", "uploaded", asset.picture))
-        except Exception:
-            pass
+    if _is_stale(asset):
+        return _version_conflict(asset_id)
+    picture = asset.picture
+    orphaned = bool(picture) and release_upload(picture)
     db.session.delete(asset)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        return _version_conflict(asset_id)
+    # the blob goes only once no other asset points at it
+    if orphaned:
+        delete_blob(picture)
     flash("Asset deleted", "success")
-    return redirect(url_for("admin_manage_assets"))
+    return redirect(url_for("admin.admin_manage_assets"))
 
 
-@app.route("/admin/assets/status/<int:asset_id>/", methods=["POST"])
+@bp.route("/admin/assets/status/<int:asset_id>/", methods=["POST"])
 @admin_required
 def admin_change_asset_status(asset_id):
     new_status = request.form.get("status")
     changed_by = session.get("admin_username", "admin")
     note = request.form.get("note", "")
     asset = Asset.query.get_or_404(asset_id)
+    if _is_stale(asset):
+        return _version_conflict(asset_id)
     try:
         asset.current_status = AssetStatus[new_status]
     except Exception:
         flash("Invalid status", "error")
-        return redirect(url_for("admin_manage_assets"))
+        return redirect(url_for("admin.admin_manage_assets"))
 
+    now = datetime.utcnow()
+    if asset.current_status != AssetStatus.ASSIGNED:
+        # out of ASSIGNED means nobody holds it any more
+        close_open_assignments([asset.id], now)
+        asset.current_holder = None
     history = AssetStatusHistory(
         asset_id=asset.id,
         status=asset.current_status,
         changed_by=changed_by,
-        note=note
+        note=note,
+        timestamp=now,
     )
     db.session.add(history)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        return _version_conflict(asset_id)
     flash("Status updated", "success")
-    return redirect(url_for("admin_manage_assets"))
+    return redirect(url_for("admin.admin_manage_assets"))
+
+# ---------- BULK ACTIONS ----------
+def _bulk_request():
+    # accepts a JSON body or the bulk form on the assets page
+    payload = request.get_json(silent=True)
+    if payload is not None:
+        get = payload.get
+        ids, serials = payload.get("asset_ids") or [], payload.get("serials") or []
+    else:
+        get = request.form.get
+        ids, serials = request.form.getlist("asset_ids"), request.form.get("serials", "")
+    asset_ids, serial_list, bad = parse_refs(ids, serials)
+    return get, asset_ids, serial_list, bad
+
+
+def _bulk_response(report, bad, action):
+    for ref in bad:
+        report.fail(ref, "Not a valid asset id")
+    if request.is_json:
+        return jsonify(report.to_dict())
+    if report.updated:
+        flash(f"{action} {len(report.updated)} assets", "success")
+    if report.failures:
+        flash(f"{len(report.failures)} assets were not changed", "error")
+    return render_template("admin/bulk_result.html", report=report, action=action)
+
+
+@bp.route("/admin/assets/bulk/status/", methods=["POST"])
+@admin_required
+def admin_bulk_change_status():
+    get, asset_ids, serials, bad = _bulk_request()
+    try:
+        new_status = AssetStatus[get("status") or ""]
+    except KeyError:
+        flash("Invalid status", "error")
+        return redirect(url_for("admin.admin_manage_assets"))
+    changed_by = session.get("admin_username", "admin")
+    report = bulk_change_status(asset_ids, serials, new_status, changed_by, get("note") or "")
+    return _bulk_response(report, bad, "Updated")
+
+
+@bp.route("/admin/assets/bulk/assign/", methods=["POST"])
+@admin_required
+def admin_bulk_assign():
+    get, asset_ids, serials, bad = _bulk_request()
+    assigned_to = (get("assigned_to") or "").strip()
+    if not assigned_to:
+        flash("Please provide assignee name", "error")
+        return redirect(url_for("admin.admin_manage_assets"))
+    changed_by = get("assigned_by") or session.get("admin_username", "Admin")
+    report = bulk_assign(asset_ids, serials, assigned_to, changed_by, get("note") or "")
+    return _bulk_response(report, bad, "Assigned")
 
 # ---------- ASSIGNMENTS ----------
-@app.route("/admin/assignments/")
+@bp.route("/admin/assignments/")
 @admin_required
+@read_replica
 def admin_view_assignments():
-    assignments = db.session.query(AssetAssignment, Asset.name.label("asset_name"))\
-        .join(Asset, Asset.id == AssetAssignment.asset_id)\
-        .order_by(AssetAssignment.assigned_at.desc()).all()
+    # newest-first log limited to a time window, paged by (assigned_at, id)
+    days = max(1, request.args.get('days', current_app.config['ASSIGNMENTS_WINDOW_DAYS'], type=int))
+    since = datetime.utcnow() - timedelta(days=days)
+    page = keyset_paginate(
+        assignment_log_query(since), AssetAssignment.assigned_at, AssetAssignment.id, current_app.config['ASSETS_PER_PAGE'],
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        key=lambda row: row[0]
+    )
     form = AssignmentForm()
-    return render_template("admin/view_assignments.html", assignments=assignments, form=form)
+    return render_template("admin/view_assignments.html", assignments=page.items, page=page, days=days, form=form)
 
-@app.route("/admin/assignments/assign/<int:asset_id>/", methods=["POST"])
+
+@bp.route("/admin/assignments/return/<int:asset_id>/", methods=["POST"])
+@admin_required
+def admin_return_asset(asset_id):
+    asset = Asset.query.get_or_404(asset_id)
+    if _is_stale(asset):
+        return _version_conflict(asset_id)
+    returned_by = session.get("admin_username", "admin")
+    if return_asset(asset, returned_by, request.form.get("note", "")):
+        try:
+            db.session.commit()
+        except StaleDataError:
+            return _version_conflict(asset_id)
+        flash(f"Asset '{asset.name}' returned to inventory", "success")
+    else:
+        flash("That asset is not currently assigned", "error")
+    next_url = request.form.get("next", "")
+    if not next_url.startswith("/") or next_url.startswith("//"):
+        next_url = url_for("admin.admin_view_assignments")
+    return redirect(next_url)
+
+
+@bp.route("/admin/holders/")
+@admin_required
+@read_replica
+def admin_holder_assets():
+    holder = request.args.get("name", "").strip()
+    held = holdings(holder) if holder else []
+    return render_template("admin/holder_assets.html", holder=holder, held=held)
+
+
+@bp.route("/admin/assignments/assign/<int:asset_id>/", methods=["POST"])
 @admin_required
 def admin_assign_asset(asset_id):
     form = AssignmentForm()
     if not form.validate_on_submit():
         flash("Please provide assignee name", "error")
-        return redirect(url_for("admin_view_assignments"))
+        return redirect(url_for("admin.admin_view_assignments"))
 
+    asset = Asset.query.get_or_404(asset_id)
+    if _is_stale(asset):
+        return _version_conflict(asset_id)
+    close_open_assignments([asset.id])
     assignment = AssetAssignment(
         asset_id=asset_id,
         assigned_to=form.assigned_to.data,
-        assigned_at=None
+        assigned_at=datetime.utcnow()
     )
-    asset = Asset.query.get_or_404(asset_id)
     asset.current_holder = form.assigned_to.data
     asset.current_status = AssetStatus.ASSIGNED
 
     db.session.add(assignment)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except StaleDataError:
+        return _version_conflict(asset_id)
     flash("Asset assigned", "success")
-    return redirect(url_for("admin_view_assignments"))
+    return redirect(url_for("admin.admin_view_assignments"))
 
 
-@app.route("/admin/assign/<int:asset_id>/", methods=["GET", "POST"])
+@bp.route("/admin/assign/<int:asset_id>/", methods=["GET", "POST"])
 @admin_required
 def admin_assigning_asset(asset_id):
     asset = Asset.query.get_or_404(asset_id)
     form = AssignmentForm()
 
     if form.validate_on_submit():
+        if _is_stale(asset):
+            return _version_conflict(asset_id)
+        close_open_assignments([asset.id])
         new_assignment = AssetAssignment(
             asset_id=asset.id,
             assigned_to=form.assigned_to.data,
@@ -345,41 +570,133 @@ def admin_assigning_asset(asset_id):
         )
         db.session.add(new_assignment)
         db.session.add(status_change)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            return _version_conflict(asset_id)
 
         flash(f"Asset '{asset.name}' assigned to {form.assigned_to.data}", "success")
-        return redirect(url_for("admin_view_assignments"))
+        return redirect(url_for("admin.admin_view_assignments"))
 
     return render_template("admin/assign_asset.html", asset=asset, form=form)
 
 # ---------- HISTORY ----------
-@app.route("/admin/history/<int:asset_id>/")
+@bp.route("/admin/history/<int:asset_id>/")
 @admin_required
+@read_replica
 def admin_view_status_history(asset_id):
     asset = Asset.query.get_or_404(asset_id)
-    history = AssetStatusHistory.query.filter_by(asset_id=asset_id).order_by(AssetStatusHistory.timestamp.desc()).all()
-    assignments = AssetAssignment.query.filter_by(asset_id=asset_id).order_by(AssetAssignment.assigned_at.desc()).all()
+    # newest rows come from the hot tables; paging back past the retention window reads the archive
+    per_page = current_app.config['HISTORY_PER_PAGE']
+    history = asset_history_page("history", asset_id, per_page, after=request.args.get('history_after'))
+    assignments = asset_history_page("assignments", asset_id, per_page,
+                                     after=request.args.get('assignments_after'))
     return render_template("admin/view_status_history.html", asset=asset, history=history, assignments=assignments)
 
 
-@app.route('/admin/vendor/<int:vendor_id>/assets')
+@bp.route('/admin/vendor/<int:vendor_id>/assets')
 def view_vendor_assets(vendor_id):
     vendor = Vendor.query.get_or_404(vendor_id)
     vendor_assets = db.session.query(Asset, AssetCategory.name).join(
         AssetCategory, Asset.category_id == AssetCategory.id
     ).filter(Asset.vendor_id == vendor_id).all()
-    total_quantity = db.session.query(func.sum(Asset.quantity)).filter(
-        Asset.vendor_id == vendor_id
-    ).scalar() or 0
     return render_template(
         'admin/vendor_assets.html',
         vendor=vendor,
         vendor_assets=vendor_assets,
-        total_quantity=int(total_quantity)
+        total_quantity=vendor.total_quantity
+    )
+
+
+# ---------- REPORTS ----------
+@bp.route("/admin/reports/utilization/")
+@admin_required
+@read_replica
+def admin_utilization_report():
+    dimension = request.args.get('by', 'category')
+    if dimension not in DIMENSIONS:
+        abort(404)
+    start = _parse_day(request.args.get('start'))
+    end = _parse_day(request.args.get('end'))
+    return render_template(
+        "admin/utilization.html", rows=utilization_report(dimension, start, end), dimension=dimension,
+        statuses=STATUSES, start=start, end=end, rolled_up_through=rolled_up_through()
+    )
+
+
+@bp.route("/admin/assets/as-of/")
+@admin_required
+@read_replica
+def admin_assets_as_of():
+    # ?at= takes a date (end of that day) or a date and time, in UTC. Assets
+    # deleted since are missing from every snapshot, however old.
+    at = _parse_moment(request.args.get('at')) or datetime.utcnow()
+    snapshot = inventory_as_of(at)
+    status = request.args.get('status')
+    per_page = request.args.get('per_page', current_app.config['ASSETS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['ASSETS_MAX_PER_PAGE']))
+    page = max(1, request.args.get('page', 1, type=int))
+    total, shown = snapshot.page(
+        (page - 1) * per_page, per_page,
+        category=request.args.get('category', type=int), vendor=request.args.get('vendor', type=int),
+        status=AssetStatus[status] if status in AssetStatus.__members__ else None,
+        holder=(request.args.get('holder') or "").strip()
+    )
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({**snapshot.to_dict(shown), "total": total, "page": page, "per_page": per_page})
+    return render_template(
+        "admin/assets_as_of.html", snapshot=snapshot, assets=shown, total=total, page=page,
+        per_page=per_page, categories={c.id: c.name for c in get_categories()},
+        vendors={v.id: v.vendor_name for v in get_vendors()}
+    )
+
+
+def _parse_moment(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value) if "T" in value or " " in value.strip() \
+            else datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1, microseconds=-1)
+    except ValueError:
+        return None
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except ValueError:
+        return None
+
+
+# ---------- INSTRUMENTATION ----------
+@bp.route("/admin/requests/")
+@admin_required
+def admin_recent_requests():
+    profiles = recent_requests()
+    if request.args.get("flagged"):
+        profiles = [p for p in profiles if p.repeated or p.duration_ms >= current_app.config["SLOW_REQUEST_MS"]]
+    return render_template(
+        "admin/recent_requests.html", profiles=profiles, enabled=current_app.config["SQL_PROFILING"],
+        slow_ms=current_app.config["SLOW_REQUEST_MS"]
+    )
+
+
+# ---------- EXPORTS ----------
+@bp.route("/admin/export/<name>.<fmt>")
+@admin_required
+@read_replica
+def admin_export(name, fmt):
+    if name not in EXPORTS or fmt not in EXPORT_FORMATS:
+        abort(404)
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+    return Response(
+        stream_with_context(stream_export(name, fmt)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
-@app.route("/admin_logout/")
+@bp.route("/admin_logout/")
 def admin_logout():
     session.pop("admin_loggedin", None)
     return redirect('/')
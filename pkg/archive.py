@@ -0,0 +1,288 @@
+import enum
+import functools
+import gzip
+import json
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy import DateTime, Enum, delete, func, insert, select
+
+from pkg.models import db, AssetAssignment, AssetStatus, AssetStatusHistory, ArchiveSegment, ArchiveSegmentAsset
+from pkg.pagination import KeysetPage, chunks, decode_cursor, encode_cursor, keyset_query
+
+# order_col: what the history page sorts by; retire_col: what must be older than the cutoff
+ArchivedTable = namedtuple("ArchivedTable", "model order_col retire_col")
+
+ARCHIVED_TABLES = {
+    "history": ArchivedTable(AssetStatusHistory, "timestamp", "timestamp"),
+    # open assignments are never archived, however old
+    "assignments": ArchivedTable(AssetAssignment, "assigned_at", "returned_at"),
+}
+
+
+def archive_dir():
+    return current_app.config["ARCHIVE_DIR"]
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _restore(table, record):
+    # archived rows come back as plain objects shaped like the ORM rows
+    for column in table.columns:
+        value = record.get(column.name)
+        if value is None:
+            continue
+        if isinstance(column.type, DateTime):
+            record[column.name] = datetime.fromisoformat(value)
+        elif isinstance(column.type, Enum) and column.type.enum_class:
+            record[column.name] = column.type.enum_class[value]
+    return SimpleNamespace(archived=True, **record)
+
+
+class ArchiveReport:
+    def __init__(self):
+        self.rows = {}
+        self.segments = 0
+
+    def add(self, name, count):
+        self.rows[name] = self.rows.get(name, 0) + count
+        self.segments += 1
+
+
+def write_segment(path, rows):
+    # write beside the final name and rename, so a segment file is either whole or absent
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps({k: _plain(v) for k, v in row.items()}) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _archive_batch(name, spec, cutoff, batch_size):
+    """Move one batch of rows older than ``cutoff`` into a new segment; returns the row count."""
+    table = spec.model.__table__
+    order_col, retire_col = table.c[spec.order_col], table.c[spec.retire_col]
+    rows = db.session.execute(
+        select(table).where(retire_col < cutoff).order_by(table.c.id).limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return 0
+
+    filename = f"{name}/{rows[0]['id']:012d}-{rows[-1]['id']:012d}.jsonl.gz"
+    path = os.path.join(archive_dir(), filename)
+    write_segment(path, rows)
+
+    per_asset = {}
+    for row in rows:
+        when = row[order_col.name]
+        count, oldest, newest = per_asset.get(row["asset_id"], (0, when, when))
+        if when is not None:
+            oldest = min(oldest or when, when)
+            newest = max(newest or when, when)
+        per_asset[row["asset_id"]] = (count + 1, oldest, newest)
+    times = [row[order_col.name] for row in rows if row[order_col.name] is not None]
+
+    try:
+        segment = ArchiveSegment(
+            table_name=name, filename=filename, row_count=len(rows),
+            oldest=min(times, default=None), newest=max(times, default=None)
+        )
+        db.session.add(segment)
+        db.session.flush()
+        db.session.execute(insert(ArchiveSegmentAsset.__table__), [
+            {"segment_id": segment.id, "asset_id": asset_id, "table_name": name,
+             "row_count": count, "oldest": oldest, "newest": newest}
+            for asset_id, (count, oldest, newest) in per_asset.items() if asset_id is not None
+        ])
+        ids = [row["id"] for row in rows]
+        for chunk in chunks(ids):
+            db.session.execute(delete(table).where(table.c.id.in_(chunk)))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        os.remove(path)
+        raise
+    return len(rows)
+
+
+def archive_old_rows(names=None, older_than_days=None, batch_size=None, max_batches=None, pause=0.0,
+                     progress=None):
+    """Move history/assignment rows older than the retention window into archive segments.
+
+    Each batch is its own short transaction (one SELECT, one file, a few
+    id-list DELETEs), so the hot tables are never locked for long and an
+    interrupted run simply resumes where it stopped.
+    """
+    config = current_app.config
+    older_than_days = config["HISTORY_RETENTION_DAYS"] if older_than_days is None else older_than_days
+    batch_size = batch_size or config["ARCHIVE_BATCH_SIZE"]
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    report = ArchiveReport()
+    for name in names or ARCHIVED_TABLES:
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = _archive_batch(name, ARCHIVED_TABLES[name], cutoff, batch_size)
+            if not moved:
+                break
+            report.add(name, moved)
+            batches += 1
+            if progress:
+                progress(name, moved)
+            if pause:
+                time.sleep(pause)  # let replicas and other writers catch up
+    return report
+
+
+@functools.lru_cache(maxsize=32)
+def _segment_rows(path):
+    # segments are immutable once written, so parsed files can be shared freely
+    by_asset = {}
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            record = json.loads(line)
+            by_asset.setdefault(record.get("asset_id"), []).append(record)
+    return by_asset
+
+
+def iter_archived(name, start=None, end=None):
+    """Every archived ``name`` row from segments overlapping [start, end), as raw dicts."""
+    segments = db.session.query(ArchiveSegment.filename).filter(ArchiveSegment.table_name == name)
+    if start is not None:
+        segments = segments.filter(ArchiveSegment.newest >= start)
+    if end is not None:
+        segments = segments.filter(ArchiveSegment.oldest < end)
+    for (filename,) in segments.order_by(ArchiveSegment.id).all():
+        for records in _segment_rows(os.path.join(archive_dir(), filename)).values():
+            yield from records
+
+
+def iter_segments(name):
+    """Every archived ``name`` segment, oldest first, as a list of raw dicts.
+
+    Files are read one at a time and bypass the parsed-segment cache, so a
+    full pass over a large archive keeps memory flat.
+    """
+    segments = db.session.query(ArchiveSegment.filename).filter(ArchiveSegment.table_name == name)\
+        .order_by(ArchiveSegment.id).all()
+    for (filename,) in segments:
+        with gzip.open(os.path.join(archive_dir(), filename), "rt", encoding="utf-8") as fh:
+            yield [json.loads(line) for line in fh]
+
+
+def find_archived(name, asset_ids, row_ids):
+    """Archived ``name`` rows with the given ids, found through the assets that own them."""
+    wanted = set(row_ids)
+    asset_ids = list(set(asset_ids))
+    segment_ids = set()
+    for chunk in chunks(asset_ids):
+        segment_ids.update(segment_id for (segment_id,) in db.session.query(ArchiveSegmentAsset.segment_id).filter(
+            ArchiveSegmentAsset.table_name == name, ArchiveSegmentAsset.asset_id.in_(chunk)
+        ))
+    table = ARCHIVED_TABLES[name].model.__table__
+    files = db.session.query(ArchiveSegment.filename).filter(ArchiveSegment.id.in_(segment_ids)) if segment_ids else []
+    for (filename,) in files:
+        for records in _segment_rows(os.path.join(archive_dir(), filename)).values():
+            for record in records:
+                if record["id"] in wanted:
+                    yield _restore(table, dict(record))
+
+
+def _archived_rows(name, asset_id, segment_ids):
+    spec = ARCHIVED_TABLES[name]
+    table = spec.model.__table__
+    files = db.session.query(ArchiveSegment.filename).filter(ArchiveSegment.id.in_(segment_ids))
+    for (filename,) in files:
+        for record in _segment_rows(os.path.join(archive_dir(), filename)).get(asset_id, ()):
+            yield _restore(table, dict(record))
+
+
+def _sort_key(spec, row):
+    when = getattr(row, spec.order_col)
+    return (when or datetime.min, row.id)
+
+
+def hot_history_query(name, asset_id, per_page, position=None):
+    """Newest-first page (plus one row) of an asset's rows still in the hot table."""
+    model = ARCHIVED_TABLES[name].model
+    query = model.query.filter(model.asset_id == asset_id)
+    return keyset_query(query, getattr(model, ARCHIVED_TABLES[name].order_col), model.id, per_page,
+                        after_pos=position)
+
+
+def archived_segments_query(name, asset_id, position=None):
+    """Segments holding an asset's archived rows, from the per-asset segment index."""
+    segments = db.session.query(ArchiveSegmentAsset.segment_id).filter(
+        ArchiveSegmentAsset.asset_id == asset_id, ArchiveSegmentAsset.table_name == name
+    )
+    if position:
+        segments = segments.filter(ArchiveSegmentAsset.oldest <= position[0])
+    return segments
+
+
+def asset_history_page(name, asset_id, per_page, after=None):
+    """Newest-first page of an asset's history or assignments, continuing into the archive.
+
+    The hot table is read first; archive segments are only opened once the
+    page reaches back past the newest archived row for this asset.
+    """
+    spec = ARCHIVED_TABLES[name]
+    model = spec.model
+    position = decode_cursor(after)
+
+    hot = hot_history_query(name, asset_id, per_page, position).all()
+    rows = [SimpleNamespace(archived=False, **{c.key: getattr(r, c.key) for c in model.__table__.columns})
+            for r in hot]
+
+    segments = archived_segments_query(name, asset_id, position)
+    if len(rows) > per_page:
+        # a full hot page only needs the archive if archived rows sort in between
+        boundary = getattr(rows[per_page - 1], spec.order_col)
+        if boundary is not None:
+            segments = segments.filter(ArchiveSegmentAsset.newest >= boundary)
+    segment_ids = [segment_id for (segment_id,) in segments]
+    if segment_ids:
+        archived = _archived_rows(name, asset_id, segment_ids)
+        if position:
+            archived = (r for r in archived if _sort_key(spec, r) < (position[0], position[1]))
+        rows = sorted([*rows, *archived], key=lambda r: _sort_key(spec, r), reverse=True)[:per_page + 1]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        if getattr(last, spec.order_col) is not None:
+            next_cursor = encode_cursor(getattr(last, spec.order_col), last.id)
+    return KeysetPage(rows, next_cursor, None, per_page)
+
+
+def initial_statuses(assets):
+    """{asset id: status at creation} for (asset id, current status) pairs.
+
+    The status an asset was created in is not recorded: one with any status
+    change, hot or archived, started out as the model default; one without
+    any has been in its current status throughout.
+    """
+    with_history = {a for (a,) in db.session.query(AssetStatusHistory.asset_id).distinct()}
+    with_history.update(a for (a,) in db.session.query(ArchiveSegmentAsset.asset_id)
+                        .filter(ArchiveSegmentAsset.table_name == "history").distinct())
+    return {asset_id: AssetStatus.INVENTORY if asset_id in with_history else status for asset_id, status in assets}
+
+
+def archive_stats():
+    """{table name: (segments, rows, oldest, newest)} for what has been archived so far."""
+    rows = db.session.query(
+        ArchiveSegment.table_name, func.count(ArchiveSegment.id), func.sum(ArchiveSegment.row_count),
+        func.min(ArchiveSegment.oldest), func.max(ArchiveSegment.newest),
+    ).group_by(ArchiveSegment.table_name)
+    return {name: (segments, total or 0, oldest, newest) for name, segments, total, oldest, newest in rows}
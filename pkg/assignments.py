@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from pkg.models import db, Asset, AssetAssignment, AssetStatusHistory, AssetStatus
+from pkg.pagination import chunks
+
+
+def close_open_assignments(asset_ids, when=None):
+    """Mark any open assignment of these assets as returned (part of the caller's transaction)."""
+    when = when or datetime.utcnow()
+    table = AssetAssignment.__table__
+    for chunk in chunks(list(asset_ids)):
+        db.session.execute(
+            update(table)
+            .where(table.c.asset_id.in_(chunk), table.c.returned_at.is_(None))
+            .values(returned_at=when)
+        )
+
+
+def open_assignment(asset_id):
+    return AssetAssignment.query.filter(
+        AssetAssignment.asset_id == asset_id,
+        AssetAssignment.returned_at.is_(None)
+    ).order_by(AssetAssignment.assigned_at.desc()).first()
+
+
+def holdings_query(holder):
+    """Assets currently held by ``holder``: a seek on the open-holder index."""
+    return db.session.query(AssetAssignment, Asset)\
+        .join(Asset, Asset.id == AssetAssignment.asset_id)\
+        .filter(AssetAssignment.assigned_to == holder, AssetAssignment.returned_at.is_(None))\
+        .order_by(AssetAssignment.assigned_at.desc())
+
+
+def holdings(holder):
+    return holdings_query(holder).all()
+
+
+def assignment_log_query(since):
+    """Assignments made since ``since``, with the asset name, for the newest-first log."""
+    return db.session.query(AssetAssignment, Asset.name.label("asset_name"))\
+        .join(Asset, Asset.id == AssetAssignment.asset_id)\
+        .filter(AssetAssignment.assigned_at >= since)
+
+
+def return_asset(asset, changed_by, note=""):
+    """Close the asset's open assignment and put it back into inventory.
+
+    Returns False if the asset was not out.
+    """
+    if open_assignment(asset.id) is None and asset.current_status != AssetStatus.ASSIGNED:
+        return False
+    now = datetime.utcnow()
+    close_open_assignments([asset.id], now)
+    asset.current_holder = None
+    asset.current_status = AssetStatus.INVENTORY
+    db.session.add(AssetStatusHistory(
+        asset_id=asset.id,
+        status=AssetStatus.INVENTORY,
+        changed_by=changed_by,
+        note=note or "Returned",
+        timestamp=now,
+    ))
+    return True
@@ -0,0 +1,184 @@
+import logging
+import re
+from datetime import datetime
+
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+from pkg.models import db, Asset, AssetAssignment, AssetStatusHistory, AssetStatus
+from pkg.assignments import close_open_assignments
+from pkg.pagination import chunks
+from pkg.serials import serial_key
+from pkg.stats import dashboard_changed
+
+logger = logging.getLogger(__name__)
+
+
+class BulkReport:
+    def __init__(self):
+        self.updated = []  # asset ids changed
+        self.failures = []  # (id or serial, reason)
+
+    def fail(self, ref, reason):
+        self.failures.append((ref, reason))
+
+    def to_dict(self):
+        return {
+            "updated": len(self.updated),
+            "asset_ids": self.updated,
+            "failures": [{"asset": ref, "reason": reason} for ref, reason in self.failures],
+        }
+
+
+def parse_refs(ids, serials):
+    """Normalise posted asset ids and a free-text list of serials."""
+    asset_ids, bad = [], []
+    for raw in ids:
+        raw = str(raw).strip()
+        if not raw:
+            continue
+        if raw.isdigit():
+            asset_ids.append(int(raw))
+        else:
+            bad.append(raw)
+    if isinstance(serials, str):
+        serials = re.split(r"[\s,;]+", serials)
+    serial_list = [s.strip() for s in serials if s and s.strip()]
+    return list(dict.fromkeys(asset_ids)), list(dict.fromkeys(serial_list)), bad
+
+
+def resolve_assets(asset_ids, serials, report):
+    """Return {asset id: (serial, status, version)} for the requested assets; unknown refs go to the report."""
+    found = {}
+    cols = (Asset.id, Asset.serial_number, Asset.current_status, Asset.version)
+    for chunk in chunks(asset_ids):
+        for asset_id, serial, status, version in db.session.query(*cols).filter(Asset.id.in_(chunk)):
+            found[asset_id] = (serial, status, version)
+    missing_ids = set(asset_ids) - set(found)
+    for asset_id in asset_ids:
+        if asset_id in missing_ids:
+            report.fail(asset_id, "No asset with this id")
+
+    # the database may hand back another spelling of the serial asked for (see serial_key)
+    by_serial = {}
+    for chunk in chunks(serials):
+        for asset_id, serial, status, version in db.session.query(*cols).filter(Asset.serial_number.in_(chunk)):
+            by_serial[serial_key(serial)] = asset_id
+            found[asset_id] = (serial, status, version)
+    for serial in serials:
+        if serial_key(serial) not in by_serial:
+            report.fail(serial, "No asset with this serial number")
+    return found
+
+
+def _update_unchanged(assets, targets, **values):
+    """UPDATE the targets only where their version is still the one we read.
+
+    Any row changed concurrently makes the affected count come up short and
+    raises StaleDataError, so the caller's transaction is rolled back whole.
+    """
+    table = Asset.__table__
+    for chunk in chunks(targets):
+        result = db.session.execute(
+            update(table)
+            .where(tuple_(table.c.id, table.c.version).in_([(i, assets[i][2]) for i in chunk]))
+            .values(version=table.c.version + 1, **values)
+        )
+        if result.rowcount != len(chunk):
+            raise StaleDataError(
+                f"{len(chunk) - result.rowcount} assets were changed by someone else; nothing was changed"
+            )
+
+
+def _failure_reason(e, action, count):
+    # raw exception text carries SQL and parameters, so the admin only gets a fixed message
+    if isinstance(e, StaleDataError):
+        logger.info("bulk %s of %d assets lost a race: %s", action, count, e)
+        return "Changed by someone else in the meantime; nothing was changed"
+    logger.exception("bulk %s of %d assets failed", action, count)
+    if isinstance(e, IntegrityError):
+        return "Rejected by the database; nothing was changed"
+    if isinstance(e, OperationalError):
+        return "Database busy or unavailable; try again"
+    return "Unexpected error; nothing was changed"
+
+
+def bulk_change_status(asset_ids, serials, new_status, changed_by, note=""):
+    """One UPDATE and one multi-row history INSERT for all requested assets, in one transaction.
+
+    ASSIGNED is refused: an assignment needs a holder, which bulk_assign takes.
+    """
+    report = BulkReport()
+    assets = resolve_assets(asset_ids, serials, report)
+    targets = []
+    for asset_id, (serial, status, _) in assets.items():
+        if new_status == AssetStatus.ASSIGNED:
+            report.fail(serial or asset_id, "Assigning needs a holder; use bulk assign")
+        elif status == new_status:
+            report.fail(serial or asset_id, f"Already {new_status.value}")
+        else:
+            targets.append(asset_id)
+    if not targets:
+        return report
+
+    now = datetime.utcnow()
+    try:
+        # out of ASSIGNED means nobody holds them any more
+        _update_unchanged(assets, targets, current_status=new_status, current_holder=None)
+        close_open_assignments(targets, now)
+        db.session.execute(insert(AssetStatusHistory.__table__), [
+            {"asset_id": asset_id, "status": new_status, "changed_by": changed_by,
+             "note": note, "timestamp": now}
+            for asset_id in targets
+        ])
+        dashboard_changed(db.session)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        reason = _failure_reason(e, "status change", len(targets))
+        for asset_id in targets:
+            report.fail(assets[asset_id][0] or asset_id, f"Not updated: {reason}")
+        return report
+
+    report.updated = targets
+    return report
+
+
+def bulk_assign(asset_ids, serials, assigned_to, changed_by, note=""):
+    """Assign many assets to one holder: one UPDATE plus multi-row assignment and history INSERTs."""
+    report = BulkReport()
+    assets = resolve_assets(asset_ids, serials, report)
+    targets = []
+    for asset_id, (serial, status, _) in assets.items():
+        if status == AssetStatus.RETIRED:
+            report.fail(serial or asset_id, "Retired assets cannot be assigned")
+        else:
+            targets.append(asset_id)
+    if not targets:
+        return report
+
+    now = datetime.utcnow()
+    try:
+        _update_unchanged(assets, targets, current_holder=assigned_to, current_status=AssetStatus.ASSIGNED)
+        close_open_assignments(targets, now)
+        db.session.execute(insert(AssetAssignment.__table__), [
+            {"asset_id": asset_id, "assigned_to": assigned_to, "assigned_at": now}
+            for asset_id in targets
+        ])
+        db.session.execute(insert(AssetStatusHistory.__table__), [
+            {"asset_id": asset_id, "status": AssetStatus.ASSIGNED, "changed_by": changed_by,
+             "note": note, "timestamp": now}
+            for asset_id in targets
+        ])
+        dashboard_changed(db.session)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        reason = _failure_reason(e, "assignment", len(targets))
+        for asset_id in targets:
+            report.fail(assets[asset_id][0] or asset_id, f"Not assigned: {reason}")
+        return report
+
+    report.updated = targets
+    return report
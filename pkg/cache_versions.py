@@ -0,0 +1,39 @@
+"""Shared version counters for in-process caches, one row per cache in cache_versions.
+
+A write that changes cached data bumps the cache's row inside its own
+transaction, so the bump commits or rolls back with it. Every worker reads
+the counter once per request and treats anything it cached under another
+version as stale.
+"""
+from flask import g, has_app_context
+from sqlalchemy import insert, select, update
+
+from pkg.models import db, CacheVersion
+
+
+def _key(name):
+    return f"{name}_shared_version"
+
+
+def shared_version(name):
+    # one primary-key read per request, however often the cache is used
+    if not hasattr(g, _key(name)):
+        setattr(g, _key(name), db.session.execute(
+            select(CacheVersion.version).where(CacheVersion.name == name)
+        ).scalar() or 0)
+    return getattr(g, _key(name))
+
+
+def forget_shared_version(name):
+    # after a local change, so the rest of the request reads the bumped counter
+    if has_app_context():
+        g.pop(_key(name), None)
+
+
+def bump_shared_version(session, name):
+    table = CacheVersion.__table__
+    bumped = session.execute(
+        update(table).where(table.c.name == name).values(version=table.c.version + 1)
+    ).rowcount
+    if not bumped:
+        session.execute(insert(table).values(name=name, version=1))
@@ -0,0 +1,257 @@
+import click
+from flask.cli import ScriptInfo, with_appcontext
+
+DEFAULT_CATEGORIES = ["Laptop", "Monitors", "Cables", "Keyboards", "Mouse"]
+
+
+def seed_categories(names=DEFAULT_CATEGORIES):
+    """Add ``names`` as asset categories unless any category exists yet; returns how many were added."""
+    from pkg.models import db, AssetCategory
+
+    if db.session.query(AssetCategory.id).limit(1).scalar() is not None:
+        return 0
+    db.session.add_all([AssetCategory(name=name) for name in names])
+    db.session.commit()
+    return len(names)
+
+
+class LazyMigrateGroup(click.Group):
+    """``flask db``, importing Flask-Migrate (and Alembic) only when a migration command runs."""
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_group
+        from pkg.models import db
+
+        app = parent.ensure_object(ScriptInfo).load_app()
+        if "migrate" not in app.extensions:
+            Migrate(app, db)
+        return db_group.make_context(info_name, args, parent=parent, **extra)
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Create any missing tables (use `flask db upgrade` on managed databases)."""
+    from pkg.models import db
+
+    db.create_all()
+    click.echo("Database tables created.")
+
+
+@click.command("seed-categories")
+@with_appcontext
+def seed_categories_command():
+    """Add the default asset categories to an empty category table."""
+    added = seed_categories()
+    if added:
+        click.echo(f"Added {added} categories to the database.")
+    else:
+        click.echo("Categories already exist in the database. No new categories added.")
+
+
+@click.command("import-assets")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None,
+              help="File format (guessed from the extension by default).")
+@click.option("--batch-size", type=int, default=None, help="Rows per INSERT batch.")
+@with_appcontext
+def import_assets_command(path, fmt, batch_size):
+    """Bulk-import assets from a CSV or JSONL file."""
+    from pkg.importer import import_assets, iter_rows, detect_format
+
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        report = import_assets(iter_rows(fh, fmt or detect_format(path)), batch_size=batch_size)
+
+    for line, serial, message in report.errors:
+        click.echo(f"line {line or '?'} [{serial or '-'}]: {message}", err=True)
+    click.echo(f"Imported {report.inserted} assets, rejected {report.failed} rows.")
+
+
+@click.command("stocktake")
+@click.argument("scan_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--include-assigned", is_flag=True, help="Also expect assigned assets to be scanned.")
+@click.option("--vendor-id", type=int, default=None, help="Only audit this vendor's assets.")
+@click.option("--category-id", type=int, default=None, help="Only audit this category.")
+@click.option("--json", "as_json", is_flag=True, help="Print the full diff as JSON.")
+@with_appcontext
+def stocktake_command(scan_file, include_assigned, vendor_id, category_id, as_json):
+    """Reconcile a file of scanned serial numbers ('-' for stdin) against the register."""
+    import json
+    from pkg.stocktake import reconcile, iter_scans
+
+    report = reconcile(iter_scans(scan_file), include_assigned=include_assigned,
+                       vendor_id=vendor_id, category_id=category_id)
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(), indent=2))
+        return
+    for serial, name, status, holder in report.missing:
+        click.echo(f"missing   {serial}  {name} ({status.value}{', ' + holder if holder else ''})")
+    for serial, name, problem in report.mismatches:
+        click.echo(f"mismatch  {serial}  {name}: {problem}")
+    for line, serial in report.unknown:
+        click.echo(f"unknown   {serial}  (line {line})")
+    for line, serial in report.duplicates:
+        click.echo(f"duplicate {serial}  (line {line})")
+    click.echo(f"Scanned {report.scanned}, found {report.found}, missing {len(report.missing)}, "
+               f"unknown {len(report.unknown)}, mismatched {len(report.mismatches)}.")
+
+
+@click.command("generate-thumbnails")
+@click.option("--force", is_flag=True, help="Rebuild variants that already exist.")
+@with_appcontext
+def generate_thumbnails_command(force):
+    """Build thumbnail/medium variants for uploaded asset pictures."""
+    import os
+    from pkg.images import generate_variants, upload_folder, variant_filename
+    from pkg.models import db, Asset
+
+    folder = upload_folder()
+    built = skipped = failed = 0
+    pictures = db.session.query(Asset.picture).filter(Asset.picture.isnot(None)).distinct()
+    for (picture,) in pictures:
+        if not force and os.path.exists(os.path.join(folder, variant_filename(picture, "thumb"))):
+            skipped += 1
+            continue
+        try:
+            generate_variants(folder, picture)
+            built += 1
+        except Exception as e:
+            failed += 1
+            click.echo(f"{picture}: {e}", err=True)
+    click.echo(f"Built {built}, skipped {skipped}, failed {failed}.")
+
+
+@click.command("build-static")
+@click.option("--no-compress", is_flag=True, help="Only write the fingerprint manifest.")
+@with_appcontext
+def build_static_command(no_compress):
+    """Fingerprint static files and write gzip/brotli variants."""
+    from flask import current_app
+    from pkg.static_assets import build_static, brotli
+
+    hashed, written = build_static(current_app, compress=not no_compress)
+    click.echo(f"Fingerprinted {hashed} files, wrote {written} compressed variants.")
+    if brotli is None and not no_compress:
+        click.echo("brotli is not installed; only gzip variants were written.")
+
+
+@click.command("rebuild-search-index")
+@with_appcontext
+def rebuild_search_index_command():
+    """Create (if needed) and repopulate the asset full-text index."""
+    from pkg.search import rebuild_search_index
+
+    rebuild_search_index()
+    click.echo("Search index rebuilt.")
+
+
+@click.command("check-query-plans")
+@click.option("--scratch", is_flag=True,
+              help="Check against a freshly seeded temporary SQLite database instead of the app database.")
+@with_appcontext
+def check_query_plans_command(scratch):
+    """EXPLAIN the hot route queries and fail if any does a full table scan."""
+    import os
+    import tempfile
+    from sqlalchemy import create_engine
+    from pkg.models import db
+    from pkg.queryplans import check_query_plans, seed_for_plans
+
+    if scratch:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                seed_for_plans(conn)
+            with engine.connect() as conn:
+                failures = check_query_plans(conn)
+        finally:
+            engine.dispose()
+            os.remove(path)
+    else:
+        with db.engine.connect() as conn:
+            failures = check_query_plans(conn)
+
+    for name, scans in failures:
+        click.echo(f"FAIL {name}: {'; '.join(scans)}", err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo("All route queries use indexes.")
+
+
+@click.command("archive-history")
+@click.option("--table", "tables", type=click.Choice(["history", "assignments"]), multiple=True,
+              help="Only archive this table (repeatable; default both).")
+@click.option("--older-than-days", type=int, default=None,
+              help="Retention window (default HISTORY_RETENTION_DAYS).")
+@click.option("--batch-size", type=int, default=None, help="Rows per archive segment and transaction.")
+@click.option("--max-batches", type=int, default=None, help="Stop after this many batches per table.")
+@click.option("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+@with_appcontext
+def archive_history_command(tables, older_than_days, batch_size, max_batches, pause):
+    """Move old status history and closed assignments into compressed archive files."""
+    from pkg.archive import archive_old_rows, archive_stats
+
+    report = archive_old_rows(
+        names=tables or None, older_than_days=older_than_days, batch_size=batch_size,
+        max_batches=max_batches, pause=pause,
+        progress=lambda name, moved: click.echo(f"{name}: archived {moved} rows", err=True)
+    )
+    moved = ", ".join(f"{count} {name} rows" for name, count in report.rows.items()) or "nothing"
+    click.echo(f"Archived {moved} in {report.segments} segments.")
+    for name, (segments, rows, oldest, newest) in sorted(archive_stats().items()):
+        span = f", {oldest:%Y-%m-%d} to {newest:%Y-%m-%d}" if oldest and newest else ""
+        click.echo(f"{name}: {rows} rows in {segments} segments{span}")
+
+
+@click.command("rollup-utilization")
+@click.option("--rebuild", is_flag=True, help="Drop the existing rollups and recompute from the first event.")
+@click.option("--chunk-days", type=int, default=None, help="Days per transaction (default UTILIZATION_CHUNK_DAYS).")
+@with_appcontext
+def rollup_utilization_command(rebuild, chunk_days):
+    """Roll status history up into daily time-in-status totals, through yesterday."""
+    from pkg.utilization import roll_up_utilization
+
+    report = roll_up_utilization(rebuild=rebuild, chunk_days=chunk_days,
+                                 progress=lambda day: click.echo(f"  up to {day}", err=True))
+    if not report.days:
+        click.echo("Rollups are already up to date.")
+        return
+    click.echo(f"Rolled up {report.days} days ({report.first_day} to {report.last_day}): "
+               f"{report.events} status changes, {report.rows} rollup rows.")
+
+
+@click.command("checkpoint-inventory")
+@click.option("--at", "at", type=click.DateTime(), default=None, help="Checkpoint time (default now, UTC).")
+@click.option("--backfill-days", type=int, default=None,
+              help="Instead, add a checkpoint every N days from the first asset up to now.")
+@with_appcontext
+def checkpoint_inventory_command(at, backfill_days):
+    """Save every asset's status and holder as a checkpoint for "as of" queries."""
+    from pkg.snapshots import backfill_checkpoints, take_checkpoint
+
+    if backfill_days:
+        created = backfill_checkpoints(backfill_days, progress=lambda day: click.echo(f"  {day}", err=True))
+        click.echo(f"Added {len(created)} checkpoints.")
+        return
+    checkpoint = take_checkpoint(at)
+    click.echo(f"Checkpoint of {checkpoint.asset_count} assets at {checkpoint.taken_at} in {checkpoint.filename}.")
+
+
+def register_commands(app):
+    app.cli.add_command(LazyMigrateGroup("db", help="Perform database migrations."))
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_categories_command)
+    app.cli.add_command(import_assets_command)
+    app.cli.add_command(stocktake_command)
+    app.cli.add_command(generate_thumbnails_command)
+    app.cli.add_command(build_static_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(archive_history_command)
+    app.cli.add_command(rollup_utilization_command)
+    app.cli.add_command(checkpoint_inventory_command)
@@ -0,0 +1,88 @@
+import functools
+import time
+
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import CompoundSelect, Select
+
+REPLICA = "replica"
+
+
+def engine_options(uri, config):
+    """SQLAlchemy engine/pool options for ``uri`` from the DB_* config values."""
+    options = {
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+    }
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # in-memory SQLite uses a SingletonThreadPool, which has no size/overflow
+        return options
+    options.update(
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+    )
+    if backend == "mysql":
+        connect_args = {"connect_timeout": config["DB_CONNECT_TIMEOUT"]}
+        if config["DB_READ_TIMEOUT"]:
+            connect_args["read_timeout"] = config["DB_READ_TIMEOUT"]
+            connect_args["write_timeout"] = config["DB_READ_TIMEOUT"]
+        options["connect_args"] = connect_args
+    return options
+
+
+def configure_database(app):
+    """Fill in SQLALCHEMY_ENGINE_OPTIONS and the optional replica bind.
+
+    Anything already set in SQLALCHEMY_ENGINE_OPTIONS (e.g. in instance
+    config.py) wins over the DB_* derived values.
+    """
+    config = app.config
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if uri:
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            **engine_options(uri, config), **config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        }
+    replica_uri = config.get("DATABASE_REPLICA_URI")
+    if replica_uri:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(REPLICA, {"url": replica_uri, **engine_options(replica_uri, config)})
+        config["SQLALCHEMY_BINDS"] = binds
+
+        @app.after_request
+        def _stick_to_primary(response):
+            # read-your-writes: after a write, this browser reads from the
+            # primary until the replica has had time to catch up
+            if g.pop("db_wrote", False):
+                session["db_primary_until"] = time.time() + config["DB_REPLICA_STICKY_SECONDS"]
+            return response
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the replica bind inside ``@read_replica`` views.
+
+    Flushes and every statement that is not a SELECT construct go to the
+    primary. That includes text() SQL, which could be DML. Every read after
+    them in the same session goes to the primary too.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or not isinstance(clause, (Select, CompoundSelect)):
+                self.info["db_wrote"] = g.db_wrote = True
+            elif g.get("db_read_replica") and not self.info.get("db_wrote") and REPLICA in self._db.engines:
+                return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(fn):
+    """Let a GET-only view read from the replica bind, when one is configured."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if request.method in ("GET", "HEAD") and session.get("db_primary_until", 0) < time.time():
+            g.db_read_replica = True
+        return fn(*args, **kwargs)
+    return wrapper
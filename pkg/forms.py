@@ -1,7 +1,7 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, SelectField, FileField,  PasswordField, SubmitField, TextAreaField
-from flask_wtf.file import FileAllowed
-from wtforms.validators import DataRequired, Email, Optional
+from wtforms import StringField, SelectField, FileField,  PasswordField, SubmitField, TextAreaField, IntegerField, BooleanField
+from flask_wtf.file import FileAllowed, FileRequired
+from wtforms.validators import DataRequired, Email, Optional, NumberRange
 from pkg.models import AssetStatus
 from enum import Enum
 
@@ -25,7 +25,7 @@ class AssetForm(FlaskForm):
     serial_number = StringField("Serial Number", validators=[DataRequired()])
     model_number = StringField("Model Number")
     make = StringField("Make / Manufacturer")
-    quantity = StringField("Quantity", validators=[DataRequired()])
+    quantity = IntegerField("Quantity", validators=[DataRequired(), NumberRange(min=1, message="Quantity must be a whole number of at least 1")])
     picture = FileField('Product Picture',
                             validators=[FileAllowed(['jpg', 'png', 'jpeg'],
                                                     'Images only!')])
@@ -40,15 +40,29 @@ class AssetForm(FlaskForm):
     submit = SubmitField("Add Asset")
 
     def populate_categories(self):
-        from pkg.models import AssetCategory, Vendor
-        self.category_id.choices = [
-            (cat.id, cat.name)
-            for cat in AssetCategory.query.order_by(AssetCategory.name).all()
-        ]
-        self.vendor_id.choices = [
-            (v.id, v.vendor_name)
-            for v in Vendor.query.order_by(Vendor.vendor_name).all()
-        ]
+        from pkg.refdata import category_choices, vendor_choices
+        self.category_id.choices = category_choices()
+        self.vendor_id.choices = vendor_choices()
+
+class AssetImportForm(FlaskForm):
+    data_file = FileField('CSV or JSONL file',
+                          validators=[FileRequired(),
+                                      FileAllowed(['csv', 'jsonl', 'json', 'ndjson'], 'CSV or JSONL files only!')])
+    submit = SubmitField("Import Assets")
+
+class StocktakeForm(FlaskForm):
+    scan_file = FileField('Scanned serials (one per line, or serial,holder)',
+                          validators=[FileRequired(),
+                                      FileAllowed(['csv', 'txt'], 'CSV or text files only!')])
+    vendor_id = SelectField('Vendor', coerce=int, validators=[Optional()])
+    category_id = SelectField('Category', coerce=int, validators=[Optional()])
+    include_assigned = BooleanField('Expect assigned assets to be scanned too')
+    submit = SubmitField("Reconcile")
+
+    def populate_choices(self):
+        from pkg.refdata import category_choices, vendor_choices
+        self.vendor_id.choices = [(0, "All vendors")] + vendor_choices()
+        self.category_id.choices = [(0, "All categories")] + category_choices()
 
 class AssignmentForm(FlaskForm):
     assigned_to = StringField("Assign to (name/department)", validators=[DataRequired()])
@@ -0,0 +1,56 @@
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+_lock = threading.Lock()
+# (fragment name, *key) -> rendered Markup, least recently used first
+_fragments = OrderedDict()
+
+
+def clear_fragments():
+    with _lock:
+        _fragments.clear()
+
+
+def cached_fragment(name, key, render, *args):
+    """``render(*args)`` (usually a macro), reused while ``(name, *key)`` is unchanged.
+
+    The key must cover everything the markup depends on, e.g. an asset's id
+    and version plus any joined names shown in the row, so a stale entry is
+    never hit, only evicted.
+    """
+    size = current_app.config["FRAGMENT_CACHE_SIZE"]
+    if size <= 0 or current_app.jinja_env.auto_reload:
+        # in development the template itself may have changed since it was cached
+        return render(*args)
+    cache_key = (name, *key)
+    with _lock:
+        markup = _fragments.get(cache_key)
+        if markup is not None:
+            _fragments.move_to_end(cache_key)
+            return markup
+
+    markup = Markup(render(*args))
+    with _lock:
+        _fragments[cache_key] = markup
+        while len(_fragments) > size:
+            _fragments.popitem(last=False)
+    return markup
+
+
+def init_templates(app):
+    """Production template settings: persistent bytecode cache and the fragment cache global."""
+    cache_dir = app.config["TEMPLATE_CACHE_DIR"]
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            app.logger.warning("Template bytecode cache disabled: %s", e)
+        else:
+            # compiled templates survive restarts; entries are keyed by a checksum of the source
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    app.jinja_env.globals["cached_fragment"] = cached_fragment
@@ -0,0 +1,91 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, url_for
+
+logger = logging.getLogger(__name__)
+
+# name -> bounding box in pixels; the list page shows 72px thumbs, detail pages ~200px
+VARIANT_SIZES = {
+    "thumb": (160, 160),
+    "medium": (640, 640),
+}
+VARIANT_DIR = "variants"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def upload_folder():
+    return current_app.config["UPLOAD_FOLDER"] or os.path.join(current_app.root_path, "static", "uploaded")
+
+
+def variant_filename(picture, size):
+    stem = os.path.splitext(os.path.basename(picture))[0]
+    return f"{VARIANT_DIR}/{stem}_{size}.webp"
+
+
+def generate_variants(folder, picture, quality=80):
+    """Write resized WebP variants of ``folder/picture``; returns the paths written."""
+    from PIL import Image, ImageOps
+
+    source = os.path.join(folder, picture)
+    os.makedirs(os.path.join(folder, VARIANT_DIR), exist_ok=True)
+    written = []
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        for size, box in VARIANT_SIZES.items():
+            variant = img.copy()
+            variant.thumbnail(box, Image.LANCZOS)
+            target = os.path.join(folder, variant_filename(picture, size))
+            # write to a temp name first so readers never see a half-written file
+            tmp = target + ".tmp"
+            variant.save(tmp, "WEBP", quality=quality, method=4)
+            os.replace(tmp, target)
+            written.append(target)
+    return written
+
+
+def remove_variants(folder, picture):
+    for size in VARIANT_SIZES:
+        try:
+            os.remove(os.path.join(folder, variant_filename(picture, size)))
+        except FileNotFoundError:
+            pass
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config["IMAGE_WORKERS"],
+                thread_name_prefix="thumbnails",
+            )
+        return _executor
+
+
+def _log_failure(picture):
+    def callback(future):
+        exc = future.exception()
+        if exc is not None:
+            logger.warning("Could not build image variants for %s: %s", picture, exc)
+    return callback
+
+
+def schedule_variants(picture):
+    # resizing is slow; do it off the request thread and serve the original until ready
+    future = _get_executor().submit(generate_variants, upload_folder(), picture)
+    future.add_done_callback(_log_failure(picture))
+    return future
+
+
+def asset_image_url(picture, size="thumb"):
+    """URL of the ``size`` variant of an uploaded picture, or the original if not built yet."""
+    variant = variant_filename(picture, size)
+    if os.path.exists(os.path.join(upload_folder(), variant)):
+        return url_for("main.uploaded_file", filename=variant)
+    return url_for("main.uploaded_file", filename=picture)
@@ -0,0 +1,217 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from werkzeug.datastructures import MultiDict
+
+from pkg.forms import AssetForm
+from pkg.models import db, Asset, AssetAssignment, AssetStatus
+from pkg.refdata import category_choices, vendor_choices
+from pkg.rollups import adjust_vendor_totals
+from pkg.serials import serial_key
+from pkg.stats import dashboard_changed
+
+IMPORT_FIELDS = (
+    "name", "serial_number", "model_number", "make", "quantity",
+    "vendor_id", "category_id", "current_status", "current_holder",
+)
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []  # (line number, serial number, message)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def add_error(self, line, serial, message):
+        self.errors.append((line, serial, message))
+
+
+def iter_rows(stream, fmt):
+    """Yield (line number, dict) pairs from a CSV or JSONL byte/text stream."""
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(text, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_num, e
+                continue
+            yield line_num, row if isinstance(row, dict) else ValueError("expected a JSON object")
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def detect_format(filename):
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return "jsonl" if ext in ("jsonl", "json", "ndjson") else "csv"
+
+
+def _validate_row(row, vendors, categories, vendor_by_name, category_by_name):
+    # same rules as the add-asset form, minus CSRF and the picture upload
+    data = {k: ("" if row.get(k) is None else str(row.get(k)).strip()) for k in IMPORT_FIELDS}
+    if not data["vendor_id"] and row.get("vendor"):
+        data["vendor_id"] = str(vendor_by_name.get(str(row["vendor"]).strip().lower(), ""))
+    if not data["category_id"] and row.get("category"):
+        data["category_id"] = str(category_by_name.get(str(row["category"]).strip().lower(), ""))
+    data["current_status"] = (data["current_status"] or AssetStatus.INVENTORY.name).upper()
+
+    form = AssetForm(formdata=MultiDict(data), meta={"csrf": False})
+    form.vendor_id.choices = vendors
+    form.category_id.choices = categories
+    if not form.validate():
+        return None, "; ".join(
+            f"{name}: {', '.join(errs)}" for name, errs in form.errors.items()
+        )
+    if form.current_status.data == AssetStatus.ASSIGNED.name and not form.current_holder.data:
+        return None, "current_holder: Required when the status is ASSIGNED"
+    return {
+        "name": form.name.data,
+        "serial_number": form.serial_number.data,
+        "model_number": form.model_number.data or None,
+        "make": form.make.data or None,
+        "quantity": form.quantity.data,
+        "vendor_id": form.vendor_id.data,
+        "category_id": form.category_id.data,
+        "current_status": AssetStatus[form.current_status.data],
+        "current_holder": form.current_holder.data or None,
+    }, None
+
+
+def _vendor_deltas(rows):
+    deltas = {}
+    for _, values in rows:
+        count, qty = deltas.get(values["vendor_id"], (0, 0))
+        deltas[values["vendor_id"]] = (count + 1, qty + values["quantity"])
+    return deltas
+
+
+def _open_assignments(rows):
+    """Open an assignment for every imported ASSIGNED row, as assigning through the app would."""
+    held = {serial_key(values["serial_number"]): values["current_holder"]
+            for _, values in rows if values["current_status"] == AssetStatus.ASSIGNED}
+    if not held:
+        return
+    now = datetime.utcnow()
+    serials = [values["serial_number"] for _, values in rows if serial_key(values["serial_number"]) in held]
+    ids = db.session.query(Asset.id, Asset.serial_number).filter(Asset.serial_number.in_(serials))
+    db.session.execute(insert(AssetAssignment.__table__), [
+        {"asset_id": asset_id, "assigned_to": held[serial_key(serial)], "assigned_at": now}
+        for asset_id, serial in ids if serial_key(serial) in held
+    ])
+
+
+def _insert_row_by_row(rows, report):
+    """Insert each row in its own savepoint so one rejected row does not fail the rest; returns those inserted."""
+    inserted = []
+    try:
+        for line, values in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Asset.__table__), [values])
+            except IntegrityError:
+                report.add_error(line, values["serial_number"],
+                                 "Rejected by the database (duplicate serial number or unknown reference)")
+            else:
+                inserted.append((line, values))
+        if inserted:
+            adjust_vendor_totals(db.session.connection(), _vendor_deltas(inserted))
+            _open_assignments(inserted)
+            dashboard_changed(db.session)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for line, values in inserted:
+            report.add_error(line, values["serial_number"], f"Batch insert failed: {e}")
+        return []
+    return inserted
+
+
+def import_assets(rows, batch_size=None):
+    """Validate and insert assets from an iterable of (line, row) pairs.
+
+    Rows are processed in chunks: one IN-query per chunk for serial-number
+    clashes, one executemany INSERT and one commit per chunk. ASSIGNED rows
+    must name a current_holder and get an open assignment like any other.
+    """
+    batch_size = batch_size or current_app.config["IMPORT_BATCH_SIZE"]
+    report = ImportReport()
+    vendors, categories = vendor_choices(), category_choices()
+    vendor_by_name = {name.lower(): vid for vid, name in vendors}
+    category_by_name = {name.lower(): cid for cid, name in categories}
+    seen_serials = set()
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        valid = []
+        for line, row in chunk:
+            if isinstance(row, Exception):
+                report.add_error(line, None, f"Unreadable row: {row}")
+                continue
+            values, error = _validate_row(row, vendors, categories, vendor_by_name, category_by_name)
+            if error:
+                report.add_error(line, row.get("serial_number"), error)
+            elif serial_key(values["serial_number"]) in seen_serials:
+                report.add_error(line, values["serial_number"], "Duplicate serial number in file")
+            else:
+                seen_serials.add(serial_key(values["serial_number"]))
+                valid.append((line, values))
+
+        if not valid:
+            continue
+
+        serials = [values["serial_number"] for _, values in valid]
+        # compared as the unique index compares them, not as spelled (see serial_key)
+        existing = set(
+            serial_key(s) for (s,) in db.session.query(Asset.serial_number)
+            .filter(Asset.serial_number.in_(serials))
+        )
+        to_insert = []
+        for line, values in valid:
+            if serial_key(values["serial_number"]) in existing:
+                report.add_error(line, values["serial_number"], "An asset with this serial number already exists")
+            else:
+                to_insert.append((line, values))
+        if not to_insert:
+            continue
+
+        try:
+            db.session.execute(insert(Asset.__table__), [values for _, values in to_insert])
+            adjust_vendor_totals(db.session.connection(), _vendor_deltas(to_insert))
+            _open_assignments(to_insert)
+            dashboard_changed(db.session)
+            db.session.commit()
+        except IntegrityError:
+            # a row the checks above let through (e.g. a serial added meanwhile); find it row by row
+            db.session.rollback()
+            to_insert = _insert_row_by_row(to_insert, report)
+        except Exception as e:
+            db.session.rollback()
+            for line, values in to_insert:
+                report.add_error(line, values["serial_number"], f"Batch insert failed: {e}")
+            continue
+        report.inserted += len(to_insert)
+
+    return report
@@ -0,0 +1,123 @@
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_lock = threading.Lock()
+_recent = deque(maxlen=100)
+
+# collapse the bits that vary between executions of the "same" query
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    shape = _SPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?)", shape)
+    return _NUMBER.sub("N", shape)
+
+
+class RequestProfile:
+    def __init__(self, method, path, endpoint):
+        self.method = method
+        self.path = path
+        self.endpoint = endpoint
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.status = None
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.shapes = Counter()
+        self.duplicated = 0  # executions beyond the first of each statement shape
+        self.repeated = []  # (shape, count) seen at least N_PLUS_ONE_THRESHOLD times
+
+    def record(self, statement, elapsed):
+        self.query_count += 1
+        self.db_ms += elapsed * 1000
+        self.shapes[statement_shape(statement)] += 1
+
+    def finish(self, status, threshold):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        self.status = status
+        self.repeated = [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+        # the per-shape counter is only needed while the request runs
+        self.duplicated = sum(n - 1 for n in self.shapes.values() if n > 1)
+        self.shapes = None
+
+
+def recent_requests():
+    """Profiles of the most recent requests, newest first."""
+    with _lock:
+        return list(reversed(_recent))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_profile" in g:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts or not has_request_context():
+        return
+    profile = g.get("sql_profile")
+    if profile is not None:
+        profile.record(statement, time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def init_instrumentation(app):
+    """Record query count, DB time and repeated statements per request (SQL_PROFILING=1)."""
+    global _recent
+    if not app.config["SQL_PROFILING"]:
+        return
+    with _lock:
+        _recent = deque(_recent, maxlen=app.config["SQL_PROFILING_HISTORY"])
+
+    # listen on the Engine class so every bind is covered
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def _start_profile():
+        if request.endpoint in ("static", "hashed_static"):
+            return
+        g.sql_profile = RequestProfile(request.method, request.full_path.rstrip("?"), request.endpoint)
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+        profile.finish(response.status_code, app.config["N_PLUS_ONE_THRESHOLD"])
+        with _lock:
+            _recent.append(profile)
+
+        response.headers["Server-Timing"] = (
+            f"db;dur={profile.db_ms:.1f};desc=\"{profile.query_count} queries\", "
+            f"total;dur={profile.duration_ms:.1f}"
+        )
+        if profile.duration_ms >= app.config["SLOW_REQUEST_MS"]:
+            app.logger.warning(
+                "Slow request %s %s: %.0f ms, %d queries, %.0f ms in the database",
+                profile.method, profile.path, profile.duration_ms, profile.query_count, profile.db_ms,
+            )
+        for shape, count in profile.repeated:
+            app.logger.warning(
+                "Possible N+1 in %s %s: %d x %s", profile.method, profile.path, count, shape[:300]
+            )
+        return response
@@ -0,0 +1,213 @@
+"""In-process Prometheus-style metrics, served at /metrics in the text format.
+
+Each metric keeps its own lock, so concurrent worker threads only contend
+while bumping the same metric; nothing is exported over the network except
+on scrape.
+"""
+import bisect
+import functools
+import hmac
+import threading
+import time
+import weakref
+
+from flask import Response, abort, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from pkg.models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UPLOAD_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+HELD_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _num(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in values:
+            yield f"{self.name}{_labels(self.labels, label_values)} {_num(value)}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def collect(self):
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, counts in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                labels = _labels(self.labels + ("le",), label_values + (le,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_num(counts[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+REQUESTS = Counter("http_requests_total", "Requests handled, by endpoint, method and status.",
+                   ("endpoint", "method", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "Time from routing to response, by endpoint.",
+                    ("endpoint",))
+UPLOADS = Histogram("http_upload_bytes", "Size of multipart upload requests, by endpoint.",
+                    ("endpoint",), UPLOAD_BUCKETS)
+POOL_WAIT = Histogram("db_pool_checkout_wait_seconds",
+                      "Time spent getting a connection from the pool, including waiting for a free one "
+                      "and any timeout.", ("bind",), WAIT_BUCKETS)
+POOL_HELD = Histogram("db_pool_connection_held_seconds",
+                      "Time a connection stays checked out of the pool, from checkout to checkin.",
+                      ("bind",), HELD_BUCKETS)
+POOL_EVENTS = Counter("db_pool_events_total", "Pool connects, checkouts, checkins and invalidations.",
+                      ("bind", "event"))
+POOL_ERRORS = Counter("db_pool_checkout_errors_total", "Requests that failed waiting for a pool connection.",
+                      ("endpoint", "error"))
+
+_instrumented = weakref.WeakSet()
+
+
+def _pool_gauges():
+    lines = [
+        "# HELP db_pool_connections Connections by state, per bind.",
+        "# TYPE db_pool_connections gauge",
+    ]
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        name = bind or "default"
+        for state in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, state, None)
+            if callable(method):
+                lines.append(f'db_pool_connections{{bind="{name}",state="{state}"}} {method()}')
+    return lines
+
+
+def _instrument_pool(name, engine):
+    # listeners on the engine carry over to the pool it recreates on dispose()
+    if engine in _instrumented:
+        return
+    _instrumented.add(engine)
+
+    # sessions and engine.begin() both get their connection from engine.connect(),
+    # so timing it measures pool starvation; the pool events below only see a connection once it is out
+    connect = engine.connect
+
+    @functools.wraps(connect)
+    def timed_connect(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, name)
+
+    engine.connect = timed_connect
+
+    def checkout(dbapi_connection, record, proxy):
+        record.info["metrics_checkout"] = time.perf_counter()
+        POOL_EVENTS.inc(name, "checkout")
+
+    def checkin(dbapi_connection, record):
+        start = record.info.pop("metrics_checkout", None)
+        if start is not None:
+            POOL_HELD.observe(time.perf_counter() - start, name)
+        POOL_EVENTS.inc(name, "checkin")
+
+    event.listen(engine, "connect", lambda *a: POOL_EVENTS.inc(name, "connect"))
+    event.listen(engine, "checkout", checkout)
+    event.listen(engine, "checkin", checkin)
+    event.listen(engine, "invalidate", lambda *a: POOL_EVENTS.inc(name, "invalidate"))
+
+
+def render_metrics():
+    lines = []
+    for metric in (REQUESTS, LATENCY, UPLOADS, POOL_WAIT, POOL_HELD, POOL_EVENTS, POOL_ERRORS):
+        lines.extend(metric.collect())
+    lines.extend(_pool_gauges())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view():
+    # route names, latencies and pool state are not for the public
+    token = current_app.config["METRICS_TOKEN"]
+    if not token:
+        abort(404)
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(supplied, token):
+        abort(401)
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    if not app.config["METRICS_ENABLED"]:
+        return
+    if not app.config["METRICS_TOKEN"]:
+        app.logger.warning("METRICS_ENABLED without METRICS_TOKEN: /metrics will not be served")
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _instrument_pool(bind or "default", engine)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        # unmatched URLs share one label so scanners can't blow up the series count
+        endpoint = request.endpoint or "unmatched"
+        LATENCY.observe(time.perf_counter() - start, endpoint)
+        REQUESTS.inc(endpoint, request.method, response.status_code)
+        if request.mimetype == "multipart/form-data" and request.content_length:
+            UPLOADS.observe(request.content_length, endpoint)
+        return response
+
+    @app.teardown_request
+    def _count_pool_timeouts(exc):
+        if isinstance(exc, PoolTimeoutError):
+            POOL_ERRORS.inc(request.endpoint or "unmatched", type(exc).__name__)
@@ -1,9 +1,12 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import Enum
+from sqlalchemy.orm import column_property
 import enum
 
-db = SQLAlchemy()
+from pkg.dbconfig import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class AssetStatus(enum.Enum):
     INVENTORY = "inventory"
@@ -13,12 +16,18 @@ class AssetStatus(enum.Enum):
 
 class Vendor(db.Model):
     __tablename__ = "vendors"
+    __table_args__ = (
+        db.Index("ix_vendors_date_registered", "date_registered"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     vendor_name = db.Column(db.String(140), nullable=False)
     vendor_email = db.Column(db.String(20), nullable=False)
     vendor_password = db.Column(db.String(20), nullable=False)
     assets = db.relationship("Asset", backref="vendor", lazy="dynamic")
     date_registered = db.Column(db.DateTime(), default=datetime.utcnow)
+    # rollups kept in step with the vendor's assets by pkg.rollups
+    asset_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    total_quantity = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
 class AssetCategory(db.Model):
     __tablename__ = "asset_categories"
@@ -28,38 +37,128 @@ class AssetCategory(db.Model):
 
 class Asset(db.Model):
     __tablename__ = "assets"
+    # each index matches a filter + newest-first sort used by the admin/vendor pages
+    __table_args__ = (
+        db.Index("ix_assets_created_at_id", "created_at", "id"),
+        db.Index("ix_assets_vendor_created", "vendor_id", "created_at"),
+        db.Index("ix_assets_category_created", "category_id", "created_at"),
+        db.Index("ix_assets_status_created", "current_status", "created_at"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(140), nullable=False)
     serial_number = db.Column(db.String(140), unique=True)
     model_number = db.Column(db.String(140))
     make = db.Column(db.String(140))
     picture = db.Column(db.String(256))
-    quantity = db.Column(db.String(256))
-    vendor_id = db.Column(db.Integer, db.ForeignKey("vendors.id"))
+    # active_history: pkg.rollups needs the old values even when the row was expired by a commit
+    quantity = column_property(db.Column(db.Integer), active_history=True)
+    vendor_id = column_property(db.Column(db.Integer, db.ForeignKey("vendors.id")), active_history=True)
     category_id = db.Column(db.Integer, db.ForeignKey("asset_categories.id"))
     current_status = db.Column(Enum(AssetStatus), default=AssetStatus.INVENTORY, nullable=False)
     current_holder = db.Column(db.String(128))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # bumped on every UPDATE; flushes run "... WHERE id = ? AND version = ?" and
+    # raise StaleDataError instead of overwriting a concurrent change
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     assignments = db.relationship("AssetAssignment", backref="asset", lazy="dynamic")
     status_history = db.relationship("AssetStatusHistory", backref="asset", lazy="dynamic")
 
+    __mapper_args__ = {"version_id_col": version}
+
 class AssetAssignment(db.Model):
     __tablename__ = "asset_assignments"
+    __table_args__ = (
+        db.Index("ix_asset_assignments_asset_assigned", "asset_id", "assigned_at"),
+        db.Index("ix_asset_assignments_assigned_at", "assigned_at"),
+        # "what does X hold": open assignments only where the database supports partial indexes
+        db.Index("ix_asset_assignments_open_holder", "assigned_to", "returned_at",
+                 sqlite_where=db.text("returned_at IS NULL"),
+                 postgresql_where=db.text("returned_at IS NULL")),
+    )
     id = db.Column(db.Integer, primary_key=True)
     asset_id = db.Column(db.Integer, db.ForeignKey("assets.id"))
     assigned_to = db.Column(db.String(128), nullable=False)
-    assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
+    assigned_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     returned_at = db.Column(db.DateTime)
 
 class AssetStatusHistory(db.Model):
     __tablename__ = "asset_status_history"
+    __table_args__ = (
+        db.Index("ix_asset_status_history_asset_timestamp", "asset_id", "timestamp"),
+        db.Index("ix_asset_status_history_timestamp", "timestamp"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     asset_id = db.Column(db.Integer, db.ForeignKey("assets.id"))
     status = db.Column(Enum(AssetStatus), nullable=False)
     changed_by = db.Column(db.String(128))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     note = db.Column(db.String(256))
 
+class StoredFile(db.Model):
+    __tablename__ = "stored_files"
+    # one row per distinct upload blob, keyed by its SHA-256
+    sha256 = db.Column(db.String(64), primary_key=True)
+    filename = db.Column(db.String(256), nullable=False, unique=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CacheVersion(db.Model):
+    __tablename__ = "cache_versions"
+    # bumped in the writing transaction so every worker sees that its cached copy is stale
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class ArchiveSegment(db.Model):
+    __tablename__ = "archive_segments"
+    # one gzipped JSONL file of history/assignment rows moved out of the hot tables
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(256), nullable=False, unique=True)
+    row_count = db.Column(db.Integer, nullable=False)
+    oldest = db.Column(db.DateTime)
+    newest = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchiveSegmentAsset(db.Model):
+    __tablename__ = "archive_segment_assets"
+    __table_args__ = (
+        # "which segments hold this asset's rows older than X"
+        db.Index("ix_archive_segment_assets_asset", "asset_id", "table_name", "newest"),
+    )
+    segment_id = db.Column(db.Integer, db.ForeignKey("archive_segments.id"), primary_key=True)
+    asset_id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    oldest = db.Column(db.DateTime)
+    newest = db.Column(db.DateTime)
+
+class AssetStatusDaily(db.Model):
+    __tablename__ = "asset_status_daily"
+    # time spent in each status per day, rolled up per category and per vendor
+    day = db.Column(db.Date, primary_key=True)
+    dimension = db.Column(db.String(16), primary_key=True)  # "category" or "vendor"
+    key_id = db.Column(db.Integer, primary_key=True)  # category/vendor id, 0 for none
+    status = db.Column(Enum(AssetStatus), primary_key=True)
+    seconds = db.Column(db.Float, nullable=False, default=0)
+    assets = db.Column(db.Integer, nullable=False, default=0)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+
+class AssetStatusFrontier(db.Model):
+    __tablename__ = "asset_status_frontier"
+    # each asset's status at the end of the last rolled-up day
+    asset_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(Enum(AssetStatus), nullable=False)
+
+class InventoryCheckpoint(db.Model):
+    __tablename__ = "inventory_checkpoints"
+    # every asset's status and holder at taken_at, in a gzipped JSONL file
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, unique=True)
+    filename = db.Column(db.String(256), nullable=False, unique=True)
+    asset_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Admin(db.Model):
     __tablename__ = 'admin'
     admin_id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+# keep IN lists and multi-row INSERTs well under the bind-parameter limits of SQLite and MySQL
+CHUNK = 500
+
+
+def chunks(items, size=CHUNK):
+    """Consecutive slices of ``items`` (a list or array) of at most ``size`` entries."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def encode_cursor(created_at, row_id):
+    # opaque token for the (created_at, id) position of a row
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    # returns (created_at, id) or None when the token is missing/invalid
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, prev_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_query(query, created_col, id_col, per_page, after_pos=None, before_pos=None):
+    """``query`` narrowed to one keyset page (plus one extra row) and ordered for it.
+
+    ``after_pos`` / ``before_pos`` are decoded cursors; ``before_pos`` walks
+    oldest-first and is only used without ``after_pos``.
+    """
+    if before_pos and not after_pos:
+        # walk backwards (oldest-first) from the cursor; the caller flips the rows
+        ts, row_id = before_pos
+        query = query.filter(or_(created_col > ts, and_(created_col == ts, id_col > row_id)))\
+            .order_by(created_col.asc(), id_col.asc())
+    else:
+        if after_pos:
+            ts, row_id = after_pos
+            query = query.filter(or_(created_col < ts, and_(created_col == ts, id_col < row_id)))
+        query = query.order_by(created_col.desc(), id_col.desc())
+    return query.limit(per_page + 1)
+
+
+def keyset_paginate(query, created_col, id_col, per_page, after=None, before=None, key=None):
+    """Newest-first page of ``query`` ordered by (created_col, id_col).
+
+    ``after`` / ``before`` are tokens from a previous page; only one is used.
+    ``key`` maps a result row to the entity holding the two sort attributes.
+    ``created_col`` must be NOT NULL: a row without a timestamp cannot be
+    encoded as a cursor, so a page ending on one would have no next page.
+    """
+    key = key or (lambda row: row)
+    after_pos = decode_cursor(after)
+    before_pos = None if after_pos else decode_cursor(before)
+
+    # one extra row tells whether there is another page
+    rows = keyset_query(query, created_col, id_col, per_page, after_pos, before_pos).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before_pos:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = key(rows[0]), key(rows[-1])
+        ts_attr, id_attr = created_col.key, id_col.key
+        if has_more or before_pos:
+            next_cursor = encode_cursor(getattr(last, ts_attr), getattr(last, id_attr))
+        if after_pos or (before_pos and has_more):
+            prev_cursor = encode_cursor(getattr(first, ts_attr), getattr(first, id_attr))
+    return KeysetPage(rows, next_cursor, prev_cursor, per_page)
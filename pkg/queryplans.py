@@ -0,0 +1,121 @@
+"""EXPLAIN the queries behind the hot routes and flag full table scans.
+
+Used by ``flask check-query-plans`` and tests/test_query_plans.py. The
+statements come from the same query builders the routes call, so a route
+that changes its query is checked as it now runs.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from pkg.models import (
+    db, Vendor, Asset, AssetCategory, AssetAssignment, AssetStatusHistory, AssetStatus
+)
+
+
+def route_queries():
+    """(name, statement) pairs, one per hot filter/sort path."""
+    from pkg.admin_routes import asset_list_query
+    from pkg.archive import archived_segments_query, hot_history_query
+    from pkg.assignments import assignment_log_query, holdings_query
+    from pkg.pagination import keyset_query
+    from pkg.search import search_assets
+    from pkg.stats import latest_assets_query, status_counts_query
+    from pkg.vendor_routes import vendor_assets_query
+
+    now = datetime.utcnow()
+    cursor = (now - timedelta(days=1), 1000)
+
+    def asset_page(position=None, **filters):
+        return keyset_query(asset_list_query(**filters), Asset.created_at, Asset.id, 25, after_pos=position)
+
+    def assignment_page(position=None):
+        return keyset_query(assignment_log_query(now - timedelta(days=30)), AssetAssignment.assigned_at,
+                            AssetAssignment.id, 25, after_pos=position)
+
+    queries = [
+        ("admin_manage_assets", asset_page()),
+        ("admin_manage_assets?after", asset_page(cursor)),
+        ("admin_manage_assets?vendor", asset_page(vendor=1)),
+        ("admin_manage_assets?vendor&after", asset_page(cursor, vendor=1)),
+        ("admin_manage_assets?category", asset_page(category=1)),
+        ("admin_manage_assets?status", asset_page(status="REPAIR")),
+        ("admin_search_assets", search_assets(asset_list_query(), "asset 7").limit(26)),
+        ("admin_dashboard status counts", status_counts_query()),
+        ("admin_dashboard latest", latest_assets_query()),
+        # single-row lookups issued inline by the routes
+        ("admin_add_asset serial check", Asset.query.filter_by(serial_number="SN-1")),
+        ("admin_delete_vendor asset count", Asset.query.filter_by(vendor_id=1).with_entities(Asset.id)),
+        ("admin_manage_vendors", Vendor.query.order_by(Vendor.date_registered.desc())),
+        ("vendor dashboard", vendor_assets_query(1)),
+        ("admin_view_assignments", assignment_page()),
+        ("admin_view_assignments?after", assignment_page(cursor)),
+        ("admin_view_status_history", hot_history_query("history", 1, 25)),
+        ("admin_view_status_history?after", hot_history_query("history", 1, 25, cursor)),
+        ("admin_view_status_history assignments", hot_history_query("assignments", 1, 25)),
+        ("admin_view_status_history archive index", archived_segments_query("history", 1, cursor)),
+        ("admin_holder_assets", holdings_query("Person 1")),
+    ]
+    return [(name, query.statement) for name, query in queries if query is not None]
+
+
+def _full_scans(conn, stmt):
+    dialect = conn.dialect.name
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if dialect == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).fetchall()
+        # "SCAN assets" without "USING ... INDEX" reads every row of the table
+        return [r[-1] for r in rows if r[-1].startswith("SCAN ") and "INDEX" not in r[-1]
+                and "CONSTANT ROW" not in r[-1]]
+    if dialect == "mysql":
+        result = conn.execute(text("EXPLAIN " + sql))
+        keys = list(result.keys())
+        scans = []
+        for row in result:
+            row = dict(zip(keys, row))
+            if row.get("type") == "ALL":
+                scans.append(f"full scan of {row.get('table')}")
+        return scans
+    raise RuntimeError(f"Query plan check does not support {dialect}")
+
+
+def check_query_plans(conn):
+    """Return [(route query name, [full scan descriptions])] for every offending query."""
+    failures = []
+    for name, stmt in route_queries():
+        scans = _full_scans(conn, stmt)
+        if scans:
+            failures.append((name, scans))
+    return failures
+
+
+def seed_for_plans(conn, assets=2000, vendors=20, categories=5):
+    """Fill an empty schema with enough rows for the planner to prefer indexes."""
+    now = datetime.utcnow()
+    statuses = list(AssetStatus)
+    conn.execute(insert(Vendor.__table__), [
+        {"vendor_name": f"Vendor {i}", "vendor_email": f"v{i}@x.io", "vendor_password": "x",
+         "date_registered": now - timedelta(days=i)}
+        for i in range(vendors)
+    ])
+    conn.execute(insert(AssetCategory.__table__), [{"name": f"Category {i}"} for i in range(categories)])
+    conn.execute(insert(Asset.__table__), [
+        {"name": f"Asset {i}", "serial_number": f"SN-{i}", "quantity": 1,
+         "vendor_id": random.randint(1, vendors), "category_id": random.randint(1, categories),
+         "current_status": random.choice(statuses), "created_at": now - timedelta(minutes=i)}
+        for i in range(assets)
+    ])
+    conn.execute(insert(AssetAssignment.__table__), [
+        {"asset_id": random.randint(1, assets), "assigned_to": f"Person {i % 300}",
+         "assigned_at": now - timedelta(minutes=i)}
+        for i in range(assets // 2)
+    ])
+    conn.execute(insert(AssetStatusHistory.__table__), [
+        {"asset_id": random.randint(1, assets), "status": random.choice(statuses),
+         "changed_by": "seed", "timestamp": now - timedelta(minutes=i)}
+        for i in range(assets * 2)
+    ])
+    if conn.dialect.name in ("sqlite", "mysql"):
+        conn.execute(text("ANALYZE" if conn.dialect.name == "sqlite" else
+                          "ANALYZE TABLE assets, asset_assignments, asset_status_history, vendors"))
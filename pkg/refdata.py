@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import inspect
+
+from pkg.cache_versions import bump_shared_version, forget_shared_version, shared_version
+from pkg.models import db, Vendor, AssetCategory
+from pkg.session_events import on_commit_when
+
+CategoryRef = namedtuple("CategoryRef", "id name")
+VendorRef = namedtuple("VendorRef", "id vendor_name")
+
+CACHE_NAME = "refdata"
+
+_lock = threading.Lock()
+# version is bumped whenever a vendor or category is added, renamed or removed:
+# locally right after the commit, and for every worker in the cache_versions row
+_cache = {"version": 0, "shared_version": None, "loaded_version": None, "expires": 0.0,
+          "categories": (), "vendors": ()}
+
+
+def invalidate_reference_data():
+    with _lock:
+        _cache["version"] += 1
+    forget_shared_version(CACHE_NAME)
+
+
+def _load():
+    categories = tuple(
+        CategoryRef(*row) for row in
+        db.session.query(AssetCategory.id, AssetCategory.name).order_by(AssetCategory.name)
+    )
+    vendors = tuple(
+        VendorRef(*row) for row in
+        db.session.query(Vendor.id, Vendor.vendor_name).order_by(Vendor.vendor_name)
+    )
+    return categories, vendors
+
+
+def _reference_data():
+    now = time.monotonic()
+    shared = shared_version(CACHE_NAME)
+    with _lock:
+        version = _cache["version"]
+        if _cache["loaded_version"] == version and _cache["shared_version"] == shared and now < _cache["expires"]:
+            return _cache["categories"], _cache["vendors"]
+
+    categories, vendors = _load()
+    with _lock:
+        # only keep it if nothing changed while we were loading
+        if _cache["version"] == version:
+            _cache.update(
+                loaded_version=version,
+                shared_version=shared,
+                expires=now + current_app.config["REFDATA_CACHE_TTL"],
+                categories=categories,
+                vendors=vendors,
+            )
+    return categories, vendors
+
+
+def get_categories():
+    return _reference_data()[0]
+
+
+def get_vendors():
+    return _reference_data()[1]
+
+
+def category_choices():
+    return [(c.id, c.name) for c in get_categories()]
+
+
+def vendor_choices():
+    return [(v.id, v.vendor_name) for v in get_vendors()]
+
+
+def _touches_reference_data(session):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (Vendor, AssetCategory)):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Vendor) and inspect(obj).attrs.vendor_name.history.has_changes():
+            return True
+        if isinstance(obj, AssetCategory) and inspect(obj).attrs.name.history.has_changes():
+            return True
+    return False
+
+
+on_commit_when("refdata_dirty", _touches_reference_data, invalidate_reference_data,
+               before_flush=lambda session: bump_shared_version(session, CACHE_NAME))
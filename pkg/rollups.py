@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from sqlalchemy import event, func, inspect, select, update
+
+from pkg.models import db, Vendor, Asset
+
+
+def _old_value(state, attr):
+    hist = state.attrs[attr].history
+    if hist.deleted:
+        return hist.deleted[0]
+    return getattr(state.obj(), attr)
+
+
+def _collect_deltas(session):
+    # vendor_id -> [asset_count delta, quantity delta]
+    deltas = defaultdict(lambda: [0, 0])
+    for obj in session.new:
+        if isinstance(obj, Asset) and obj.vendor_id is not None:
+            deltas[obj.vendor_id][0] += 1
+            deltas[obj.vendor_id][1] += obj.quantity or 0
+    for obj in session.deleted:
+        if isinstance(obj, Asset):
+            state = inspect(obj)
+            vendor_id = _old_value(state, "vendor_id")
+            if vendor_id is not None:
+                deltas[vendor_id][0] -= 1
+                deltas[vendor_id][1] -= _old_value(state, "quantity") or 0
+    for obj in session.dirty:
+        if not isinstance(obj, Asset) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if not (state.attrs.vendor_id.history.has_changes()
+                or state.attrs.quantity.history.has_changes()):
+            continue
+        old_vendor, old_qty = _old_value(state, "vendor_id"), _old_value(state, "quantity") or 0
+        if old_vendor is not None:
+            deltas[old_vendor][0] -= 1
+            deltas[old_vendor][1] -= old_qty
+        if obj.vendor_id is not None:
+            deltas[obj.vendor_id][0] += 1
+            deltas[obj.vendor_id][1] += obj.quantity or 0
+    return {vid: d for vid, d in deltas.items() if d[0] or d[1]}
+
+
+def adjust_vendor_totals(connection, deltas):
+    """Apply {vendor_id: (asset_count delta, quantity delta)} as relative updates.
+
+    Bulk writers that bypass the ORM unit of work call this themselves.
+    """
+    vendors = Vendor.__table__
+    for vendor_id, (count_delta, qty_delta) in deltas.items():
+        connection.execute(
+            update(vendors)
+            .where(vendors.c.id == vendor_id)
+            .values(
+                asset_count=vendors.c.asset_count + count_delta,
+                total_quantity=vendors.c.total_quantity + qty_delta,
+            )
+        )
+
+
+def rebuild_vendor_totals():
+    # full recount, for repairing drift after manual SQL
+    assets = Asset.__table__
+    count_sq = select(func.count(assets.c.id)).where(assets.c.vendor_id == Vendor.__table__.c.id)
+    qty_sq = select(func.coalesce(func.sum(assets.c.quantity), 0))\
+        .where(assets.c.vendor_id == Vendor.__table__.c.id)
+    db.session.execute(
+        update(Vendor.__table__).values(
+            asset_count=count_sq.scalar_subquery(),
+            total_quantity=qty_sq.scalar_subquery(),
+        )
+    )
+    db.session.commit()
+
+
+@event.listens_for(db.session, "before_flush")
+def _collect_vendor_deltas(session, flush_context, instances):
+    deltas = _collect_deltas(session)
+    if deltas:
+        session.info["vendor_deltas"] = deltas
+
+
+@event.listens_for(db.session, "after_flush")
+def _apply_vendor_deltas(session, flush_context):
+    deltas = session.info.pop("vendor_deltas", None)
+    if deltas:
+        adjust_vendor_totals(session.connection(), deltas)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_vendor_deltas(session):
+    # a flush that failed after before_flush must not leak its deltas into the next one
+    session.info.pop("vendor_deltas", None)
@@ -1,16 +1,18 @@
-import requests
-import os, random, json
-from flask import current_app as app
-from flask import render_template, redirect, flash, request, session
-from flask_wtf.csrf import CSRFError
-from flask_wtf.csrf import generate_csrf
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, render_template, send_from_directory
 
-@app.route('/')  # Home page route
+bp = Blueprint("main", __name__)
+
+@bp.route('/')  # Home page route
 def home():
     return render_template('index.html')
 
 
-
-
-
+@bp.route('/uploads/<path:filename>')  # uploaded pictures, cached forever when content-addressed
+def uploaded_file(filename):
+    from pkg.images import upload_folder
+    from pkg.storage import is_immutable
+    if is_immutable(filename):
+        response = send_from_directory(upload_folder(), filename, max_age=31536000)
+        response.cache_control.immutable = True
+        return response
+    return send_from_directory(upload_folder(), filename)
@@ -0,0 +1,106 @@
+import re
+
+from sqlalchemy import DDL, column, desc, event, or_, table, text
+
+from pkg.models import db, Asset
+
+SEARCH_COLUMNS = ("name", "serial_number", "model_number", "make", "current_holder")
+_COLS = ", ".join(SEARCH_COLUMNS)
+_QUALIFIED = ", ".join(f"assets.{c}" for c in SEARCH_COLUMNS)
+_NEW_COLS = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_OLD_COLS = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+# MySQL: a FULLTEXT index straight on the assets table
+MYSQL_DDL = [
+    f"CREATE FULLTEXT INDEX ix_assets_fulltext ON assets ({_COLS})",
+]
+
+# SQLite: an FTS5 index over the assets table, kept current by triggers.
+# Updates only reindex when an indexed column changes, not on every status or version bump.
+SQLITE_UPDATE_TRIGGER = (
+    f"CREATE TRIGGER IF NOT EXISTS assets_fts_au AFTER UPDATE OF {_COLS} ON assets BEGIN "
+    f"INSERT INTO assets_fts(assets_fts, rowid, {_COLS}) VALUES ('delete', old.id, {_OLD_COLS}); "
+    f"INSERT INTO assets_fts(rowid, {_COLS}) VALUES (new.id, {_NEW_COLS}); END"
+)
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5("
+    f"{_COLS}, content='assets', content_rowid='id', tokenize='unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS assets_fts_ai AFTER INSERT ON assets BEGIN "
+    f"INSERT INTO assets_fts(rowid, {_COLS}) VALUES (new.id, {_NEW_COLS}); END",
+    f"CREATE TRIGGER IF NOT EXISTS assets_fts_ad AFTER DELETE ON assets BEGIN "
+    f"INSERT INTO assets_fts(assets_fts, rowid, {_COLS}) VALUES ('delete', old.id, {_OLD_COLS}); END",
+    SQLITE_UPDATE_TRIGGER,
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS assets_fts_au",
+    "DROP TRIGGER IF EXISTS assets_fts_ad",
+    "DROP TRIGGER IF EXISTS assets_fts_ai",
+    "DROP TABLE IF EXISTS assets_fts",
+]
+
+# create the index alongside the table when the schema comes from db.create_all()
+for _stmt in MYSQL_DDL:
+    event.listen(Asset.__table__, "after_create", DDL(_stmt).execute_if(dialect="mysql"))
+for _stmt in SQLITE_DDL:
+    event.listen(Asset.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+
+assets_fts = table("assets_fts", column("rowid"))
+
+_TERM = re.compile(r"\w[\w.\-/]*", re.UNICODE)
+
+
+def _terms(q):
+    return _TERM.findall(q or "")[:10]
+
+
+def _mysql_query(terms):
+    # every term required, prefix-matched; punctuation inside serials is quoted
+    parts = []
+    for t in terms:
+        parts.append(f'+"{t}"' if re.search(r"[.\-/]", t) else f"+{t}*")
+    return " ".join(parts)
+
+
+def _sqlite_query(terms):
+    return " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+
+
+def search_assets(query, q):
+    """Restrict ``query`` (selecting Asset ...) to rows matching ``q``, best first.
+
+    Returns None when ``q`` has no searchable terms.
+    """
+    terms = _terms(q)
+    if not terms:
+        return None
+    dialect = db.engine.dialect.name
+
+    if dialect == "mysql":
+        # columns are qualified because asset_categories.name is joined in too
+        match = text(f"MATCH ({_QUALIFIED}) AGAINST (:ftq IN BOOLEAN MODE)")\
+            .bindparams(ftq=_mysql_query(terms))
+        return query.filter(match).order_by(desc(match), Asset.id.desc())
+
+    if dialect == "sqlite":
+        # bm25 is lower-is-better; weight serial and model matches above free text
+        return query.join(assets_fts, assets_fts.c.rowid == Asset.id)\
+            .filter(text("assets_fts MATCH :ftq").bindparams(ftq=_sqlite_query(terms)))\
+            .order_by(text("bm25(assets_fts, 2.0, 5.0, 3.0, 1.0, 1.0)"), Asset.id.desc())
+
+    # no full-text support: substring match on each column
+    for t in terms:
+        like = f"%{t}%"
+        query = query.filter(or_(*(getattr(Asset, c).ilike(like) for c in SEARCH_COLUMNS)))
+    return query.order_by(Asset.created_at.desc(), Asset.id.desc())
+
+
+def rebuild_search_index():
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        for stmt in SQLITE_DDL:
+            db.session.execute(text(stmt))
+        db.session.execute(text("INSERT INTO assets_fts(assets_fts) VALUES ('rebuild')"))
+        db.session.commit()
+    elif dialect == "mysql":
+        db.session.execute(text("OPTIMIZE TABLE assets"))
+        db.session.commit()
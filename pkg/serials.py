@@ -0,0 +1,8 @@
+def serial_key(serial):
+    """The form in which the database compares serial numbers.
+
+    MySQL's default collation ignores case and trailing spaces, so a lookup
+    by serial can return the stored spelling rather than the one asked for;
+    match results back on this key instead of the raw string.
+    """
+    return serial.strip().casefold() if serial else serial
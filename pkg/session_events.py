@@ -0,0 +1,31 @@
+from sqlalchemy import event
+
+from pkg.models import db
+
+
+def on_commit_when(key, touches, after_commit, before_flush=None):
+    """Call ``after_commit()`` once a transaction whose flushes ``touches`` has committed.
+
+    ``touches(session)`` is asked before every flush; when it says yes the
+    session is marked with ``key``, ``before_flush(session)`` runs (inside
+    the transaction) if given, and the mark is dropped again if the
+    transaction rolls back. Savepoints neither fire nor clear the mark.
+    """
+    @event.listens_for(db.session, "before_flush")
+    def _mark(session, flush_context, instances):
+        if touches(session):
+            session.info[key] = True
+            if before_flush:
+                before_flush(session)
+
+    @event.listens_for(db.session, "after_commit")
+    def _commit(session):
+        if not session.in_nested_transaction() and session.info.pop(key, False):
+            after_commit()
+
+    @event.listens_for(db.session, "after_soft_rollback")
+    def _rollback(session, previous_transaction):
+        if not previous_transaction.nested:
+            session.info.pop(key, None)
+
+    return _mark, _commit, _rollback
@@ -0,0 +1,278 @@
+import functools
+import gzip
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from pkg.archive import archive_dir, find_archived, initial_statuses, iter_archived, write_segment
+from pkg.models import (
+    db, Asset, AssetAssignment, AssetStatus, AssetStatusHistory, InventoryCheckpoint
+)
+from pkg.pagination import chunks
+
+
+AssetState = namedtuple(
+    "AssetState", "asset_id serial_number name category_id vendor_id status holder assignment_id"
+)
+CheckpointRef = namedtuple("CheckpointRef", "id taken_at filename")
+
+
+class Snapshot:
+    """The inventory at ``at``: every asset that existed then, with its status and holder."""
+
+    def __init__(self, at, checkpoint, states, events):
+        self.at = at
+        self.checkpoint = checkpoint  # CheckpointRef replay started from, or None
+        self.states = states  # asset id -> AssetState
+        self.events = events  # status changes and assignments replayed on top of the checkpoint
+
+    @functools.cached_property
+    def ids(self):
+        # sorted once per snapshot; cached snapshots share it between requests
+        return sorted(self.states)
+
+    def assets(self):
+        return [self.states[asset_id] for asset_id in self.ids]
+
+    def page(self, offset, limit, category=None, vendor=None, status=None, holder=None):
+        """(number of matching assets, ``limit`` of them from ``offset``) in asset id order.
+
+        Walks the sorted ids once, keeping only the requested page; without
+        filters it is a plain slice.
+        """
+        if not (category or vendor or status or holder):
+            return len(self.ids), [self.states[asset_id] for asset_id in self.ids[offset:offset + limit]]
+        holder = holder.lower() if holder else None
+        total, shown = 0, []
+        for asset_id in self.ids:
+            state = self.states[asset_id]
+            if (category and state.category_id != category) or (vendor and state.vendor_id != vendor) \
+                    or (status and state.status is not status) \
+                    or (holder and not (state.holder and holder in state.holder.lower())):
+                continue
+            if offset <= total < offset + limit:
+                shown.append(state)
+            total += 1
+        return total, shown
+
+    def to_dict(self, assets=None):
+        return {
+            "at": self.at.isoformat(),
+            "checkpoint": self.checkpoint.taken_at.isoformat() if self.checkpoint else None,
+            "events_replayed": self.events,
+            "assets": [
+                {"asset_id": s.asset_id, "serial_number": s.serial_number, "name": s.name,
+                 "category_id": s.category_id, "vendor_id": s.vendor_id,
+                 "status": s.status.name, "holder": s.holder}
+                for s in (self.assets() if assets is None else assets)
+            ],
+        }
+
+
+def _checkpoint_path(filename):
+    return os.path.join(archive_dir(), filename)
+
+
+@functools.lru_cache(maxsize=4)
+def _checkpoint_states(path):
+    # checkpoint files are never rewritten, so the parsed state can be shared between queries
+    states = {}
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            record = json.loads(line)
+            record["status"] = AssetStatus[record["status"]]
+            states[record["asset_id"]] = AssetState(**record)
+    return states
+
+
+def nearest_checkpoint(when):
+    return InventoryCheckpoint.query.filter(InventoryCheckpoint.taken_at <= when)\
+        .order_by(InventoryCheckpoint.taken_at.desc()).first()
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _new_assets(since, until):
+    """AssetState for each asset created in (since, until], before any status change."""
+    query = select(Asset.id, Asset.serial_number, Asset.name, Asset.category_id, Asset.vendor_id,
+                   Asset.current_status)
+    query = query.where(Asset.created_at <= until)
+    if since is not None:
+        query = query.where(Asset.created_at > since)
+    rows = db.session.execute(query).all()
+    if not rows:
+        return {}
+    initial = initial_statuses((row[0], row[-1]) for row in rows)
+    return {
+        asset_id: AssetState(asset_id, serial, name, category_id, vendor_id, initial[asset_id], None, None)
+        for asset_id, serial, name, category_id, vendor_id, status in rows
+    }
+
+
+def _status_changes(since, until):
+    """(timestamp, id, asset id, status) of every change in (since, until], oldest first."""
+    table = AssetStatusHistory.__table__
+    query = select(table.c.timestamp, table.c.id, table.c.asset_id, table.c.status)\
+        .where(table.c.timestamp <= until, table.c.asset_id.is_not(None))
+    if since is not None:
+        query = query.where(table.c.timestamp > since)
+    changes = [tuple(row) for row in db.session.execute(query)]
+    for record in iter_archived("history", since, until + timedelta(microseconds=1)):
+        when = _parse(record.get("timestamp"))
+        if when is None or when > until or (since is not None and when <= since) or not record.get("asset_id"):
+            continue
+        changes.append((when, record["id"], record["asset_id"], AssetStatus[record["status"]]))
+    changes.sort(key=lambda c: (c[0], c[1]))
+    return changes
+
+
+def _assignments_opened(since, until):
+    """(assigned_at, id, asset id, holder, returned_at) of every assignment made in (since, until]."""
+    table = AssetAssignment.__table__
+    query = select(table.c.assigned_at, table.c.id, table.c.asset_id, table.c.assigned_to, table.c.returned_at)\
+        .where(table.c.assigned_at <= until, table.c.asset_id.is_not(None))
+    if since is not None:
+        query = query.where(table.c.assigned_at > since)
+    opened = [tuple(row) for row in db.session.execute(query)]
+    for record in iter_archived("assignments", since, until + timedelta(microseconds=1)):
+        when = _parse(record.get("assigned_at"))
+        if when is None or when > until or (since is not None and when <= since) or not record.get("asset_id"):
+            continue
+        opened.append((when, record["id"], record["asset_id"], record["assigned_to"],
+                       _parse(record.get("returned_at"))))
+    opened.sort(key=lambda a: (a[0], a[1]))
+    return opened
+
+
+def _returned_at(states):
+    """{assignment id: returned_at} for the assignments a checkpoint has open."""
+    held = {s.assignment_id: s.asset_id for s in states.values() if s.assignment_id is not None}
+    ids = list(held)
+    returned = {}
+    table = AssetAssignment.__table__
+    for chunk in chunks(ids):
+        returned.update(db.session.execute(
+            select(table.c.id, table.c.returned_at).where(table.c.id.in_(chunk))
+        ).all())
+    # closed since the checkpoint and already moved to the archive
+    missing = [assignment_id for assignment_id in ids if assignment_id not in returned]
+    if missing:
+        for row in find_archived("assignments", [held[a] for a in missing], missing):
+            returned[row.id] = row.returned_at
+    return returned
+
+
+def _log_version():
+    """Moves whenever events are recorded or assets are added or deleted."""
+    return tuple(db.session.execute(select(
+        select(func.max(AssetStatusHistory.id)).scalar_subquery(),
+        select(func.max(AssetAssignment.id)).scalar_subquery(),
+        select(func.max(Asset.id)).scalar_subquery(),
+        select(func.count(Asset.id)).scalar_subquery(),
+    )).one())
+
+
+def _replay(when):
+    checkpoint = nearest_checkpoint(when)
+    since = checkpoint.taken_at if checkpoint else None
+    states = {}
+    if checkpoint:
+        # deleted assets are left out of every snapshot, not only those replayed from scratch
+        existing = {asset_id for (asset_id,) in db.session.execute(select(Asset.id))}
+        saved = _checkpoint_states(_checkpoint_path(checkpoint.filename))
+        states = {asset_id: state for asset_id, state in saved.items() if asset_id in existing}
+        checkpoint = CheckpointRef(checkpoint.id, checkpoint.taken_at, checkpoint.filename)
+
+        # holders carried over from the checkpoint, unless handed back by ``when``
+        returned = _returned_at(states)
+        for asset_id, state in states.items():
+            if state.assignment_id is None:
+                continue
+            returned_at = returned.get(state.assignment_id)
+            if returned_at is not None and returned_at <= when:
+                states[asset_id] = state._replace(holder=None, assignment_id=None)
+
+    states.update(_new_assets(since, when))
+    events = 0
+    for _, _, asset_id, status in _status_changes(since, when):
+        events += 1
+        if asset_id in states:
+            states[asset_id] = states[asset_id]._replace(status=status)
+    for _, assignment_id, asset_id, holder, returned_at in _assignments_opened(since, when):
+        events += 1
+        # the newest assignment still open at ``when`` is the holder
+        if asset_id in states and (returned_at is None or returned_at > when):
+            states[asset_id] = states[asset_id]._replace(holder=holder, assignment_id=assignment_id)
+    return Snapshot(when, checkpoint, states, events)
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_replay(database, when, version):
+    # ``database`` and ``version`` only key the cache: a new event, asset or deletion moves the version
+    return _replay(when)
+
+
+def inventory_as_of(when):
+    """Reconstruct the inventory at ``when``.
+
+    Starts from the newest checkpoint taken at or before ``when`` and replays
+    only the assets created, status changes recorded and assignments made
+    since then, reading archive segments for events past the retention
+    window. Without a checkpoint the whole event log is replayed.
+
+    Assets that have since been deleted are not in any snapshot: their hot
+    history loses its asset id on delete, so their past cannot be replayed.
+    Past moments are cached until the event log moves; asset details (name,
+    category, vendor) are the ones current when the snapshot was built.
+    """
+    if when >= datetime.utcnow():
+        return _replay(when)
+    return _cached_replay(str(db.engine.url), when, _log_version())
+
+
+def take_checkpoint(when=None):
+    """Save the inventory at ``when`` (default now) as a checkpoint for later "as of" queries."""
+    when = when or datetime.utcnow()
+    existing = InventoryCheckpoint.query.filter_by(taken_at=when).first()
+    if existing:
+        return existing
+    snapshot = _replay(when)
+    filename = f"checkpoints/{when:%Y%m%dT%H%M%S%f}.jsonl.gz"
+    path = _checkpoint_path(filename)
+    write_segment(path, (state._asdict() for state in snapshot.assets()))
+    checkpoint = InventoryCheckpoint(taken_at=when, filename=filename, asset_count=len(snapshot.states))
+    try:
+        db.session.add(checkpoint)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        os.remove(path)
+        raise
+    return checkpoint
+
+
+def backfill_checkpoints(every_days, progress=None):
+    """Checkpoint every ``every_days`` days at midnight, from the first asset up to now.
+
+    Each checkpoint replays only from the one before it, so a long event log
+    is read once overall.
+    """
+    first = db.session.query(func.min(Asset.created_at)).scalar()
+    if first is None:
+        return []
+    taken = {t for (t,) in db.session.query(InventoryCheckpoint.taken_at)}
+    day = datetime.combine(first.date() + timedelta(days=every_days), datetime.min.time())
+    now = datetime.utcnow()
+    created = []
+    while day <= now:
+        if day not in taken:
+            created.append(take_checkpoint(day))
+            if progress:
+                progress(day)
+        day += timedelta(days=every_days)
+    return created
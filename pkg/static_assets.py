@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+
+from flask import current_app, request, send_file, url_for, abort
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional; gzip variants are still produced
+    brotli = None
+
+MANIFEST_NAME = "static-manifest.json"
+HASH_LEN = 10
+COMPRESSIBLE = {".css", ".js", ".map", ".svg", ".ttf", ".eot", ".json", ".txt", ".html"}
+SKIP_DIRS = {"uploaded"}  # user uploads have their own storage and caching
+FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % HASH_LEN)
+ONE_YEAR = 31536000
+
+_lock = threading.Lock()
+_hashes = {}  # relative path -> (mtime_ns, size, digest)
+
+
+def _build_dir(app):
+    return app.config["STATIC_BUILD_DIR"] or os.path.join(app.instance_path, "static-build")
+
+
+def _file_digest(path):
+    h = hashlib.md5(usedforsecurity=False)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(64 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+
+def file_hash(filename):
+    """Content hash of a static file, recomputed only when the file changes."""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cached = _hashes.get(filename)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = _file_digest(path)
+    with _lock:
+        _hashes[filename] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def fingerprinted_name(filename, digest):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{digest}{ext}"
+
+
+def static_url(filename):
+    """Drop-in for url_for('static', ...) that emits a content-hashed, cache-forever URL."""
+    digest = file_hash(filename)
+    if digest is None:
+        return url_for("static", filename=filename)
+    return url_for("hashed_static", filename=fingerprinted_name(filename, digest))
+
+
+def _pick_encoding(build_dir, filename):
+    # highest client q-value first, br before gzip on a tie; q=0 means "not acceptable"
+    accepted = request.accept_encodings
+    ranked = sorted((("br", ".br"), ("gzip", ".gz")), key=lambda enc: -accepted.quality(enc[0]))
+    for encoding, suffix in ranked:
+        if accepted.quality(encoding) > 0:
+            candidate = safe_join(build_dir, filename + suffix)
+            if candidate and os.path.isfile(candidate):
+                return encoding, candidate
+    return None, None
+
+
+def serve_hashed_static(filename):
+    app = current_app
+    original, immutable = filename, False
+    match = FINGERPRINTED.match(filename)
+    if match:
+        candidate = match.group("stem") + match.group("ext")
+        if file_hash(candidate) == match.group("hash"):
+            original, immutable = candidate, True
+        elif file_hash(candidate) is not None:
+            # stale hash from an old page: serve the current file, but don't pin it
+            original = candidate
+
+    path = safe_join(app.static_folder, original)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    max_age = ONE_YEAR if immutable else app.get_send_file_max_age(original)
+    encoding, encoded_path = _pick_encoding(_build_dir(app), original)
+    if encoding and os.path.getmtime(encoded_path) >= os.path.getmtime(path):
+        response = send_file(encoded_path, mimetype=_mimetype(original), max_age=max_age, conditional=True)
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = send_file(path, max_age=max_age, conditional=True)
+    response.vary.add("Accept-Encoding")
+    if immutable:
+        response.cache_control.immutable = True
+        response.cache_control.public = True
+    return response
+
+
+def _mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def iter_static_files(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        rel_root = os.path.relpath(root, static_folder)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            rel_root = ""
+        for name in files:
+            yield os.path.join(rel_root, name).replace(os.sep, "/")
+
+
+def build_static(app, compress=True):
+    """Hash every static file, write the manifest and precompressed variants.
+
+    Returns (files hashed, variants written).
+    """
+    build_dir = _build_dir(app)
+    os.makedirs(build_dir, exist_ok=True)
+    manifest, written = {}, 0
+    for filename in iter_static_files(app.static_folder):
+        path = os.path.join(app.static_folder, filename)
+        st = os.stat(path)
+        digest = _file_digest(path)
+        manifest[filename] = [st.st_mtime_ns, st.st_size, digest]
+        if not compress or os.path.splitext(filename)[1].lower() not in COMPRESSIBLE:
+            continue
+        with open(path, "rb") as fh:
+            data = fh.read()
+        target = os.path.join(build_dir, filename)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target + ".gz", "wb") as out:
+            out.write(gzip.compress(data, compresslevel=9, mtime=0))
+        written += 1
+        if brotli is not None:
+            with open(target + ".br", "wb") as out:
+                out.write(brotli.compress(data, quality=11))
+            written += 1
+
+    with open(os.path.join(build_dir, MANIFEST_NAME), "w") as fh:
+        json.dump(manifest, fh)
+    load_manifest(app)
+    return len(manifest), written
+
+
+def load_manifest(app):
+    # a prebuilt manifest saves hashing 45 MB of vendor assets in each worker
+    path = os.path.join(_build_dir(app), MANIFEST_NAME)
+    try:
+        with open(path) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    with _lock:
+        for filename, (mtime_ns, size, digest) in manifest.items():
+            _hashes[filename] = (mtime_ns, size, digest)
+    return True
+
+
+def init_static_assets(app):
+    app.add_url_rule("/s/<path:filename>", "hashed_static", serve_hashed_static)
+    app.jinja_env.globals["static_url"] = static_url
+    load_manifest(app)
@@ -0,0 +1,106 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from flask import current_app
+from sqlalchemy import func, inspect
+
+from pkg.cache_versions import bump_shared_version, forget_shared_version, shared_version
+from pkg.models import db, Vendor, Asset, AssetCategory, AssetStatus
+from pkg.session_events import on_commit_when
+
+CACHE_NAME = "dashboard"
+DIRTY_KEY = "dashboard_dirty"
+
+_lock = threading.Lock()
+# as for reference data: the local version moves right after a commit here,
+# the shared one (cache_versions) with every commit in any worker
+_cache = {"stats": None, "version": 0, "shared_version": None, "expires": 0.0}
+
+
+def invalidate_dashboard_stats():
+    with _lock:
+        _cache["version"] += 1
+        _cache["stats"] = None
+    forget_shared_version(CACHE_NAME)
+
+
+def dashboard_changed(session):
+    """For Core-level writes the flush hook cannot see: invalidate everywhere once ``session`` commits."""
+    bump_shared_version(session, CACHE_NAME)
+    session.info[DIRTY_KEY] = True
+
+
+def status_counts_query():
+    # every status bucket from a single GROUP BY instead of one COUNT per status
+    return db.session.query(Asset.current_status, func.count(Asset.id)).group_by(Asset.current_status)
+
+
+def latest_assets_query(limit=6):
+    return db.session.query(Asset, Vendor.vendor_name, AssetCategory.name.label("category_name"))\
+        .join(Vendor, Vendor.id == Asset.vendor_id, isouter=True)\
+        .join(AssetCategory, AssetCategory.id == Asset.category_id, isouter=True)\
+        .order_by(Asset.created_at.desc(), Asset.id.desc())\
+        .limit(limit)
+
+
+def _compute_dashboard_stats():
+    rows = status_counts_query().all()
+    status_counts = {status.value: 0 for status in AssetStatus}
+    for status, count in rows:
+        status_counts[status.value] = count
+
+    total_vendors = db.session.query(func.count(Vendor.id)).scalar() or 0
+
+    latest = latest_assets_query().all()
+    # keep plain snapshots so cached rows never touch a closed session
+    latest_assets = [
+        (SimpleNamespace(id=a.id, name=a.name, picture=a.picture, current_status=a.current_status),
+         vendor_name, category_name)
+        for a, vendor_name, category_name in latest
+    ]
+
+    return {
+        "total_vendors": total_vendors,
+        "total_assets": sum(status_counts.values()),
+        "status_counts": status_counts,
+        "latest_assets": latest_assets,
+    }
+
+
+def get_dashboard_stats():
+    ttl = current_app.config["DASHBOARD_CACHE_TTL"]
+    now = time.monotonic()
+    shared = shared_version(CACHE_NAME) if ttl > 0 else None
+    with _lock:
+        version = _cache["version"]
+        if _cache["stats"] is not None and _cache["shared_version"] == shared and now < _cache["expires"]:
+            return _cache["stats"]
+
+    stats = _compute_dashboard_stats()
+    if ttl > 0:
+        with _lock:
+            # a commit that landed while we were counting makes these numbers stale already
+            if _cache["version"] == version:
+                _cache.update(stats=stats, shared_version=shared, expires=now + ttl)
+    return stats
+
+
+def _touches_dashboard(session):
+    for obj in session.new:
+        if isinstance(obj, (Asset, Vendor)):
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, (Asset, Vendor)):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Asset):
+            state = inspect(obj)
+            for attr in ("current_status", "name", "picture", "vendor_id", "category_id"):
+                if state.attrs[attr].history.has_changes():
+                    return True
+    return False
+
+
+on_commit_when(DIRTY_KEY, _touches_dashboard, invalidate_dashboard_stats,
+               before_flush=lambda session: bump_shared_version(session, CACHE_NAME))
@@ -0,0 +1,128 @@
+import csv
+import io
+from itertools import islice
+
+from pkg.models import db, Asset, AssetStatus
+from pkg.pagination import CHUNK
+from pkg.serials import serial_key
+
+# statuses that mean the asset should physically be on site at a stocktake
+ON_SITE = (AssetStatus.INVENTORY, AssetStatus.REPAIR)
+HEADER_NAMES = ("serial", "serial_number", "serial number", "sn")
+
+
+class StocktakeReport:
+    def __init__(self):
+        self.scanned = 0
+        self.found = 0
+        self.missing = []  # (serial, name, status, holder) expected on site but not scanned
+        self.unknown = []  # (line, serial) scanned but not in the register
+        self.duplicates = []  # (line, serial) scanned more than once
+        self.mismatches = []  # (serial, name, problem)
+
+    def to_dict(self):
+        return {
+            "scanned": self.scanned,
+            "found": self.found,
+            "missing": [
+                {"serial_number": serial, "name": name, "status": status.value, "holder": holder}
+                for serial, name, status, holder in self.missing
+            ],
+            "unknown": [{"line": line, "serial_number": serial} for line, serial in self.unknown],
+            "duplicates": [{"line": line, "serial_number": serial} for line, serial in self.duplicates],
+            "mismatches": [
+                {"serial_number": serial, "name": name, "problem": problem}
+                for serial, name, problem in self.mismatches
+            ],
+        }
+
+
+def iter_scans(stream):
+    """Yield (line number, serial, holder or None) from a scanner export.
+
+    Accepts one serial per line, or CSV lines of ``serial,holder``; a header
+    row naming the serial column is skipped. Works on byte or text streams
+    without reading the whole upload into memory.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    for row in reader:
+        fields = [f.strip() for f in row]
+        if not fields or not fields[0]:
+            continue
+        if reader.line_num == 1 and fields[0].lower() in HEADER_NAMES:
+            continue
+        holder = fields[1] if len(fields) > 1 and fields[1] else None
+        yield reader.line_num, fields[0], holder
+
+
+def _check(serial, name, status, recorded_holder, scanned_holder, report):
+    if status == AssetStatus.RETIRED:
+        report.mismatches.append((serial, name, "Retired asset found during the stocktake"))
+    elif scanned_holder is not None:
+        if (recorded_holder or "").lower() != scanned_holder.lower():
+            report.mismatches.append(
+                (serial, name, f"Scanned with {scanned_holder}, recorded holder is {recorded_holder or 'nobody'}")
+            )
+    elif status == AssetStatus.ASSIGNED:
+        report.mismatches.append(
+            (serial, name, f"Found in stock but recorded as assigned to {recorded_holder or 'nobody'}")
+        )
+
+
+def reconcile(scans, include_assigned=False, vendor_id=None, category_id=None):
+    """Diff an iterable of (line, serial, holder) scans against the asset register.
+
+    Scans are resolved in chunks with one IN-query each, so the upload is
+    never held in memory as a whole, and the register is then walked once
+    to list expected assets that were not scanned. ``include_assigned`` also expects assigned assets to be seen
+    (when the scan covers people's desks); the vendor/category filters
+    narrow the audit to part of the register.
+    """
+    report = StocktakeReport()
+    seen_serials = set()
+    found_ids = set()
+    cols = (Asset.id, Asset.serial_number, Asset.name, Asset.current_status, Asset.current_holder)
+    scans = iter(scans)
+
+    while True:
+        chunk = list(islice(scans, CHUNK))
+        if not chunk:
+            break
+        report.scanned += len(chunk)
+
+        batch = {}  # serial_key -> (line, serial as scanned, holder)
+        for line, serial, holder in chunk:
+            key = serial_key(serial)
+            if key in seen_serials:
+                report.duplicates.append((line, serial))
+                continue
+            seen_serials.add(key)
+            batch[key] = (line, serial, holder)
+        if not batch:
+            continue
+
+        rows = db.session.query(*cols).filter(Asset.serial_number.in_([s for _, s, _ in batch.values()]))
+        for asset_id, serial, name, status, recorded_holder in rows:
+            scan = batch.pop(serial_key(serial), None)
+            if scan is None:
+                continue
+            found_ids.add(asset_id)
+            report.found += 1
+            _check(serial, name, status, recorded_holder, scan[2], report)
+        # whatever did not come back, under any spelling, is not in the register
+        report.unknown.extend((line, serial) for line, serial, _ in batch.values())
+
+    expected = list(ON_SITE) + ([AssetStatus.ASSIGNED] if include_assigned else [])
+    register = db.session.query(*cols).filter(Asset.current_status.in_(expected))
+    if vendor_id:
+        register = register.filter(Asset.vendor_id == vendor_id)
+    if category_id:
+        register = register.filter(Asset.category_id == category_id)
+    for asset_id, serial, name, status, holder in register.order_by(Asset.id).yield_per(2000):
+        if asset_id not in found_ids:
+            report.missing.append((serial, name, status, holder))
+    return report
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError
+
+from pkg.images import upload_folder, remove_variants
+from pkg.models import db, StoredFile
+
+CHUNK_SIZE = 64 * 1024
+HASHED_NAME = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$")
+HASHED_VARIANT = re.compile(r"^variants/[0-9a-f]{64}_[a-z]+\.webp$")
+
+
+def is_content_addressed(picture):
+    return bool(picture and HASHED_NAME.match(picture))
+
+
+def is_immutable(path):
+    # hashed blobs and their variants never change under the same name
+    return is_content_addressed(path) or bool(HASHED_VARIANT.match(path))
+
+
+def _extension(filename):
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return "jpg" if ext == "jpeg" else (ext or "bin")
+
+
+def save_upload(file_storage):
+    """Store an upload under its SHA-256 and take a reference on it.
+
+    The file is hashed while it is streamed to a temp file, so it is only
+    read once. Returns (picture path relative to the upload folder, is_new),
+    where is_new means this is the first reference to the blob. Content that
+    is already stored keeps its first path, whatever the new upload's
+    extension. The reference is part of the current transaction; the caller
+    commits, and a blob written for it is removed again on rollback.
+    """
+    folder = upload_folder()
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            stream = file_storage.stream
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        sha = digest.hexdigest()
+        stored = db.session.query(StoredFile.filename).filter_by(sha256=sha).scalar()
+        picture = stored or f"{sha[:2]}/{sha}.{_extension(file_storage.filename)}"
+        target = os.path.join(folder, picture)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp_path, target)
+            db.session.info.setdefault("written_blobs", []).append(picture)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    stored, is_new = _add_reference(sha, picture, size)
+    if stored != picture:
+        # lost a race to store the same bytes under another extension
+        _forget_written(picture)
+    return stored, is_new
+
+
+def _forget_written(picture):
+    written = db.session.info.get("written_blobs", [])
+    if picture in written:
+        written.remove(picture)
+        delete_blob(picture, variants=False)
+
+
+def _add_reference(sha, picture, size):
+    """Take a reference on blob ``sha``; returns (its stored path, whether the row is new)."""
+    bumped = db.session.execute(
+        update(StoredFile).where(StoredFile.sha256 == sha)
+        .values(ref_count=StoredFile.ref_count + 1)
+    ).rowcount
+    if not bumped:
+        try:
+            with db.session.begin_nested():
+                db.session.add(StoredFile(sha256=sha, filename=picture, size=size, ref_count=1))
+            return picture, True
+        except IntegrityError:
+            # someone else stored the same blob first
+            db.session.execute(
+                update(StoredFile).where(StoredFile.sha256 == sha)
+                .values(ref_count=StoredFile.ref_count + 1)
+            )
+    return db.session.query(StoredFile.filename).filter_by(sha256=sha).scalar(), False
+
+
+def release_upload(picture):
+    """Drop one reference to ``picture``.
+
+    Returns True when nothing references the blob any more and its file can
+    be removed with :func:`delete_blob` once the transaction has committed.
+    """
+    if not is_content_addressed(picture):
+        # legacy per-asset upload, never shared
+        return True
+    # by hash, not path: older rows may have been referenced under another extension
+    sha = os.path.splitext(os.path.basename(picture))[0]
+    row = db.session.get(StoredFile, sha)
+    if row is None:
+        return True
+    db.session.execute(
+        update(StoredFile).where(StoredFile.sha256 == row.sha256)
+        .values(ref_count=StoredFile.ref_count - 1)
+    )
+    db.session.refresh(row)
+    if row.ref_count <= 0:
+        db.session.delete(row)
+        return True
+    return False
+
+
+def delete_blob(picture, variants=True):
+    folder = upload_folder()
+    try:
+        os.remove(os.path.join(folder, picture))
+    except FileNotFoundError:
+        pass
+    if variants:
+        remove_variants(folder, picture)
+
+
+@event.listens_for(db.session, "after_commit")
+def _keep_written_blobs(session):
+    if not session.in_nested_transaction():  # releasing a savepoint also fires after_commit
+        session.info.pop("written_blobs", None)
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _remove_written_blobs(session, previous_transaction):
+    if previous_transaction.nested:
+        return  # a savepoint, e.g. the lost insert race in _add_reference
+    # blobs first written for a transaction that never committed have no row pointing at them
+    for picture in session.info.pop("written_blobs", ()):
+        delete_blob(picture, variants=False)
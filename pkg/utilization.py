@@ -0,0 +1,330 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+from pkg.archive import initial_statuses, iter_archived
+from pkg.models import (
+    db, Asset, AssetStatus, AssetStatusHistory, AssetStatusDaily, AssetStatusFrontier, ArchiveSegment
+)
+from pkg.pagination import chunks
+from pkg.refdata import get_categories, get_vendors
+
+DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+STATUSES = list(AssetStatus)
+STATUS_CODE = {status: code for code, status in enumerate(STATUSES)}
+DIMENSIONS = ("category", "vendor")
+
+AssetArrays = namedtuple("AssetArrays", "ids category vendor created initial")
+UtilizationRow = namedtuple("UtilizationRow", "key_id name days share entries avg_stay")
+
+
+def _epoch(when):
+    return (when - EPOCH).total_seconds()
+
+
+class RollupReport:
+    def __init__(self):
+        self.days = 0
+        self.events = 0
+        self.rows = 0
+        self.first_day = None
+        self.last_day = None
+
+
+# numpy is imported inside the rollup functions so the web app does not load it at startup
+def _load_assets():
+    """Per-asset arrays, sorted by id, for every asset in the register."""
+    import numpy as np
+
+    rows = db.session.execute(
+        select(Asset.id, Asset.category_id, Asset.vendor_id, Asset.created_at, Asset.current_status)
+        .order_by(Asset.id)
+    ).all()
+    initial = initial_statuses((r[0], r[4]) for r in rows)
+    return AssetArrays(
+        ids=np.fromiter((r[0] for r in rows), np.int64, len(rows)),
+        category=np.fromiter((r[1] or 0 for r in rows), np.int64, len(rows)),
+        vendor=np.fromiter((r[2] or 0 for r in rows), np.int64, len(rows)),
+        created=np.fromiter((_epoch(r[3]) if r[3] else 0.0 for r in rows), np.float64, len(rows)),
+        initial=np.fromiter((STATUS_CODE[initial[r[0]]] for r in rows), np.int64, len(rows)),
+    )
+
+
+def _positions(assets, asset_ids):
+    """Index of each id in ``assets`` and a mask of the ids that still exist."""
+    import numpy as np
+
+    pos = np.searchsorted(assets.ids, asset_ids)
+    pos = np.minimum(pos, max(len(assets.ids) - 1, 0))
+    found = assets.ids[pos] == asset_ids if len(assets.ids) else np.zeros(len(asset_ids), bool)
+    return pos, found
+
+
+def _load_frontier(assets):
+    import numpy as np
+
+    state = np.full(len(assets.ids), -1, np.int64)
+    rows = db.session.execute(select(AssetStatusFrontier.asset_id, AssetStatusFrontier.status)).all()
+    if rows and len(assets.ids):
+        ids = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+        codes = np.fromiter((STATUS_CODE[r[1]] for r in rows), np.int64, len(rows))
+        pos, found = _positions(assets, ids)
+        state[pos[found]] = codes[found]
+    return state
+
+
+def _load_events(assets, start, end):
+    """(asset index, epoch seconds, status code) of every status change in [start, end)."""
+    import numpy as np
+
+    ids, times, codes = [], [], []
+    table = AssetStatusHistory.__table__
+    hot = db.session.execute(
+        select(table.c.asset_id, table.c.timestamp, table.c.status)
+        .where(table.c.timestamp >= start, table.c.timestamp < end)
+    )
+    for asset_id, when, status in hot:
+        ids.append(asset_id or 0)
+        times.append(_epoch(when))
+        codes.append(STATUS_CODE[status])
+    # the oldest events may already have been moved to archive segments
+    for record in iter_archived("history", start, end):
+        when = datetime.fromisoformat(record["timestamp"]) if record.get("timestamp") else None
+        if when is None or not start <= when < end:
+            continue
+        ids.append(record.get("asset_id") or 0)
+        times.append(_epoch(when))
+        codes.append(STATUS_CODE[AssetStatus[record["status"]]])
+
+    ids = np.array(ids, np.int64)
+    pos, found = _positions(assets, ids)
+    return pos[found], np.array(times, np.float64)[found], np.array(codes, np.int64)[found]
+
+
+def time_in_status(assets, state, events, start, end):
+    """Turn every asset's timeline in [start, end) into status intervals.
+
+    ``state`` holds each asset's status code at ``start`` (-1 when unknown:
+    the asset is new to the rollup). Returns (intervals, new state), where
+    the intervals are parallel arrays (asset index, begin, end, status code,
+    entered) and ``entered`` marks an interval that starts a new stay.
+    """
+    import numpy as np
+
+    # where each asset's timeline starts in this window
+    carried = state >= 0
+    idx0 = np.flatnonzero(carried | (assets.created < end))
+    from_state = carried[idx0]
+    t0 = np.where(from_state, start, np.maximum(assets.created[idx0], start))
+    s0 = np.where(from_state, state[idx0], assets.initial[idx0])
+
+    # recorded changes, never earlier than the asset itself
+    e_idx, e_t, e_s = events
+    e_t = np.maximum(e_t, np.maximum(assets.created[e_idx], start))
+    valid = e_t < end
+    e_idx, e_t, e_s = e_idx[valid], e_t[valid], e_s[valid]
+
+    asset = np.concatenate([idx0, e_idx])
+    t = np.concatenate([t0, e_t])
+    status = np.concatenate([s0, e_s])
+    seq = np.concatenate([np.zeros(len(idx0), np.int64), np.arange(1, len(e_idx) + 1)])
+    fresh = np.concatenate([~from_state, np.ones(len(e_idx), bool)])
+    order = np.lexsort((seq, t, asset))
+    asset, t, status, fresh = asset[order], t[order], status[order], fresh[order]
+
+    # each change point lasts until the asset's next one, or the end of the window
+    same_next = np.zeros(len(asset), bool)
+    same_next[:-1] = asset[1:] == asset[:-1]
+    stop = np.where(same_next, np.roll(t, -1), end)
+    new_state = state.copy()
+    new_state[asset[~same_next]] = status[~same_next]
+
+    keep = stop > t
+    asset, t, stop, status, fresh = asset[keep], t[keep], stop[keep], status[keep], fresh[keep]
+    # a repeat of the status an asset is already in continues its stay
+    same_prev = np.zeros(len(asset), bool)
+    same_prev[1:] = asset[1:] == asset[:-1]
+    entered = np.where(same_prev, status != np.roll(status, 1), fresh)
+    return (asset, t, stop, status, entered), new_state
+
+
+def aggregate(intervals, keys, n_assets):
+    """Sum intervals per (day, key, status): seconds, distinct assets and stays entered.
+
+    Only the first and last day of an interval are partial; the whole days in
+    between are added with a difference array over (day, key, status), so a
+    month-long stay costs two pieces instead of thirty.
+    """
+    import numpy as np
+
+    asset, begin, finish, status, entered = intervals
+    n_status = len(STATUSES)
+    key_values, key_of_asset = np.unique(keys, return_inverse=True)
+    n_keys = max(len(key_values), 1)
+    if not len(asset):
+        empty = np.zeros(0, np.int64)
+        return empty, empty, empty, np.zeros(0), empty, empty
+
+    first = np.floor(begin / DAY).astype(np.int64)
+    last = np.ceil(finish / DAY).astype(np.int64) - 1
+    day0 = first.min()
+    n_days = int(last.max() - day0 + 1)
+    cell_key = key_of_asset[asset]
+
+    # partial days: the head of every interval and the tail of those spanning days
+    spans = last > first
+    p_asset = np.concatenate([asset, asset[spans]])
+    p_day = np.concatenate([first, last[spans]]) - day0
+    p_key = np.concatenate([cell_key, cell_key[spans]])
+    p_status = np.concatenate([status, status[spans]])
+    p_seconds = np.concatenate([np.minimum(finish, (first + 1) * DAY) - begin, (finish - last * DAY)[spans]])
+    p_entered = np.concatenate([entered, np.zeros(spans.sum(), bool)])
+    cell = (p_day * n_keys + p_key) * n_status + p_status
+    size = n_days * n_keys * n_status
+    total = np.bincount(cell, weights=p_seconds, minlength=size)
+    stays = np.bincount(cell, weights=p_entered, minlength=size).astype(np.int64)
+    # an asset can enter the same status twice in a day; count it once
+    distinct = np.bincount(np.unique(cell * n_assets + p_asset) // n_assets, minlength=size)
+
+    # whole days: +1 on the first one, -1 after the last, then a running sum
+    whole = last - first >= 2
+    diff = np.zeros((n_days + 1, n_keys, n_status), np.int64)
+    np.add.at(diff, (first[whole] + 1 - day0, cell_key[whole], status[whole]), 1)
+    np.add.at(diff, (last[whole] - day0, cell_key[whole], status[whole]), -1)
+    full = np.cumsum(diff, axis=0)[:n_days].ravel()
+    total += full * DAY
+    distinct += full
+
+    groups = np.flatnonzero(total > 0)
+    rest, codes = np.divmod(groups, n_status)
+    days, key_pos = np.divmod(rest, n_keys)
+    return days + day0, key_values[key_pos], codes, total[groups], distinct[groups], stays[groups]
+
+
+def _first_day():
+    candidates = [
+        db.session.query(func.min(Asset.created_at)).scalar(),
+        db.session.query(func.min(AssetStatusHistory.timestamp)).scalar(),
+        db.session.query(func.min(ArchiveSegment.oldest)).filter(ArchiveSegment.table_name == "history").scalar(),
+    ]
+    candidates = [c for c in candidates if c is not None]
+    return min(candidates).date() if candidates else None
+
+
+def rolled_up_through():
+    return db.session.query(func.max(AssetStatusDaily.day)).scalar()
+
+
+def _save_chunk(first, last, assets, intervals, old_state, new_state):
+    import numpy as np
+
+    rows = []
+    for dimension in DIMENSIONS:
+        keys = getattr(assets, dimension)
+        for day, key_id, code, seconds, distinct, stays in zip(*aggregate(intervals, keys, len(assets.ids))):
+            rows.append({
+                "day": EPOCH.date() + timedelta(days=int(day)), "dimension": dimension,
+                "key_id": int(key_id), "status": STATUSES[code], "seconds": float(seconds),
+                "assets": int(distinct), "entries": int(stays),
+            })
+    db.session.execute(delete(AssetStatusDaily.__table__).where(
+        AssetStatusDaily.day >= first, AssetStatusDaily.day <= last
+    ))
+    for chunk in chunks(rows):
+        db.session.execute(insert(AssetStatusDaily.__table__), chunk)
+
+    changed = np.flatnonzero(new_state != old_state)
+    frontier = AssetStatusFrontier.__table__
+    for part in chunks(changed):
+        ids = [int(a) for a in assets.ids[part]]
+        db.session.execute(delete(frontier).where(frontier.c.asset_id.in_(ids)))
+        db.session.execute(insert(frontier), [
+            {"asset_id": asset_id, "status": STATUSES[code]} for asset_id, code in zip(ids, new_state[part])
+        ])
+    db.session.commit()
+    return len(rows)
+
+
+def roll_up_utilization(until=None, rebuild=False, chunk_days=None, progress=None):
+    """Bring the daily time-in-status rollups up to the end of yesterday (or ``until``).
+
+    Days are processed in chunks of ``chunk_days``; each chunk reads only the
+    status changes inside it, starts from the per-asset frontier the previous
+    chunk left behind and commits its rollups and frontier together, so an
+    interrupted run loses at most one chunk.
+    """
+    report = RollupReport()
+    end_day = until or datetime.utcnow().date()
+    chunk_days = chunk_days or current_app.config["UTILIZATION_CHUNK_DAYS"]
+    if rebuild:
+        db.session.execute(delete(AssetStatusDaily.__table__))
+        db.session.execute(delete(AssetStatusFrontier.__table__))
+        db.session.commit()
+    else:
+        # deleted assets no longer count anywhere
+        db.session.execute(delete(AssetStatusFrontier.__table__).where(
+            AssetStatusFrontier.asset_id.not_in(select(Asset.id))
+        ))
+        db.session.commit()
+
+    last = rolled_up_through()
+    day = last + timedelta(days=1) if last else _first_day()
+    if day is None or day >= end_day:
+        return report
+
+    assets = _load_assets()
+    state = _load_frontier(assets)
+    report.first_day = day
+    while day < end_day:
+        chunk_end = min(end_day, day + timedelta(days=chunk_days))
+        start = datetime.combine(day, datetime.min.time())
+        end = datetime.combine(chunk_end, datetime.min.time())
+        events = _load_events(assets, start, end)
+        intervals, new_state = time_in_status(assets, state, events, _epoch(start), _epoch(end))
+        report.rows += _save_chunk(day, chunk_end - timedelta(days=1), assets, intervals, state, new_state)
+        report.events += len(events[0])
+        report.days += (chunk_end - day).days
+        state = new_state
+        day = chunk_end
+        if progress:
+            progress(day)
+    report.last_day = end_day - timedelta(days=1)
+    return report
+
+
+def utilization_report(dimension, start=None, end=None):
+    """Asset-days, share of time, stays entered and average stay per status, per category or vendor.
+
+    Reads only the persisted daily rollups, so years of history cost one
+    GROUP BY over at most a few rows per day.
+    """
+    daily = AssetStatusDaily
+    query = db.session.query(daily.key_id, daily.status, func.sum(daily.seconds), func.sum(daily.entries))\
+        .filter(daily.dimension == dimension)
+    if start:
+        query = query.filter(daily.day >= start)
+    if end:
+        query = query.filter(daily.day <= end)
+    totals = {}
+    for key_id, status, seconds, entries in query.group_by(daily.key_id, daily.status):
+        totals.setdefault(key_id, {})[status] = (seconds or 0.0, entries or 0)
+
+    names = {c.id: c.name for c in get_categories()} if dimension == "category" \
+        else {v.id: v.vendor_name for v in get_vendors()}
+    rows = []
+    for key_id, by_status in totals.items():
+        all_seconds = sum(seconds for seconds, _ in by_status.values()) or 1.0
+        days, share, entries, avg_stay = {}, {}, {}, {}
+        for status in STATUSES:
+            seconds, stays = by_status.get(status, (0.0, 0))
+            days[status] = seconds / DAY
+            share[status] = seconds / all_seconds
+            entries[status] = stays
+            avg_stay[status] = seconds / DAY / stays if stays else None
+        rows.append(UtilizationRow(key_id, names.get(key_id, "—" if not key_id else f"#{key_id}"),
+                                   days, share, entries, avg_stay))
+    rows.sort(key=lambda r: -sum(r.days.values()))
+    return rows
@@ -1,17 +1,16 @@
-from flask import render_template, redirect, flash, request, session, url_for
+from flask import Blueprint, render_template, redirect, flash, request, session, url_for
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_wtf.csrf import generate_csrf
-from flask import current_app as app
-from sqlalchemy import func
 
 from pkg.forms import AssetForm, VendorSignupForm, Vendorlogform
 from pkg.models import Vendor, Asset, AssetCategory, db
-from werkzeug.utils import secure_filename
-import os
-import secrets
+from pkg.images import schedule_variants
+from pkg.storage import save_upload
 
+bp = Blueprint("vendor", __name__)
 
-@app.route('/vendor-signup/', methods=['GET', 'POST'])
+
+@bp.route('/vendor-signup/', methods=['GET', 'POST'])
 def handle_vendor_signup():
     vendor = VendorSignupForm()
     if vendor.validate_on_submit():
@@ -30,7 +29,7 @@ def handle_vendor_signup():
         return redirect('/vendor-login/')
     return render_template('vendor/vendor_signup.html', vendor=vendor)
 
-@app.route('/vendor-login/', methods=['GET', 'POST'])  
+@bp.route('/vendor-login/', methods=['GET', 'POST'])  
 def vendor_login():
     vendor = Vendorlogform()
     if request.method == "GET":
@@ -50,7 +49,13 @@ def vendor_login():
                 flash('Invalid username or password.', 'error')
     return render_template('vendor/vendor_login.html', vendor=vendor)
 
-@app.route('/vendor/')
+def vendor_assets_query(vendor_id):
+    return db.session.query(Asset, AssetCategory.name)\
+        .join(AssetCategory, AssetCategory.id == Asset.category_id)\
+        .filter(Asset.vendor_id == vendor_id)
+
+
+@bp.route('/vendor/')
 def vendor():
     vendor_id = session.get("vendor_loggedin")
     if not vendor_id:
@@ -58,21 +63,15 @@ def vendor():
         return redirect('/vendor-login/')
 
     vendor = db.session.query(Vendor).filter(Vendor.id == vendor_id).first()
-    vendeets = db.session.query(Asset, AssetCategory.name)\
-    .join(AssetCategory, AssetCategory.id == Asset.category_id)\
-    .filter(Asset.vendor_id == vendor_id).all()
-    total = len(vendeets)
-    quantity = db.session.query(
-        func.sum(Asset.quantity)
-    ).filter(
-        Asset.vendor_id == vendor_id
-    ).scalar() or 0
-    quantity = int(quantity)
-    print(vendeets)
     if not vendor:
         flash('Vendor not found', 'error')
         return redirect('/vendor-login/')
 
+    vendeets = vendor_assets_query(vendor_id).all()
+    # totals come from the maintained rollup columns, not a scan of the assets
+    total = vendor.asset_count
+    quantity = vendor.total_quantity
+
     form = AssetForm()
     form.populate_categories()  
 
@@ -84,7 +83,7 @@ def vendor():
     )
 
 
-@app.route('/vendor-add-asset/', methods=['GET', 'POST'])
+@bp.route('/vendor-add-asset/', methods=['GET', 'POST'])
 def vendor_addasset():
     vendor_id = session.get("vendor_loggedin")
     if not vendor_id or not db.session.query(Vendor).filter(Vendor.id == vendor_id).first():
@@ -98,7 +97,12 @@ def vendor_addasset():
     if request.method == "GET":
         return render_template('vendor/vendor_dashboard.html', form=form)
 
-    # Handle form submission
+    # Handle form submission; the vendor is fixed by the session, not the form
+    form.vendor_id.data = vendor_id
+    if not form.validate_on_submit():
+        flash('Please fix the errors on the form.', 'error')
+        return redirect(url_for('vendor.vendor'))
+
     new_asset = Asset(
         name=form.name.data,
         serial_number=form.serial_number.data,
@@ -111,21 +115,19 @@ def vendor_addasset():
         
     )
 
+    is_new_picture = False
     if form.picture.data:
-        upload_folder = os.path.join(app.root_path, 'static', 'uploaded')
-        os.makedirs(upload_folder, exist_ok=True)
-        filename = secure_filename(form.picture.data.filename)
-        file_path = os.path.join(upload_folder, filename)
-        form.picture.data.save(file_path)
-        new_asset.picture = filename
+        new_asset.picture, is_new_picture = save_upload(form.picture.data)
 
     db.session.add(new_asset)
     db.session.commit()
+    if is_new_picture:
+        schedule_variants(new_asset.picture)
 
     flash('Product added successfully!', 'success')
-    return redirect(url_for('vendor'))
+    return redirect(url_for('vendor.vendor'))
 
-@app.route("/vendor-logout/")
+@bp.route("/vendor-logout/")
 def vendor_logout():
     session.pop('vendor_loggedin', None)
     return redirect('/')
\ No newline at end of file
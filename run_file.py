@@ -1,13 +1,6 @@
-from pkg import create_app, db
+from pkg import create_app
 
 app = create_app()
 
-with app.app_context():
-    db.create_all()
-    from pkg import routes, vendor_routes, admin_routes
-    from pkg import forms
-    from setup import *
-    create_categories()
-
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,75 @@
+import pytest
+
+from pkg import create_app
+from pkg.commands import seed_categories
+from pkg.models import db, Asset, Vendor
+
+
+def make_app(tmp_path, **overrides):
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'inventory.db'}",
+        "DATABASE_REPLICA_URI": None,
+        "SECRET_KEY": "test",
+        "WTF_CSRF_ENABLED": False,
+        "TESTING": True,
+        "SQL_PROFILING": False,
+        "METRICS_ENABLED": False,
+        "TEMPLATE_CACHE_DIR": None,
+        "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+        "ARCHIVE_DIR": str(tmp_path / "archive"),
+        **overrides,
+    })
+
+
+@pytest.fixture
+def app_factory(tmp_path):
+    """create_app() with the test settings plus ``overrides``, for config-dependent tests."""
+    return lambda **overrides: make_app(tmp_path, **overrides)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        seed_categories()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def nocase_app(tmp_path):
+    """Like ``app``, with serial numbers compared case-insensitively as under MySQL's default collation."""
+    column_type = Asset.__table__.c.serial_number.type
+    app = make_app(tmp_path)
+    with app.app_context():
+        column_type.collation = "NOCASE"
+        try:
+            db.create_all()
+        finally:
+            column_type.collation = None
+        seed_categories()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session["admin_loggedin"] = True
+    return client
+
+
+@pytest.fixture
+def vendor(app):
+    vendor = Vendor(vendor_name="Acme", vendor_email="acme@example.io", vendor_password="x")
+    db.session.add(vendor)
+    db.session.commit()
+    return vendor
@@ -0,0 +1,62 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from pkg.archive import archive_old_rows, asset_history_page, find_archived, iter_archived
+from pkg.exports import stream_export
+from pkg.models import db, Asset, AssetAssignment, AssetStatus, AssetStatusHistory
+
+
+def _asset_with_history(count=6):
+    asset = Asset(name="Laptop", serial_number="SN1")
+    db.session.add(asset)
+    db.session.flush()
+    start = datetime.utcnow() - timedelta(days=400)
+    for i in range(count):
+        # the first half is past the retention window, the rest stays hot
+        when = start + timedelta(days=i) if i < count // 2 else datetime.utcnow() - timedelta(minutes=count - i)
+        status = AssetStatus.ASSIGNED if i % 2 else AssetStatus.INVENTORY
+        db.session.add(AssetStatusHistory(asset_id=asset.id, status=status, changed_by="admin",
+                                          timestamp=when, note=f"change {i}"))
+    db.session.add(AssetAssignment(asset_id=asset.id, assigned_to="Alice",
+                                   assigned_at=start, returned_at=start + timedelta(days=1)))
+    db.session.commit()
+    return asset
+
+
+def _walk(name, asset_id, per_page):
+    rows, after = [], None
+    while True:
+        page = asset_history_page(name, asset_id, per_page, after)
+        rows.extend(page.items)
+        after = page.next_cursor
+        if not after:
+            return rows
+
+
+def test_archived_history_reads_back_unchanged(app):
+    asset = _asset_with_history()
+    before = [(r.id, r.status, r.timestamp, r.note) for r in _walk("history", asset.id, 100)]
+
+    report = archive_old_rows(older_than_days=30, batch_size=2)
+    assert report.rows == {"history": 3, "assignments": 1}
+    assert AssetStatusHistory.query.count() == 3 and AssetAssignment.query.count() == 0
+
+    rows = _walk("history", asset.id, 2)
+    assert [(r.id, r.status, r.timestamp, r.note) for r in rows] == before
+    assert [r.archived for r in rows] == [False] * 3 + [True] * 3
+    assert len(list(iter_archived("history"))) == 3
+    assignment = next(find_archived("assignments", [asset.id], [1]))
+    assert assignment.assigned_to == "Alice" and assignment.returned_at is not None
+
+
+def test_exports_include_archived_rows(app):
+    asset = _asset_with_history()
+    before = list(csv.reader(io.StringIO("".join(stream_export("history", "csv")))))
+    archive_old_rows(older_than_days=30, batch_size=2)
+
+    after = list(csv.reader(io.StringIO("".join(stream_export("history", "csv", chunk_rows=2)))))
+    assert after[0] == before[0]
+    assert sorted(after[1:]) == sorted(before[1:])
+    assignments = "".join(stream_export("assignments", "jsonl"))
+    assert '"assigned_to": "Alice"' in assignments and f'"serial_number": "{asset.serial_number}"' in assignments
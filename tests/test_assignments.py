@@ -0,0 +1,59 @@
+from pkg.assignments import holdings, open_assignment, return_asset
+from pkg.bulk import bulk_assign, bulk_change_status
+from pkg.models import db, Asset, AssetAssignment, AssetStatus
+
+
+def _asset(serial="SN1"):
+    asset = Asset(name="Laptop", serial_number=serial)
+    db.session.add(asset)
+    db.session.commit()
+    return asset
+
+
+def _assign(client, asset, holder):
+    return client.post(f"/admin/assign/{asset.id}/", data={
+        "assigned_to": holder, "assigned_by": "admin", "version": asset.version,
+    })
+
+
+def test_assign_and_reassign_keep_one_open_assignment(admin_client):
+    asset = _asset()
+    _assign(admin_client, asset, "Alice")
+    db.session.refresh(asset)
+    _assign(admin_client, asset, "Bob")
+    db.session.refresh(asset)
+    assert asset.current_holder == "Bob" and asset.current_status == AssetStatus.ASSIGNED
+    assert open_assignment(asset.id).assigned_to == "Bob"
+    assert AssetAssignment.query.count() == 2
+    assert holdings("Alice") == [] and len(holdings("Bob")) == 1
+
+
+def test_return_closes_the_assignment(app):
+    asset = _asset()
+    bulk_assign([asset.id], [], "Alice", "admin")
+    db.session.refresh(asset)
+    assert return_asset(asset, "admin")
+    db.session.commit()
+    assert asset.current_holder is None and asset.current_status == AssetStatus.INVENTORY
+    assert open_assignment(asset.id) is None
+    assert return_asset(asset, "admin") is False
+
+
+def test_status_change_out_of_assigned_releases_the_holder(admin_client):
+    asset = _asset()
+    _assign(admin_client, asset, "Alice")
+    db.session.refresh(asset)
+    admin_client.post(f"/admin/assets/status/{asset.id}/", data={"status": "REPAIR", "version": asset.version})
+    db.session.refresh(asset)
+    assert asset.current_status == AssetStatus.REPAIR and asset.current_holder is None
+    assert open_assignment(asset.id) is None and holdings("Alice") == []
+
+
+def test_bulk_status_change_out_of_assigned_releases_holders(app):
+    assets = [_asset(f"SN{i}") for i in range(3)]
+    ids = [a.id for a in assets]
+    bulk_assign(ids, [], "Alice", "admin")
+    report = bulk_change_status(ids, [], AssetStatus.RETIRED, "admin")
+    assert sorted(report.updated) == ids
+    assert holdings("Alice") == []
+    assert {a.current_holder for a in Asset.query} == {None}
@@ -0,0 +1,108 @@
+from sqlalchemy import update
+
+from pkg import bulk
+from pkg.bulk import bulk_assign, bulk_change_status, parse_refs
+from pkg.models import db, Asset, AssetAssignment, AssetStatus, AssetStatusHistory
+
+
+def _assets(n, status=AssetStatus.INVENTORY):
+    assets = [Asset(name=f"Asset {i}", serial_number=f"SN{i}", current_status=status) for i in range(n)]
+    db.session.add_all(assets)
+    db.session.commit()
+    return [a.id for a in assets]
+
+
+def _race_on(monkeypatch, asset_id):
+    # another admin changes one asset between our read and our UPDATE
+    resolve = bulk.resolve_assets
+
+    def resolve_then_race(*args):
+        found = resolve(*args)
+        db.session.execute(update(Asset.__table__).where(Asset.__table__.c.id == asset_id)
+                           .values(version=Asset.__table__.c.version + 1))
+        return found
+
+    monkeypatch.setattr(bulk, "resolve_assets", resolve_then_race)
+
+
+def test_parse_refs_dedupes_and_reports_bad_ids():
+    ids, serials, bad = parse_refs(["1", "2", "1", "x", ""], "A, B;A\nC")
+    assert ids == [1, 2] and serials == ["A", "B", "C"] and bad == ["x"]
+
+
+def test_bulk_status_change_writes_history(app):
+    ids = _assets(3)
+    report = bulk_change_status(ids[:2], ["SN2", "missing"], AssetStatus.REPAIR, "admin")
+    assert sorted(report.updated) == ids
+    assert report.failures == [("missing", "No asset with this serial number")]
+    assert {a.current_status for a in Asset.query} == {AssetStatus.REPAIR}
+    assert AssetStatusHistory.query.count() == 3
+
+
+def test_assets_already_in_the_status_are_skipped(app):
+    ids = _assets(2, AssetStatus.REPAIR)
+    report = bulk_change_status(ids, [], AssetStatus.REPAIR, "admin")
+    assert report.updated == [] and len(report.failures) == 2
+
+
+def test_concurrent_change_rolls_back_the_whole_batch(app, monkeypatch):
+    ids = _assets(3)
+    _race_on(monkeypatch, ids[1])
+    report = bulk_change_status(ids, [], AssetStatus.RETIRED, "admin")
+    assert report.updated == []
+    assert {reason for _, reason in report.failures} == {
+        "Not updated: Changed by someone else in the meantime; nothing was changed"
+    }
+    assert {a.current_status for a in Asset.query} == {AssetStatus.INVENTORY}
+    assert AssetStatusHistory.query.count() == 0
+
+
+def test_database_errors_are_not_shown_raw(app, monkeypatch):
+    ids = _assets(1)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("INSERT INTO secret_table VALUES (?)")
+
+    monkeypatch.setattr(bulk, "_update_unchanged", broken)
+    report = bulk_change_status(ids, [], AssetStatus.RETIRED, "admin")
+    assert report.failures == [("SN0", "Not updated: Unexpected error; nothing was changed")]
+
+
+def test_bulk_assign_replaces_open_assignments(app):
+    ids = _assets(2)
+    bulk_assign(ids, [], "Alice", "admin")
+    report = bulk_assign(ids, [], "Bob", "admin")
+    assert sorted(report.updated) == ids
+    open_rows = AssetAssignment.query.filter(AssetAssignment.returned_at.is_(None)).all()
+    assert sorted(a.asset_id for a in open_rows) == ids and {a.assigned_to for a in open_rows} == {"Bob"}
+    assert {a.current_holder for a in Asset.query} == {"Bob"}
+
+
+def test_bulk_assign_skips_retired_assets(app):
+    ids = _assets(1, AssetStatus.RETIRED)
+    report = bulk_assign(ids, [], "Alice", "admin")
+    assert report.updated == [] and AssetAssignment.query.count() == 0
+
+
+def test_bulk_route_returns_json(admin_client):
+    ids = _assets(2)
+    response = admin_client.post("/admin/assets/bulk/status/",
+                                 json={"asset_ids": ids + ["nope"], "status": "REPAIR"})
+    body = response.get_json()
+    assert body["updated"] == 2
+    assert body["failures"] == [{"asset": "nope", "reason": "Not a valid asset id"}]
+
+
+def test_serials_in_another_case_are_not_reported_missing(nocase_app):
+    _assets(2)
+    report = bulk_change_status([], ["sn0", "SN1", "nope"], AssetStatus.REPAIR, "admin")
+    assert len(report.updated) == 2
+    assert report.failures == [("nope", "No asset with this serial number")]
+
+
+def test_bulk_status_refuses_assigned_without_a_holder(app):
+    ids = _assets(2)
+    report = bulk_change_status(ids, [], AssetStatus.ASSIGNED, "admin")
+    assert report.updated == [] and len(report.failures) == 2
+    assert {a.current_status for a in Asset.query} == {AssetStatus.INVENTORY}
+    assert AssetAssignment.query.count() == 0 and AssetStatusHistory.query.count() == 0
@@ -0,0 +1,43 @@
+import pytest
+from flask import g
+from sqlalchemy import select, text, update
+
+from pkg.dbconfig import REPLICA
+from pkg.models import db, Asset
+
+
+@pytest.fixture
+def routed_app(app_factory, tmp_path):
+    app = app_factory(DATABASE_REPLICA_URI=f"sqlite:///{tmp_path / 'replica.db'}")
+    with app.app_context():
+        yield app
+    # init_app() registered a metadata for the bind on the shared db object
+    db.metadatas.pop(REPLICA, None)
+
+
+def _bind(statement):
+    return db.session.get_bind(clause=statement)
+
+
+def test_selects_go_to_the_replica_in_read_views(routed_app):
+    with routed_app.test_request_context():
+        g.db_read_replica = True
+        assert _bind(select(Asset.id)) is db.engines[REPLICA]
+        assert _bind(select(Asset.id).union(select(Asset.id))) is db.engines[REPLICA]
+
+
+@pytest.mark.parametrize("statement", [
+    update(Asset).values(name="x"),
+    text("UPDATE assets SET name = 'x'"),
+])
+def test_writes_go_to_the_primary_and_stick(routed_app, statement):
+    with routed_app.test_request_context():
+        g.db_read_replica = True
+        assert _bind(statement) is db.engine
+        assert _bind(select(Asset.id)) is db.engine
+        assert g.db_wrote
+
+
+def test_without_read_replica_everything_uses_the_primary(routed_app):
+    with routed_app.test_request_context():
+        assert _bind(select(Asset.id)) is db.engine
@@ -0,0 +1,64 @@
+from pkg import importer
+from pkg.importer import import_assets
+from pkg.assignments import open_assignment
+from pkg.models import db, Asset, AssetAssignment, AssetStatus, Vendor
+
+
+def _rows(*serials):
+    vendor = Vendor.query.first()
+    if vendor is None:
+        vendor = Vendor(vendor_name="Acme", vendor_email="acme@example.io", vendor_password="x")
+        db.session.add(vendor)
+        db.session.commit()
+    return [(line, {"name": f"Asset {serial}", "serial_number": serial, "quantity": "1",
+                    "vendor_id": vendor.id, "category_id": 1})
+            for line, serial in enumerate(serials, start=2)]
+
+
+def test_import_inserts_valid_rows_and_reports_the_rest(app):
+    db.session.add(Asset(name="Existing", serial_number="SN1"))
+    db.session.commit()
+    report = import_assets(_rows("SN1", "SN2", "SN2", "SN3") + [(6, {"serial_number": "SN4"})])
+    assert report.inserted == 2
+    assert [(line, serial) for line, serial, _ in report.errors] == [(4, "SN2"), (6, "SN4"), (2, "SN1")]
+    assert Asset.query.count() == 3
+
+
+def test_serial_clashes_ignore_case_like_the_database(nocase_app):
+    db.session.add(Asset(name="Existing", serial_number="ABC123"))
+    db.session.commit()
+    report = import_assets(_rows("abc123", "new-1", "NEW-1"))
+    assert report.inserted == 1
+    assert [(line, serial) for line, serial, _ in report.errors] == [(4, "NEW-1"), (2, "abc123")]
+
+
+def test_row_rejected_by_the_database_fails_alone(app, monkeypatch):
+    real_insert = importer.insert
+    raced = []
+
+    def insert_after_race(table):
+        # another import commits SN2 between our duplicate check and our INSERT
+        if not raced:
+            raced.append(True)
+            with db.engine.begin() as conn:
+                conn.execute(real_insert(table), [{"name": "Raced", "serial_number": "SN2"}])
+        return real_insert(table)
+
+    monkeypatch.setattr(importer, "insert", insert_after_race)
+    report = import_assets(_rows("SN1", "SN2", "SN3"))
+    assert report.inserted == 2
+    assert [(line, serial) for line, serial, _ in report.errors] == [(3, "SN2")]
+    assert sorted(s for (s,) in db.session.query(Asset.serial_number)) == ["SN1", "SN2", "SN3"]
+    assert Vendor.query.one().asset_count == 2
+
+
+def test_assigned_rows_need_a_holder_and_open_an_assignment(app):
+    rows = _rows("SN1", "SN2")
+    rows[0][1].update(current_status="assigned", current_holder="Alice")
+    rows[1][1].update(current_status="ASSIGNED")
+    report = import_assets(rows)
+    assert report.inserted == 1
+    assert [(line, serial) for line, serial, _ in report.errors] == [(3, "SN2")]
+    asset = Asset.query.one()
+    assert asset.current_status == AssetStatus.ASSIGNED and asset.current_holder == "Alice"
+    assert open_assignment(asset.id).assigned_to == "Alice" and AssetAssignment.query.count() == 1
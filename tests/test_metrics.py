@@ -0,0 +1,76 @@
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from pkg.models import db
+
+
+def _scrape(client, token="secret"):
+    return client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+
+
+def _count(body, event):
+    match = re.search(rf'db_pool_events_total{{bind="default",event="{event}"}} (\d+)', body)
+    return int(match.group(1)) if match else 0
+
+
+def test_metrics_are_off_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_enabled_without_a_token_is_not_served(app_factory):
+    app = app_factory(METRICS_ENABLED=True, METRICS_TOKEN=None)
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_token_is_required(app_factory):
+    client = app_factory(METRICS_ENABLED=True, METRICS_TOKEN="secret").test_client()
+    assert client.get("/metrics").status_code == 401
+    assert _scrape(client, "wrong").status_code == 401
+    response = _scrape(client)
+    assert response.status_code == 200
+    assert "http_requests_total" in response.get_data(as_text=True)
+
+
+def test_pool_listeners_survive_dispose(app_factory):
+    app = app_factory(METRICS_ENABLED=True, METRICS_TOKEN="secret")
+    client = app.test_client()
+    with app.app_context():
+        before = _count(_scrape(client).get_data(as_text=True), "checkout")
+        db.session.execute(text("SELECT 1"))
+        db.session.remove()
+        db.engine.dispose()
+        db.session.execute(text("SELECT 1"))
+        db.session.remove()
+    body = _scrape(client).get_data(as_text=True)
+    assert _count(body, "checkout") >= before + 2
+    assert _count(body, "checkin") >= 2
+    assert "db_pool_connection_held_seconds_count" in body
+
+
+
+def _wait(body):
+    # (count, sum) of the checkout wait histogram for the default bind
+    count = re.search(r'db_pool_checkout_wait_seconds_count{bind="default"} (\d+)', body)
+    total = re.search(r'db_pool_checkout_wait_seconds_sum{bind="default"} ([\d.e-]+)', body)
+    return (int(count.group(1)), float(total.group(1))) if count else (0, 0.0)
+
+
+def test_checkout_wait_includes_time_starved_for_a_connection(app_factory):
+    app = app_factory(METRICS_ENABLED=True, METRICS_TOKEN="secret", DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0,
+                      DB_POOL_TIMEOUT=1)
+    client = app.test_client()
+    count, total = _wait(_scrape(client).get_data(as_text=True))
+    with app.app_context():
+        held = db.engine.connect()
+        try:
+            with pytest.raises(PoolTimeoutError):
+                db.engine.connect()
+        finally:
+            held.close()
+    after_count, after_total = _wait(_scrape(client).get_data(as_text=True))
+    assert after_count >= count + 2
+    # the second checkout waited out the one-second pool timeout
+    assert after_total - total >= 1.0
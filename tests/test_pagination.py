@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from pkg.models import db, Asset
+from pkg.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+def _assets(n, same_time=False):
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        created = start if same_time else start + timedelta(minutes=i)
+        db.session.add(Asset(name=f"Asset {i}", serial_number=f"SN{i}", created_at=created))
+    db.session.commit()
+
+
+def _page(**kwargs):
+    return keyset_paginate(Asset.query, Asset.created_at, Asset.id, 4, **kwargs)
+
+
+def test_cursor_round_trip():
+    when = datetime(2024, 5, 6, 7, 8, 9, 123)
+    assert decode_cursor(encode_cursor(when, 42)) == (when, 42)
+
+
+def test_bad_cursor_is_ignored():
+    assert decode_cursor(None) is None
+    assert decode_cursor("not-a-cursor") is None
+    assert decode_cursor(encode_cursor(None, 1)) is None
+
+
+def test_walk_forward_covers_every_row_once(app):
+    _assets(10)
+    seen, page = [], _page()
+    assert not page.has_prev
+    while True:
+        seen.extend(a.id for a in page.items)
+        if not page.has_next:
+            break
+        page = _page(after=page.next_cursor)
+    expected = [a.id for a in Asset.query.order_by(Asset.created_at.desc(), Asset.id.desc())]
+    assert seen == expected
+
+
+def test_ties_on_created_at_are_broken_by_id(app):
+    _assets(9, same_time=True)
+    first = _page()
+    second = _page(after=first.next_cursor)
+    third = _page(after=second.next_cursor)
+    ids = [a.id for p in (first, second, third) for a in p.items]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 9
+    assert not third.has_next
+
+
+def test_before_returns_the_previous_page(app):
+    _assets(10)
+    first = _page()
+    second = _page(after=first.next_cursor)
+    assert second.has_prev
+    back = _page(before=second.prev_cursor)
+    assert [a.id for a in back.items] == [a.id for a in first.items]
+    assert not back.has_prev and back.has_next
+
+
+def test_sort_column_rejects_null(app):
+    # a NULL created_at could never be turned into a next-page cursor
+    db.session.add(Asset(name="Undated", serial_number="SN-NULL"))
+    db.session.flush()
+    with pytest.raises(IntegrityError):
+        db.session.execute(db.update(Asset).values(created_at=None))
+    db.session.rollback()
@@ -0,0 +1,18 @@
+from sqlalchemy import select
+
+from pkg.models import db, Asset
+from pkg.queryplans import _full_scans, check_query_plans, seed_for_plans
+
+
+def test_route_queries_use_indexes(app):
+    with db.engine.begin() as conn:
+        seed_for_plans(conn)
+    with db.engine.connect() as conn:
+        assert check_query_plans(conn) == []
+
+
+def test_unindexed_filter_is_reported(app):
+    with db.engine.begin() as conn:
+        seed_for_plans(conn)
+    with db.engine.connect() as conn:
+        assert _full_scans(conn, select(Asset.id).where(Asset.name == "Asset 1"))
@@ -0,0 +1,45 @@
+from flask import g
+
+from pkg import refdata
+from pkg.cache_versions import shared_version
+from pkg.models import db, AssetCategory, Vendor
+
+
+def _other_worker_state():
+    # what a second process still holds: the lists as cached before the change
+    with refdata._lock:
+        return dict(refdata._cache)
+
+
+def _as_other_worker(state):
+    with refdata._lock:
+        refdata._cache.clear()
+        refdata._cache.update(state)
+    g.pop("refdata_shared_version", None)
+
+
+def test_local_commit_refreshes_the_cache(app):
+    names = {c.name for c in refdata.get_categories()}
+    db.session.add(AssetCategory(name="Drones"))
+    db.session.commit()
+    assert {c.name for c in refdata.get_categories()} == names | {"Drones"}
+
+
+def test_other_workers_see_a_new_vendor(app):
+    assert refdata.get_vendors() == ()
+    stale = _other_worker_state()
+    db.session.add(Vendor(vendor_name="New vendor", vendor_email="n@example.io", vendor_password="x"))
+    db.session.commit()
+    _as_other_worker(stale)
+    assert [v.vendor_name for v in refdata.get_vendors()] == ["New vendor"]
+
+
+def test_rolled_back_changes_do_not_bump_the_version(app):
+    refdata.get_vendors()
+    version = shared_version(refdata.CACHE_NAME)
+    db.session.add(Vendor(vendor_name="Never", vendor_email="x@example.io", vendor_password="x"))
+    db.session.flush()
+    db.session.rollback()
+    g.pop("refdata_shared_version", None)
+    assert shared_version(refdata.CACHE_NAME) == version
+    assert refdata.get_vendors() == ()
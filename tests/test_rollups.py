@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from pkg.models import db, Asset, Vendor
+from pkg.rollups import rebuild_vendor_totals
+
+
+def _totals(vendor):
+    db.session.refresh(vendor)
+    return vendor.asset_count, vendor.total_quantity
+
+
+def test_insert_update_delete_keep_totals(vendor):
+    other = Vendor(vendor_name="Other", vendor_email="o@example.io", vendor_password="x")
+    db.session.add(other)
+    asset = Asset(name="Laptop", serial_number="A1", quantity=3, vendor_id=vendor.id)
+    db.session.add_all([asset, Asset(name="Dock", serial_number="A2", quantity=2, vendor_id=vendor.id)])
+    db.session.commit()
+    assert _totals(vendor) == (2, 5)
+
+    asset.quantity = 10
+    db.session.commit()
+    assert _totals(vendor) == (2, 12)
+
+    asset.vendor_id = other.id
+    db.session.commit()
+    assert _totals(vendor) == (1, 2) and _totals(other) == (1, 10)
+
+    db.session.delete(asset)
+    db.session.commit()
+    assert _totals(other) == (0, 0)
+
+
+def test_failed_flush_does_not_leak_deltas(vendor):
+    db.session.add(Asset(name="Laptop", serial_number="DUP", quantity=1, vendor_id=vendor.id))
+    db.session.commit()
+
+    db.session.add(Asset(name="Clash", serial_number="DUP", quantity=7, vendor_id=vendor.id))
+    with pytest.raises(IntegrityError):
+        db.session.flush()
+    db.session.rollback()
+
+    # a flush with no vendor changes of its own
+    db.session.add(Vendor(vendor_name="Other", vendor_email="o@example.io", vendor_password="x"))
+    db.session.commit()
+    assert _totals(vendor) == (1, 1)
+
+
+def test_rebuild_matches_maintained_totals(vendor):
+    db.session.add_all([Asset(name=f"A{i}", serial_number=f"S{i}", quantity=i, vendor_id=vendor.id) for i in range(5)])
+    db.session.commit()
+    maintained = _totals(vendor)
+    rebuild_vendor_totals()
+    assert _totals(vendor) == maintained == (5, 10)
@@ -0,0 +1,48 @@
+from sqlalchemy import text
+
+from pkg.models import db, Asset, AssetStatus
+from pkg.search import search_assets
+
+
+def _found(q):
+    return [a.serial_number for a in search_assets(Asset.query, q)]
+
+
+def _fts_changes():
+    return db.session.execute(text("SELECT total_changes()")).scalar()
+
+
+def test_search_by_name_and_serial(app):
+    db.session.add_all([
+        Asset(name="Dell Latitude laptop", serial_number="DL-100", make="Dell"),
+        Asset(name="HP monitor", serial_number="HP-200", make="HP"),
+    ])
+    db.session.commit()
+    assert _found("latitude") == ["DL-100"]
+    assert _found("HP-200") == ["HP-200"]
+    assert search_assets(Asset.query, "  ") is None
+
+
+def test_renames_reindex_but_status_changes_do_not(app):
+    asset = Asset(name="Old name", serial_number="S1")
+    db.session.add(asset)
+    db.session.commit()
+
+    asset.name = "Renamed thing"
+    db.session.commit()
+    assert _found("renamed") == ["S1"] and _found("old") == []
+
+    before = _fts_changes()
+    asset.current_status = AssetStatus.REPAIR
+    db.session.commit()
+    # the row update and the dashboard's cache-version bump, and no FTS delete/insert pair
+    assert _fts_changes() - before == 2
+
+
+def test_deleted_assets_leave_the_index(app):
+    asset = Asset(name="Gone soon", serial_number="S2")
+    db.session.add(asset)
+    db.session.commit()
+    db.session.delete(asset)
+    db.session.commit()
+    assert _found("gone") == []
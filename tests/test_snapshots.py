@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from pkg.archive import archive_old_rows
+from pkg.models import db, Asset, AssetAssignment, AssetStatus, AssetStatusHistory
+from pkg.snapshots import inventory_as_of, take_checkpoint
+
+DAY = timedelta(days=1)
+
+
+@pytest.fixture
+def timeline(app):
+    """Three assets over 100 days; returns the start and the expected state on each sampled day."""
+    start = datetime.utcnow().replace(microsecond=0) - 100 * DAY
+    laptop = Asset(name="Laptop", serial_number="L1", category_id=1, created_at=start,
+                   current_status=AssetStatus.INVENTORY)
+    dock = Asset(name="Dock", serial_number="D1", category_id=2, created_at=start + 10 * DAY,
+                 current_status=AssetStatus.REPAIR)
+    # no recorded changes: it has been RETIRED since it was created
+    old = Asset(name="Old", serial_number="O1", category_id=1, created_at=start + 20 * DAY,
+                current_status=AssetStatus.RETIRED)
+    db.session.add_all([laptop, dock, old])
+    db.session.flush()
+    for asset, status, day in [(laptop, AssetStatus.ASSIGNED, 5), (dock, AssetStatus.ASSIGNED, 30),
+                               (laptop, AssetStatus.INVENTORY, 40), (dock, AssetStatus.REPAIR, 70)]:
+        db.session.add(AssetStatusHistory(asset_id=asset.id, status=status, changed_by="admin",
+                                          timestamp=start + day * DAY))
+    db.session.add_all([
+        AssetAssignment(asset_id=laptop.id, assigned_to="Alice", assigned_at=start + 5 * DAY,
+                        returned_at=start + 40 * DAY),
+        AssetAssignment(asset_id=dock.id, assigned_to="Bob", assigned_at=start + 30 * DAY,
+                        returned_at=start + 70 * DAY),
+    ])
+    db.session.commit()
+    expected = {
+        1: {laptop.id: (AssetStatus.INVENTORY, None)},
+        7: {laptop.id: (AssetStatus.ASSIGNED, "Alice")},
+        15: {laptop.id: (AssetStatus.ASSIGNED, "Alice"), dock.id: (AssetStatus.INVENTORY, None)},
+        35: {laptop.id: (AssetStatus.ASSIGNED, "Alice"), dock.id: (AssetStatus.ASSIGNED, "Bob"),
+             old.id: (AssetStatus.RETIRED, None)},
+        50: {laptop.id: (AssetStatus.INVENTORY, None), dock.id: (AssetStatus.ASSIGNED, "Bob"),
+             old.id: (AssetStatus.RETIRED, None)},
+        90: {laptop.id: (AssetStatus.INVENTORY, None), dock.id: (AssetStatus.REPAIR, None),
+             old.id: (AssetStatus.RETIRED, None)},
+    }
+    return start, expected
+
+
+def _states(when):
+    return {a: (s.status, s.holder) for a, s in inventory_as_of(when).states.items()}
+
+
+def _check(start, expected):
+    for day, states in expected.items():
+        assert _states(start + day * DAY) == states, day
+
+
+def test_replay_from_scratch(timeline):
+    _check(*timeline)
+    assert inventory_as_of(timeline[0] + 90 * DAY).checkpoint is None
+
+
+def test_replay_from_checkpoints(timeline):
+    start, expected = timeline
+    for day in (6, 33, 45):
+        take_checkpoint(start + day * DAY)
+    _check(start, expected)
+    snapshot = inventory_as_of(start + 50 * DAY)
+    assert snapshot.checkpoint.taken_at == start + 45 * DAY and snapshot.events == 0
+
+
+def test_replay_reads_archived_events(timeline):
+    start, expected = timeline
+    take_checkpoint(start + 33 * DAY)
+    report = archive_old_rows(older_than_days=45)
+    assert report.rows == {"history": 3, "assignments": 1}
+    _check(start, expected)
+
+
+def test_deleted_assets_leave_every_snapshot(timeline):
+    start, expected = timeline
+    take_checkpoint(start + 33 * DAY)
+    dock = Asset.query.filter_by(serial_number="D1").one()
+    db.session.delete(dock)
+    db.session.commit()
+    for day in (15, 35, 50):
+        assert dock.id not in _states(start + day * DAY)
+
+
+def test_cached_snapshot_follows_new_events(timeline):
+    start, expected = timeline
+    when = start + 50 * DAY
+    assert inventory_as_of(when) is inventory_as_of(when)
+    laptop = Asset.query.filter_by(serial_number="L1").one()
+    db.session.add(AssetStatusHistory(asset_id=laptop.id, status=AssetStatus.REPAIR, changed_by="admin",
+                                      timestamp=start + 45 * DAY))
+    db.session.commit()
+    assert _states(when)[laptop.id] == (AssetStatus.REPAIR, None)
+
+
+def test_page_filters_before_slicing(timeline):
+    start, _ = timeline
+    snapshot = inventory_as_of(start + 50 * DAY)
+    total, shown = snapshot.page(0, 1, category=1)
+    assert total == 2 and [s.serial_number for s in shown] == ["L1"]
+    total, shown = snapshot.page(1, 5, category=1)
+    assert total == 2 and [s.serial_number for s in shown] == ["O1"]
+    assert snapshot.page(0, 5, holder="bo")[0] == 1
+    assert snapshot.page(0, 5, status=AssetStatus.REPAIR) == (0, [])
+
+
+def test_as_of_route_pages_filtered_assets(admin_client, timeline):
+    start, _ = timeline
+    at = (start + 50 * DAY).isoformat()
+    data = admin_client.get(f"/admin/assets/as-of/?at={at}&category=1&per_page=1&page=2",
+                            headers={"Accept": "application/json"}).get_json()
+    assert data["total"] == 2 and [a["serial_number"] for a in data["assets"]] == ["O1"]
@@ -0,0 +1,31 @@
+import pytest
+
+from pkg.static_assets import _pick_encoding
+
+CSS = "assets/font-awesome/css/all.min.css"
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    target = tmp_path / "static-build" / CSS
+    target.parent.mkdir(parents=True)
+    for suffix in (".br", ".gz"):
+        (target.parent / (target.name + suffix)).write_bytes(b"compressed")
+    return str(tmp_path / "static-build")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_variant_follows_accept_encoding_quality(app, build_dir, header, expected):
+    with app.test_request_context(headers={"Accept-Encoding": header}):
+        encoding, path = _pick_encoding(build_dir, CSS)
+    assert encoding == expected
+    assert (path is None) == (expected is None)
@@ -0,0 +1,52 @@
+from pkg import stats
+from pkg.bulk import bulk_change_status
+from pkg.models import db, Asset, AssetStatus
+
+
+def _other_worker_state():
+    # what a second process still holds: the numbers as cached before the change
+    with stats._lock:
+        return dict(stats._cache)
+
+
+def _as_other_worker(state):
+    with stats._lock:
+        stats._cache.clear()
+        stats._cache.update(state)
+    stats.forget_shared_version(stats.CACHE_NAME)
+
+
+def test_other_workers_see_new_assets(app):
+    assert stats.get_dashboard_stats()["total_assets"] == 0
+    stale = _other_worker_state()
+    db.session.add(Asset(name="Laptop", serial_number="SN1"))
+    db.session.commit()
+    _as_other_worker(stale)
+    assert stats.get_dashboard_stats()["total_assets"] == 1
+
+
+def test_other_workers_see_bulk_changes(app):
+    asset = Asset(name="Laptop", serial_number="SN1")
+    db.session.add(asset)
+    db.session.commit()
+    assert stats.get_dashboard_stats()["status_counts"]["repair"] == 0
+    stale = _other_worker_state()
+    bulk_change_status([asset.id], [], AssetStatus.REPAIR, "admin")
+    _as_other_worker(stale)
+    assert stats.get_dashboard_stats()["status_counts"]["repair"] == 1
+
+
+def test_stats_counted_before_a_commit_are_not_cached(app, monkeypatch):
+    compute = stats._compute_dashboard_stats
+
+    def compute_then_commit():
+        # another request in this worker commits while we are still counting
+        result = compute()
+        db.session.add(Asset(name="Laptop", serial_number="SN1"))
+        db.session.commit()
+        return result
+
+    monkeypatch.setattr(stats, "_compute_dashboard_stats", compute_then_commit)
+    assert stats.get_dashboard_stats()["total_assets"] == 0
+    monkeypatch.setattr(stats, "_compute_dashboard_stats", compute)
+    assert stats.get_dashboard_stats()["total_assets"] == 1
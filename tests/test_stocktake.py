@@ -0,0 +1,28 @@
+from pkg.models import db, Asset, AssetStatus
+from pkg.stocktake import reconcile
+
+
+def _scans(*serials):
+    return [(line, serial, None) for line, serial in enumerate(serials, start=1)]
+
+
+def test_reconcile_reports_found_missing_unknown_and_duplicates(app):
+    db.session.add_all([
+        Asset(name="Laptop", serial_number="SN1"),
+        Asset(name="Dock", serial_number="SN2"),
+        Asset(name="Phone", serial_number="SN3", current_status=AssetStatus.ASSIGNED, current_holder="Alice"),
+    ])
+    db.session.commit()
+    report = reconcile(_scans("SN1", "SN3", "SN1", "NOPE"))
+    assert report.scanned == 4 and report.found == 2
+    assert [serial for serial, *_ in report.missing] == ["SN2"]
+    assert report.unknown == [(4, "NOPE")] and report.duplicates == [(3, "SN1")]
+    assert [serial for serial, *_ in report.mismatches] == ["SN3"]
+
+
+def test_scans_match_serials_the_way_the_database_does(nocase_app):
+    db.session.add(Asset(name="Laptop", serial_number="ABC123"))
+    db.session.commit()
+    report = reconcile(_scans("abc123", "ABC123 ", "zzz"))
+    assert report.found == 1 and report.missing == []
+    assert report.duplicates == [(2, "ABC123 ")] and report.unknown == [(3, "zzz")]
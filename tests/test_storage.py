@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from pkg.images import upload_folder
+from pkg.models import db, Asset, StoredFile
+from pkg.storage import delete_blob, release_upload, save_upload
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"not really an image" * 10
+
+
+def _upload(data, filename):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+def _asset(serial, picture):
+    asset = Asset(name=serial, serial_number=serial, picture=picture)
+    db.session.add(asset)
+    db.session.commit()
+    return asset
+
+
+def _exists(picture):
+    return os.path.exists(os.path.join(upload_folder(), picture))
+
+
+def test_same_bytes_are_stored_once(app):
+    first, first_new = save_upload(_upload(PNG_BYTES, "a.png"))
+    _asset("A", first)
+    second, second_new = save_upload(_upload(PNG_BYTES, "b.png"))
+    _asset("B", second)
+    assert first == second and first_new and not second_new
+    assert db.session.get(StoredFile, os.path.basename(first).split(".")[0]).ref_count == 2
+
+
+def test_other_extension_reuses_the_stored_path(app):
+    first, _ = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    _asset("A", first)
+    second, is_new = save_upload(_upload(PNG_BYTES, "photo.png"))
+    _asset("B", second)
+    assert second == first and not is_new
+    assert StoredFile.query.count() == 1
+    assert len(os.listdir(os.path.dirname(os.path.join(upload_folder(), first)))) == 1
+
+
+def test_deleting_one_of_two_assets_keeps_the_blob(app):
+    first, _ = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    a = _asset("A", first)
+    second, _ = save_upload(_upload(PNG_BYTES, "photo.png"))
+    _asset("B", second)
+
+    assert release_upload(a.picture) is False
+    db.session.delete(a)
+    db.session.commit()
+    assert _exists(first)
+    assert StoredFile.query.one().ref_count == 1
+
+
+def test_last_reference_removes_the_row(app):
+    picture, _ = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    asset = _asset("A", picture)
+    assert release_upload(asset.picture) is True
+    db.session.delete(asset)
+    db.session.commit()
+    delete_blob(picture)
+    assert StoredFile.query.count() == 0 and not _exists(picture)
+
+
+def test_rollback_removes_a_newly_written_blob(app):
+    picture, is_new = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    assert is_new and _exists(picture)
+    db.session.rollback()
+    assert not _exists(picture)
+    assert StoredFile.query.count() == 0
+
+
+def test_rollback_keeps_a_blob_other_assets_use(app):
+    picture, _ = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    _asset("A", picture)
+    save_upload(_upload(PNG_BYTES, "again.jpg"))
+    db.session.rollback()
+    assert _exists(picture)
+    assert StoredFile.query.one().ref_count == 1
+
+
+def test_admin_delete_route_releases_one_reference(admin_client):
+    first, _ = save_upload(_upload(PNG_BYTES, "photo.jpg"))
+    a = _asset("A", first)
+    second, _ = save_upload(_upload(PNG_BYTES, "photo.png"))
+    b = _asset("B", second)
+    admin_client.post(f"/admin/assets/delete/{a.id}/")
+    assert db.session.get(Asset, b.id).picture == first and _exists(first)
+    admin_client.post(f"/admin/assets/delete/{b.id}/")
+    assert StoredFile.query.count() == 0 and not _exists(first)